@@ -3,20 +3,16 @@ main.py
 """
 
 # Standard library imports
-import glob
-import os
-import shutil
+import threading
 import time
+import uuid
 from pathlib import Path
-from tempfile import NamedTemporaryFile
-from typing import List, Tuple, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Optional
 
 # Third-party imports
 import gradio as gr
 import random
 from loguru import logger
-from pypdf import PdfReader
-from docx import Document
 from dotenv import load_dotenv
 
 # 加载环境变量
@@ -25,14 +21,23 @@ load_dotenv()
 # Local imports
 from constants import (
     APP_TITLE,
-    CHARACTER_LIMIT,
-    ERROR_MESSAGE_NOT_PDF,
     ERROR_MESSAGE_NO_INPUT,
-    ERROR_MESSAGE_READING_PDF,
     ERROR_MESSAGE_TOO_LONG,
     GRADIO_CACHE_DIR,
-    GRADIO_CLEAR_CACHE_OLDER_THAN,
+    INPUT_CHARACTER_LIMIT,
+    JOB_MAX_RETAINED,
+    JOB_POLL_INTERVAL,
+    JOB_QUEUE_BACKEND,
+    JOB_QUEUE_DB,
+    JOB_QUEUE_MAX_ATTEMPTS,
+    JOB_QUEUE_RETRY_DELAY,
+    JOB_QUEUE_UPLOAD_DIR,
+    JOB_QUEUE_VISIBILITY_TIMEOUT,
+    JOB_STAGE_LABELS,
     LANGUAGE_MAPPING,
+    LLM_STREAMING,
+    METRICS_HOST,
+    METRICS_PORT,
     UI_ALLOW_FLAGGING,
     UI_API_NAME,
     UI_CACHE_EXAMPLES,
@@ -40,8 +45,11 @@ from constants import (
     UI_DESCRIPTION,
     UI_EXAMPLES,
     UI_INPUTS,
+    UI_JOB_API_NAMES,
+    UI_JOB_CONCURRENCY_LIMIT,
     UI_OUTPUTS,
     UI_SHOW_API,
+    UI_STREAM_API_NAME,
 )
 from prompts import (
     LANGUAGE_MODIFIER,
@@ -51,9 +59,53 @@ from prompts import (
     TONE_MODIFIER,
 )
 from schema import DialogueItem, ShortDialogue, MediumDialogue, LongDialogue
-from utils import generate_script
-from tts import generate_podcast_audio
-from tool import process_files, process_url
+from utils import generate_script, generate_script_stream
+from jobs import JOB_FAILED, JOB_STAGES, JOB_SUCCEEDED, JobScheduler, NonRetryableError
+from job_queue import SQLiteJobQueue, stage_uploads
+from tts import (
+    SPECULATIVE_TTS_CONFIG,
+    SpeculativeSynthesis,
+    assemble_audio,
+    generate_podcast_audio,
+    get_tts_cache,
+    iter_podcast_audio,
+)
+from tool import ingest_sources, split_urls, warm_up_extraction_pool
+from transport import warm_up
+from result_cache import get_result_cache, request_fingerprint
+from cache_janitor import get_cache_janitor
+from metrics import start_metrics_server
+
+
+class InvalidInputError(gr.Error, NonRetryableError):
+    """输入校验失败（没有输入、内容过长、不支持的文件类型、无效URL）：界面上与gr.Error一致，任务不重试"""
+
+
+def format_transcript_line(line: DialogueItem, name_of_guest: str) -> str:
+    """文字稿中的一条对话"""
+    if line.speaker == "Host (Jane)":
+        return f"**Host**: {line.text}\n\n"
+    return f"**{name_of_guest}**: {line.text}\n\n"
+
+
+def get_request_fingerprint(
+    files: List[str],
+    url: Optional[str],
+    question: Optional[str],
+    tone: Optional[str],
+    length: Optional[str],
+    language: str,
+    llm_platform: str,
+    tts_service: str,
+) -> Optional[str]:
+    """计算请求指纹，结果缓存未启用或文件无法读取时返回None"""
+    if get_result_cache() is None or (not files and not url):
+        return None
+    try:
+        return request_fingerprint(files, url, question, tone, length, language, llm_platform, tts_service)
+    except OSError as e:
+        logger.warning(f"计算请求指纹失败，跳过结果缓存: {e}")
+        return None
 
 
 def generate_podcast(
@@ -64,11 +116,26 @@ def generate_podcast(
     length: Optional[str],
     language: str,
     llm_platform: str,
-    tts_service: str
+    tts_service: str,
+    force_regenerate: bool = False,
+    progress: Optional[Callable[[str], None]] = None,
+    partial: Optional[Callable[[Dict[str, Any]], None]] = None,
 ) -> Tuple[str, str]:
-    """Generate the audio and transcript from the PDFs and/or URL."""
+    """Generate the audio and transcript from the PDFs and/or URL(s).
+
+    Identical earlier requests are served from the result cache unless force_regenerate is set.
+    progress is called with the name of each stage (see jobs.JOB_STAGES) as it starts.
+    partial is called with {"transcript": ..., "audio": [...]} whenever a dialogue line arrives
+    or its audio finishes, so the front end can play the podcast before it is merged.
+    """
+    report_stage = progress or (lambda stage: None)
+    report_partial = partial or (lambda update: None)
 
-    text = ""
+    fingerprint = get_request_fingerprint(files, url, question, tone, length, language, llm_platform, tts_service)
+    if fingerprint and not force_regenerate:
+        cached = get_result_cache().get(fingerprint)
+        if cached:
+            return cached
 
     # Choose random number from 0 to 8
     random_voice_number = random.randint(0, 8) # this is for suno model
@@ -77,67 +144,27 @@ def generate_podcast(
 
     # Check if at least one input is provided
     if not files and not url:
-        raise gr.Error(ERROR_MESSAGE_NO_INPUT)
+        raise InvalidInputError(ERROR_MESSAGE_NO_INPUT)
 
-    # Process PDFs and Word documents if any
-    if files:
-        try:
-            files_text = process_files(files)
-            if files_text:
-                text += files_text + "\n\n"
-        except ValueError as e:
-            # 重新抛出不支持文件类型的错误
-            raise gr.Error(str(e))
-        except Exception as e:
-            raise gr.Error(f"读取文件时出错: {str(e)}")
-
-    # Process URL if provided
-    if url:
-        try:
-            url_text = process_url(url)
-            if url_text:
-                text += "\n\n" + url_text
-            else:
-                logger.warning(f"URL解析成功，但未提取到文本: {url}")
-                # 继续执行，不中断流程
-        except ValueError as e:
-            raise gr.Error(str(e))
-        except Exception as e:
-            # 捕获所有异常，提供更友好的错误信息
-            raise gr.Error(f"处理URL时出错: {str(e)}")
-
-    # Check total character count
-    if len(text) > CHARACTER_LIMIT:
-        raise gr.Error(ERROR_MESSAGE_TOO_LONG)
-
-    # Modify the system prompt based on the user input
-    modified_system_prompt = SYSTEM_PROMPT
-
-    if question:
-        modified_system_prompt += f"\n\n{QUESTION_MODIFIER} {question}"
-    if tone:
-        modified_system_prompt += f"\n\n{TONE_MODIFIER} {tone}."
-    if length:
-        modified_system_prompt += f"\n\n{LENGTH_MODIFIERS[length]}"
-    if language:
-        modified_system_prompt += f"\n\n{LANGUAGE_MODIFIER} {language}."
-
-    # Call the LLM with improved error handling
+    report_stage("ingest")
+    # 并发读取文件和各URL（支持多个URL），按 文件、URL1、URL2… 的顺序拼接
+    urls = split_urls(url)
     try:
-        if length == "短 (1-2分钟)":
-            llm_output = generate_script(modified_system_prompt, text, ShortDialogue, llm_platform)
-        elif length == "长 (15-20分钟)":
-            llm_output = generate_script(modified_system_prompt, text, LongDialogue, llm_platform)
-        else:
-            llm_output = generate_script(modified_system_prompt, text, MediumDialogue, llm_platform)
-
-        logger.info(f"Generated dialogue: {llm_output}")
+        text = ingest_sources(files, urls, INPUT_CHARACTER_LIMIT)
+    except ValueError as e:
+        # 重新抛出不支持文件类型、内容过长或URL无效的错误
+        raise InvalidInputError(str(e))
     except Exception as e:
-        logger.error(f"大模型调用失败: {str(e)}")
-        raise gr.Error(f"生成播客脚本失败: {str(e)}")
+        # 捕获所有异常，提供更友好的错误信息
+        raise gr.Error(str(e))
+
+    # Check total character count
+    if len(text) > INPUT_CHARACTER_LIMIT:
+        raise InvalidInputError(ERROR_MESSAGE_TOO_LONG)
 
     # Create a unique temporary directory for this podcast generation session
-    session_id = str(int(time.time()))
+    # 时间戳加随机后缀，同一秒内启动的并发任务也不会共用目录
+    session_id = f"{int(time.time())}_{uuid.uuid4().hex[:8]}"
     
     # 生成基于文件名的目录名
     import re
@@ -153,230 +180,457 @@ def generate_podcast(
     else:
         # 如果没有文件上传，使用URL的简化版本或默认值
         if url:
-            url_simplified = re.sub(r'[^\w\-]', '_', url[:20])
+            url_simplified = re.sub(r'[^\w\-]', '_', (urls[0] if urls else url)[:20])
             filename_clean = url_simplified
         else:
             filename_clean = "url"
         dir_name = f"{filename_clean}_{session_id}"
     
     podcast_temp_dir = Path(GRADIO_CACHE_DIR) / dir_name
-    podcast_temp_dir.mkdir(exist_ok=True)
+    podcast_temp_dir.mkdir(parents=True, exist_ok=False)
     
     logger.info(f"Created temporary directory for podcast: {podcast_temp_dir}")
 
-    # Process the dialogue
-    audio_segments = []
-    transcript = ""
-    total_characters = 0
-    
-    # 使用新的语言映射
-    language_for_tts = LANGUAGE_MAPPING[language]
-    
-    # 检查是否为硅基流动TTS服务，需要批量合成
-    if tts_service == "siliconflow":
-        # 硅基流动需要一次性调用API来保持音色一致性
-        # 将所有对话内容合并成一个文本，使用标签区分不同角色
-        combined_text = ""
-        for i, line in enumerate[DialogueItem](llm_output.dialogue):
-            logger.info(f"Preparing audio for {line.speaker}: {line.text}")
-            if line.speaker == "Host (Jane)":
-                speaker = f"**Host**: {line.text}"
-                # 硅基流动使用[S1]标签表示主持人
-                tts_text = f"[S1]{line.text}"
-            elif line.speaker == "Guest":
-                speaker = f"**{llm_output.name_of_guest}**: {line.text}"
-                # 硅基流动使用[S2]标签表示嘉宾
-                tts_text = f"[S2]{line.text}"
-            elif line.speaker == "Guest 2":
-                speaker = f"**{llm_output.name_of_guest} 2**: {line.text}"
-                # 硅基流动使用[S3]标签表示第二个嘉宾
-                tts_text = f"[S3]{line.text}"
-            elif line.speaker == "Guest 3":
-                speaker = f"**{llm_output.name_of_guest} 3**: {line.text}"
-                # 硅基流动使用[S4]标签表示第三个嘉宾
-                tts_text = f"[S4]{line.text}"
-            elif line.speaker == "Guest 4":
-                speaker = f"**{llm_output.name_of_guest} 4**: {line.text}"
-                # 硅基流动使用[S5]标签表示第四个嘉宾
-                tts_text = f"[S5]{line.text}"
-            else:
-                speaker = f"**{line.speaker}**: {line.text}"
-                # 默认使用S2标签
-                tts_text = f"[S2]{line.text}"
-            transcript += speaker + "\n\n"
-            total_characters += len(line.text)
-            combined_text += tts_text + "\n"
-        
-        # 一次性调用硅基流动TTS API合成整个对话
-        logger.info(f"Calling SiliconFlow TTS API with combined text (length: {len(combined_text)})")
-        audio_file_path = generate_podcast_audio(
-            combined_text, "Combined", language_for_tts, random_voice_number, tts_service, str(podcast_temp_dir), 0
-        )
-        
-        # 将合成的音频文件添加到列表
-        audio_segments.append(audio_file_path)
-    else:
-        # 其他TTS服务使用逐条合成的方式
-        for i, line in enumerate[DialogueItem](llm_output.dialogue):
-            logger.info(f"Generating audio for {line.speaker}: {line.text}")
-            if line.speaker == "Host (Jane)":
-                speaker = f"**Host**: {line.text}"
+    # 执行期间固定任务目录，后台清理线程不会删除进行中任务的目录
+    get_cache_janitor().pin(podcast_temp_dir)
+    speculation = None
+    try:
+        report_stage("script")
+        # Modify the system prompt based on the user input
+        modified_system_prompt = SYSTEM_PROMPT
+
+        if question:
+            modified_system_prompt += f"\n\n{QUESTION_MODIFIER} {question}"
+        if tone:
+            modified_system_prompt += f"\n\n{TONE_MODIFIER} {tone}."
+        if length:
+            modified_system_prompt += f"\n\n{LENGTH_MODIFIERS[length]}"
+        if language:
+            modified_system_prompt += f"\n\n{LANGUAGE_MODIFIER} {language}."
+
+        # 根据长度选择对话结构
+        if length == "短 (1-2分钟)":
+            output_model = ShortDialogue
+        elif length == "长 (15-20分钟)":
+            output_model = LongDialogue
+        else:
+            output_model = MediumDialogue
+
+        # 逐条合成的TTS服务可以在大模型流式输出改进稿的同时开始合成语音
+        dialogue_stream = None
+        use_streaming = LLM_STREAMING and tts_service != "siliconflow"
+
+        # 使用新的语言映射
+        language_for_tts = LANGUAGE_MAPPING[language]
+
+        # 推测合成：大模型改进对话期间先按初稿逐条合成，改进稿中不变的对话直接复用
+        on_draft = None
+        if SPECULATIVE_TTS_CONFIG["enabled"] and tts_service != "siliconflow":
+            speculation = SpeculativeSynthesis(language_for_tts, random_voice_number, tts_service, str(podcast_temp_dir))
+
+            def speculate(draft: Any) -> None:
+                # 初稿未能解析为对话（平台返回纯文本）时不做推测合成
+                if isinstance(draft, output_model):
+                    speculation.start((line.text, line.speaker) for line in draft.dialogue)
+
+            on_draft = speculate
+
+        # Call the LLM with improved error handling
+        try:
+            if use_streaming:
+                dialogue_stream = generate_script_stream(modified_system_prompt, text, output_model, llm_platform, on_draft)
             else:
-                speaker = f"**{llm_output.name_of_guest}**: {line.text}"
-            transcript += speaker + "\n\n"
-            total_characters += len(line.text)
+                llm_output = generate_script(modified_system_prompt, text, output_model, llm_platform, on_draft)
+                logger.info(f"Generated dialogue: {llm_output}")
+        except Exception as e:
+            logger.error(f"大模型调用失败: {str(e)}")
+            raise gr.Error(f"生成播客脚本失败: {str(e)}")
+
+        # Process the dialogue
+        audio_segments = []
+        transcript = ""
+        total_characters = 0
+    
+        report_stage("tts")
 
-            # Get audio file path with sequence number
+        # 检查是否为硅基流动TTS服务，需要批量合成
+        if tts_service == "siliconflow":
+            # 硅基流动需要一次性调用API来保持音色一致性
+            # 将所有对话内容合并成一个文本，使用标签区分不同角色
+            combined_text = ""
+            for i, line in enumerate[DialogueItem](llm_output.dialogue):
+                logger.info(f"Preparing audio for {line.speaker}: {line.text}")
+                if line.speaker == "Host (Jane)":
+                    speaker = f"**Host**: {line.text}"
+                    # 硅基流动使用[S1]标签表示主持人
+                    tts_text = f"[S1]{line.text}"
+                elif line.speaker == "Guest":
+                    speaker = f"**{llm_output.name_of_guest}**: {line.text}"
+                    # 硅基流动使用[S2]标签表示嘉宾
+                    tts_text = f"[S2]{line.text}"
+                elif line.speaker == "Guest 2":
+                    speaker = f"**{llm_output.name_of_guest} 2**: {line.text}"
+                    # 硅基流动使用[S3]标签表示第二个嘉宾
+                    tts_text = f"[S3]{line.text}"
+                elif line.speaker == "Guest 3":
+                    speaker = f"**{llm_output.name_of_guest} 3**: {line.text}"
+                    # 硅基流动使用[S4]标签表示第三个嘉宾
+                    tts_text = f"[S4]{line.text}"
+                elif line.speaker == "Guest 4":
+                    speaker = f"**{llm_output.name_of_guest} 4**: {line.text}"
+                    # 硅基流动使用[S5]标签表示第四个嘉宾
+                    tts_text = f"[S5]{line.text}"
+                else:
+                    speaker = f"**{line.speaker}**: {line.text}"
+                    # 默认使用S2标签
+                    tts_text = f"[S2]{line.text}"
+                transcript += speaker + "\n\n"
+                total_characters += len(line.text)
+                combined_text += tts_text + "\n"
+            report_partial({"transcript": transcript, "audio": []})
+        
+            # 一次性调用硅基流动TTS API合成整个对话
+            logger.info(f"Calling SiliconFlow TTS API with combined text (length: {len(combined_text)})")
             audio_file_path = generate_podcast_audio(
-                line.text, line.speaker, language_for_tts, random_voice_number, tts_service, str(podcast_temp_dir), i
+                combined_text, "Combined", language_for_tts, random_voice_number, tts_service, str(podcast_temp_dir), 0
             )
-            
-            # Add audio file path directly to the list
+        
+            # 将合成的音频文件添加到列表
             audio_segments.append(audio_file_path)
+        else:
+            # 其他TTS服务使用逐条合成的方式，按服务配置的并发上限和限流速率并发合成
+            # 结果按对话顺序返回，保证合并顺序正确
+            live_transcript = ""
 
-    # Merge all audio segments into a single podcast file using FFmpeg
-    if not audio_segments:
-        raise gr.Error("No audio files were generated")
-    
-    # Create a list file for FFmpeg concatenation
-    list_file_path = podcast_temp_dir / "audio_list.txt"
-    with open(list_file_path, 'w', encoding='utf-8') as f:
-        for audio_file in audio_segments:
-            f.write(f"file '{audio_file}'\n")
+            def announce(lines: Iterable[DialogueItem], name_of_guest: Callable[[], str]) -> Iterator[Tuple[str, str]]:
+                # 每收到一条对话就发布文字稿，再提交合成
+                nonlocal live_transcript
+                for line in lines:
+                    live_transcript += format_transcript_line(line, name_of_guest())
+                    report_partial({"transcript": live_transcript, "audio": list(audio_segments)})
+                    yield line.text, line.speaker
+
+            def synthesize(lines: Iterable[DialogueItem], name_of_guest: Callable[[], str]) -> None:
+                # 每条音频按顺序完成后立即发布，前端可以边生成边播放
+                for audio_path in iter_podcast_audio(
+                    announce(lines, name_of_guest), language_for_tts, random_voice_number, tts_service, str(podcast_temp_dir), speculation
+                ):
+                    audio_segments.append(audio_path)
+                    report_partial({"transcript": live_transcript, "audio": list(audio_segments)})
+                if speculation:
+                    # 推测合成的命中率和节省的时间随任务状态一起返回
+                    report_partial({"transcript": live_transcript, "audio": list(audio_segments), "speculation": speculation.close()})
+
+            if dialogue_stream is not None:
+                # 流式模式：每解析出一条对话就提交合成
+                try:
+                    synthesize(dialogue_stream, lambda: dialogue_stream.name_of_guest or "嘉宾")
+                    llm_output = dialogue_stream.result
+                except Exception as e:
+                    logger.error(f"流式生成播客失败: {str(e)}")
+                    raise gr.Error(f"生成播客失败: {str(e)}")
+                logger.info(f"Generated dialogue: {llm_output}")
+            else:
+                synthesize(llm_output.dialogue, lambda: llm_output.name_of_guest)
+
+            for i, line in enumerate[DialogueItem](llm_output.dialogue):
+                logger.info(f"Generated audio for {line.speaker}: {line.text}")
+                transcript += format_transcript_line(line, llm_output.name_of_guest)
+                total_characters += len(line.text)
+
+        report_stage("merge")
+        # Merge all audio segments into a single podcast file
+        if not audio_segments:
+            raise gr.Error("No audio files were generated")
     
-    # Generate merged audio file with filename+timestamp format
-    merged_audio_path = podcast_temp_dir / f"{filename_clean}_{session_id}.mp3"
+        # Generate merged audio file with filename+timestamp format
+        merged_audio_path = podcast_temp_dir / f"{filename_clean}_{session_id}.mp3"
     
-    try:
-        # Use FFmpeg to concatenate audio files with improved parameters
-        import subprocess
-        result = subprocess.run([
-            'ffmpeg', '-f', 'concat', '-safe', '0', '-i', str(list_file_path),
-            '-c', 'libmp3lame', '-q:a', '2', '-ar', '44100', '-ac', '2', str(merged_audio_path)
-        ], capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            logger.warning(f"FFmpeg concatenation failed: {result.stderr}")
-            # Fallback: Try alternative FFmpeg command
-            try:
-                result = subprocess.run([
-                    'ffmpeg', '-i', f"concat:{'|'.join(audio_segments)}",
-                    '-c', 'libmp3lame', '-q:a', '2', '-ar', '44100', '-ac', '2', str(merged_audio_path)
-                ], capture_output=True, text=True)
-                if result.returncode != 0:
-                    logger.warning(f"Alternative FFmpeg concatenation also failed: {result.stderr}")
-                    # Fallback to first audio file if both FFmpeg commands fail
-                    temporary_file = Path(audio_segments[0])
-                else:
-                    temporary_file = merged_audio_path
-                    logger.info(f"Successfully merged {len(audio_segments)} audio files into: {temporary_file}")
-            except Exception as alt_e:
-                logger.warning(f"Alternative FFmpeg command failed: {alt_e}")
-                # Fallback to first audio file if FFmpeg is not available
-                temporary_file = Path(audio_segments[0])
+        # 启用混音时解码混音（去除静音、交叉淡化、响度归一化），否则按MP3帧直接拼接（不重新编码）
+        if len(audio_segments) == 1:
+            temporary_file = Path(audio_segments[0])
         else:
-            temporary_file = merged_audio_path
-            logger.info(f"Successfully merged {len(audio_segments)} audio files into: {temporary_file}")
-            
-    except Exception as e:
-        logger.warning(f"FFmpeg not available or failed: {e}")
-        # Fallback to first audio file if FFmpeg is not available
-        temporary_file = Path(audio_segments[0])
-
-    # Clean up old podcast directories (over a day old)
-    temporary_directory = GRADIO_CACHE_DIR
-    for item in Path(temporary_directory).iterdir():
-        if item.is_dir() and "_" in item.name:  # 匹配所有包含下划线的目录（新的命名格式）
+            # 逐条合成时每段对应一条对话，只在说话人切换处交叉淡化
+            speakers = [line.speaker for line in llm_output.dialogue] if len(audio_segments) == len(llm_output.dialogue) else None
             try:
-                # Check if directory is older than GRADIO_CLEAR_CACHE_OLDER_THAN
-                if time.time() - item.stat().st_mtime > GRADIO_CLEAR_CACHE_OLDER_THAN:
-                    # Remove all files in the directory
-                    for file_in_dir in item.iterdir():
-                        if file_in_dir.is_file():
-                            file_in_dir.unlink()
-                    # Remove the directory itself
-                    item.rmdir()
-                    logger.info(f"Cleaned up old podcast directory: {item}")
-            except Exception as e:
-                logger.warning(f"Failed to clean up directory {item}: {e}")
+                method = assemble_audio(audio_segments, str(merged_audio_path), speakers)
+                temporary_file = merged_audio_path
+                logger.info(f"Successfully merged {len(audio_segments)} audio files ({method}) into: {temporary_file}")
+            except RuntimeError as e:
+                logger.warning(f"Audio merge failed: {e}")
+                # Fallback to first audio file if merging fails
+                temporary_file = Path(audio_segments[0])
 
-    logger.info(f"Generated {total_characters} characters of audio in directory: {podcast_temp_dir}")
+        logger.info(f"Generated {total_characters} characters of audio in directory: {podcast_temp_dir}")
+        logger.info(f"TTS cache stats: {get_tts_cache().stats()}")
 
-    return str(temporary_file), transcript
+        # 只缓存成功合并的完整音频（合并失败时的单段回退结果不缓存）
+        if fingerprint and (temporary_file == merged_audio_path or len(audio_segments) == 1):
+            try:
+                get_result_cache().put(fingerprint, str(temporary_file), transcript)
+            except OSError as e:
+                logger.warning(f"保存播客结果缓存失败: {e}")
+
+        return str(temporary_file), transcript
+    finally:
+        if speculation:
+            # 等待已开始的推测合成写完，再允许清理任务目录
+            speculation.shutdown()
+        get_cache_janitor().unpin(podcast_temp_dir)
 
 
 def clear_cache() -> str:
-    """手动清理所有缓存文件"""
-    cache_dir = Path(GRADIO_CACHE_DIR)
-    if cache_dir.exists():
-        try:
-            # 删除整个缓存目录
-            shutil.rmtree(cache_dir)
-            # 重新创建空目录
-            cache_dir.mkdir(parents=True, exist_ok=True)
-            logger.info("手动清理缓存成功")
-            return "✅ 缓存清理完成！所有临时MP3文件已删除。"
-        except Exception as e:
-            logger.error(f"清理缓存失败: {e}")
-            return f"❌ 缓存清理失败: {str(e)}"
-    else:
+    """手动清理所有缓存文件（进行中任务的目录除外）"""
+    if not Path(GRADIO_CACHE_DIR).exists():
         return "ℹ️ 缓存目录不存在，无需清理。"
+    try:
+        removed, skipped = get_cache_janitor().clear()
+    except Exception as e:
+        logger.error(f"清理缓存失败: {e}")
+        return f"❌ 缓存清理失败: {str(e)}"
+    logger.info(f"手动清理缓存成功: 删除 {removed} 个目录，跳过 {skipped} 个进行中的任务目录")
+    if skipped:
+        return f"✅ 缓存清理完成！已删除 {removed} 个任务目录，{skipped} 个进行中的任务目录已保留。"
+    return "✅ 缓存清理完成！所有临时MP3文件已删除。"
 
 
-demo = gr.Interface(
-    title=APP_TITLE,
-    description=UI_DESCRIPTION,
-    fn=generate_podcast,
-    inputs=[
-        gr.File(
-            label=UI_INPUTS["file_upload"]["label"],  # Step 1: File upload
-            file_types=UI_INPUTS["file_upload"]["file_types"],
-            file_count=UI_INPUTS["file_upload"]["file_count"],
-        ),
-        gr.Textbox(
-            label=UI_INPUTS["url"]["label"],  # Step 2: URL
-            placeholder=UI_INPUTS["url"]["placeholder"],
-        ),
-        gr.Textbox(label=UI_INPUTS["question"]["label"]),  # Step 3: Question
-        gr.Dropdown(
-            label=UI_INPUTS["tone"]["label"],  # Step 4: Tone
-            choices=UI_INPUTS["tone"]["choices"],
-            value=UI_INPUTS["tone"]["value"],
-        ),
-        gr.Dropdown(
-            label=UI_INPUTS["length"]["label"],  # Step 5: Length
-            choices=UI_INPUTS["length"]["choices"],
-            value=UI_INPUTS["length"]["value"],
-        ),
-        gr.Dropdown(
-            choices=UI_INPUTS["language"]["choices"],  # Step 6: Language
-            value=UI_INPUTS["language"]["value"],
-            label=UI_INPUTS["language"]["label"],
-        ),
-        gr.Dropdown(
-            label=UI_INPUTS["llm_platform"]["label"],  # Step 7: LLM Platform
-            choices=UI_INPUTS["llm_platform"]["choices"],
-            value=UI_INPUTS["llm_platform"]["value"],
-        ),
-        gr.Dropdown(
-            label=UI_INPUTS["tts_service"]["label"],  # Step 8: TTS Service
-            choices=UI_INPUTS["tts_service"]["choices"],
-            value=UI_INPUTS["tts_service"]["value"],
-        ),
-    ],
-    outputs=[
-        gr.Audio(
-            label=UI_OUTPUTS["audio"]["label"], format=UI_OUTPUTS["audio"]["format"]
-        ),
-        gr.Markdown(label=UI_OUTPUTS["transcript"]["label"]),
-    ],
-    allow_flagging=UI_ALLOW_FLAGGING,
-    api_name=UI_API_NAME,
-    theme=gr.themes.Ocean(),
-    concurrency_limit=UI_CONCURRENCY_LIMIT,
-    examples=UI_EXAMPLES,
-    cache_examples=UI_CACHE_EXAMPLES,
-)
+# Web前端的任务队列/调度器（懒加载：工作进程和文档解析子进程导入本模块时不创建）
+podcast_jobs = None
+podcast_jobs_lock = threading.Lock()
+
+
+def get_podcast_jobs() -> Any:
+    """获取Web前端使用的任务队列（SQLiteJobQueue）或进程内任务调度器（JobScheduler）"""
+    global podcast_jobs
+    if podcast_jobs is None:
+        with podcast_jobs_lock:
+            if podcast_jobs is None:
+                if JOB_QUEUE_BACKEND == "sqlite":
+                    # 持久化任务队列：Web进程只负责入队，由 worker.py 启动的工作进程执行生成流程
+                    podcast_jobs = SQLiteJobQueue(
+                        JOB_QUEUE_DB,
+                        visibility_timeout=JOB_QUEUE_VISIBILITY_TIMEOUT,
+                        max_attempts=JOB_QUEUE_MAX_ATTEMPTS,
+                        retry_delay=JOB_QUEUE_RETRY_DELAY,
+                        max_retained=JOB_MAX_RETAINED,
+                    )
+                else:
+                    # 进程内任务调度器：真正执行生成流程的并发数由UI_CONCURRENCY_LIMIT控制
+                    podcast_jobs = JobScheduler(generate_podcast, max_workers=UI_CONCURRENCY_LIMIT, max_retained=JOB_MAX_RETAINED)
+    return podcast_jobs
+
+
+def submit_podcast_job(
+    files: List[str],
+    url: Optional[str],
+    question: Optional[str],
+    tone: Optional[str],
+    length: Optional[str],
+    language: str,
+    llm_platform: str,
+    tts_service: str,
+    force_regenerate: bool = False,
+) -> str:
+    """提交播客生成任务，立即返回任务ID"""
+    if JOB_QUEUE_BACKEND == "sqlite":
+        # Gradio的上传临时文件只在本机可见，复制到共享目录供工作进程读取
+        files = stage_uploads(files, JOB_QUEUE_UPLOAD_DIR)
+    return get_podcast_jobs().submit(files, url, question, tone, length, language, llm_platform, tts_service, force_regenerate)
+
+
+def get_podcast_job_status(job_id: str) -> Dict[str, Any]:
+    """查询任务状态和各阶段进度"""
+    try:
+        return get_podcast_jobs().status(job_id)
+    except KeyError as e:
+        raise gr.Error(str(e))
+
+
+def fetch_podcast_job_result(job_id: str) -> Tuple[str, str]:
+    """获取已完成任务的音频和文字稿"""
+    status = get_podcast_job_status(job_id)
+    if status["status"] == JOB_FAILED:
+        raise gr.Error(status["error"])
+    if status["status"] != JOB_SUCCEEDED:
+        raise gr.Error(f"任务尚未完成: {job_id} ({status['status']})")
+    return get_podcast_jobs().result(job_id)
+
+
+def stream_podcast_job(
+    files: List[str],
+    url: Optional[str],
+    question: Optional[str],
+    tone: Optional[str],
+    length: Optional[str],
+    language: str,
+    llm_platform: str,
+    tts_service: str,
+    force_regenerate: bool = False,
+    progress: gr.Progress = gr.Progress(),
+) -> Iterator[Tuple[Optional[str], Optional[str], str]]:
+    """
+    Gradio界面（流式）：提交任务并轮询进度直到完成（等待期间不占用生成流程的并发名额）
+
+    生成过程中逐条推送文字稿和已合成的对话音频（边生成边播放），完成后输出合并后的完整音频。
+
+    Yields:
+        (新完成的一段音频或None, 完整音频或None, 当前文字稿)
+    """
+    # 相同请求已有结果时直接返回，无需提交任务
+    if not force_regenerate:
+        fingerprint = get_request_fingerprint(files, url, question, tone, length, language, llm_platform, tts_service)
+        cached = get_result_cache().get(fingerprint) if fingerprint else None
+        if cached:
+            audio, transcript = cached
+            yield None, audio, transcript
+            return
+
+    job_id = submit_podcast_job(files, url, question, tone, length, language, llm_platform, tts_service, force_regenerate)
+    transcript = ""
+    streamed = 0
+    while True:
+        status = get_podcast_jobs().poll(job_id, JOB_POLL_INTERVAL)
+        if status["status"] == JOB_FAILED:
+            raise gr.Error(status["error"])
+        partial = status["partial"]
+        if partial:
+            # 流式音频每次只能推送一段，两次轮询之间完成的多段依次推送
+            for audio_path in partial["audio"][streamed:]:
+                transcript = partial["transcript"]
+                yield audio_path, None, transcript
+            streamed = len(partial["audio"])
+            if partial["transcript"] != transcript:
+                transcript = partial["transcript"]
+                yield None, None, transcript
+        if status["status"] == JOB_SUCCEEDED:
+            audio, transcript = get_podcast_jobs().result(job_id)
+            yield None, audio, transcript
+            return
+        if status["stage"] in JOB_STAGES:
+            progress(JOB_STAGES.index(status["stage"]) / len(JOB_STAGES), desc=JOB_STAGE_LABELS[status["stage"]])
+
+
+def run_podcast_job(
+    files: List[str],
+    url: Optional[str],
+    question: Optional[str],
+    tone: Optional[str],
+    length: Optional[str],
+    language: str,
+    llm_platform: str,
+    tts_service: str,
+    force_regenerate: bool = False,
+    progress: gr.Progress = gr.Progress(),
+) -> Tuple[str, str]:
+    """Gradio前端：提交任务并轮询进度直到完成，只返回完整音频和文字稿（兼容原有的两项输出接口）"""
+    for _, audio, transcript in stream_podcast_job(
+        files, url, question, tone, length, language, llm_platform, tts_service, force_regenerate, progress
+    ):
+        pass
+    return audio, transcript
+
+
+def build_demo() -> gr.Interface:
+    """构建Gradio界面（只在启动Web服务时调用，导入本模块不会构建界面）"""
+    demo = gr.Interface(
+        title=APP_TITLE,
+        description=UI_DESCRIPTION,
+        fn=stream_podcast_job,
+        inputs=[
+            gr.File(
+                label=UI_INPUTS["file_upload"]["label"],  # Step 1: File upload
+                file_types=UI_INPUTS["file_upload"]["file_types"],
+                file_count=UI_INPUTS["file_upload"]["file_count"],
+            ),
+            gr.Textbox(
+                label=UI_INPUTS["url"]["label"],  # Step 2: URL
+                placeholder=UI_INPUTS["url"]["placeholder"],
+                lines=UI_INPUTS["url"]["lines"],
+            ),
+            gr.Textbox(label=UI_INPUTS["question"]["label"]),  # Step 3: Question
+            gr.Dropdown(
+                label=UI_INPUTS["tone"]["label"],  # Step 4: Tone
+                choices=UI_INPUTS["tone"]["choices"],
+                value=UI_INPUTS["tone"]["value"],
+            ),
+            gr.Dropdown(
+                label=UI_INPUTS["length"]["label"],  # Step 5: Length
+                choices=UI_INPUTS["length"]["choices"],
+                value=UI_INPUTS["length"]["value"],
+            ),
+            gr.Dropdown(
+                choices=UI_INPUTS["language"]["choices"],  # Step 6: Language
+                value=UI_INPUTS["language"]["value"],
+                label=UI_INPUTS["language"]["label"],
+            ),
+            gr.Dropdown(
+                label=UI_INPUTS["llm_platform"]["label"],  # Step 7: LLM Platform
+                choices=UI_INPUTS["llm_platform"]["choices"],
+                value=UI_INPUTS["llm_platform"]["value"],
+            ),
+            gr.Dropdown(
+                label=UI_INPUTS["tts_service"]["label"],  # Step 8: TTS Service
+                choices=UI_INPUTS["tts_service"]["choices"],
+                value=UI_INPUTS["tts_service"]["value"],
+            ),
+            gr.Checkbox(
+                label=UI_INPUTS["force_regenerate"]["label"],  # Step 9: Force regenerate
+                value=UI_INPUTS["force_regenerate"]["value"],
+            ),
+        ],
+        outputs=[
+            gr.Audio(
+                label=UI_OUTPUTS["live_audio"]["label"],
+                format=UI_OUTPUTS["live_audio"]["format"],
+                streaming=True,
+                autoplay=UI_OUTPUTS["live_audio"]["autoplay"],
+            ),
+            gr.Audio(
+                label=UI_OUTPUTS["audio"]["label"], format=UI_OUTPUTS["audio"]["format"]
+            ),
+            gr.Markdown(label=UI_OUTPUTS["transcript"]["label"]),
+        ],
+        allow_flagging=UI_ALLOW_FLAGGING,
+        api_name=UI_STREAM_API_NAME,
+        theme=gr.themes.Ocean(),
+        concurrency_limit=UI_JOB_CONCURRENCY_LIMIT,
+        examples=UI_EXAMPLES,
+        cache_examples=UI_CACHE_EXAMPLES,
+    )
+
+    # 非流式接口（原有的两项输出）和任务API：提交 / 查询 / 获取结果
+    with demo:
+        job_id_input = gr.Textbox(visible=False)
+        job_id_output = gr.Textbox(visible=False)
+        job_status_output = gr.JSON(visible=False)
+        job_audio_output = gr.Audio(visible=False, format=UI_OUTPUTS["audio"]["format"])
+        job_transcript_output = gr.Markdown(visible=False)
+        gr.Button(visible=False).click(
+            run_podcast_job,
+            inputs=demo.input_components,
+            outputs=[job_audio_output, job_transcript_output],
+            api_name=UI_API_NAME,
+            concurrency_limit=UI_JOB_CONCURRENCY_LIMIT,
+        )
+        gr.Button(visible=False).click(
+            submit_podcast_job, inputs=demo.input_components, outputs=job_id_output, api_name=UI_JOB_API_NAMES["submit"]
+        )
+        gr.Button(visible=False).click(
+            get_podcast_job_status, inputs=job_id_input, outputs=job_status_output, api_name=UI_JOB_API_NAMES["status"]
+        )
+        gr.Button(visible=False).click(
+            fetch_podcast_job_result, inputs=job_id_input, outputs=[job_audio_output, job_transcript_output], api_name=UI_JOB_API_NAMES["result"]
+        )
+    return demo
+
 
 if __name__ == "__main__":
-    demo.launch(show_api=UI_SHOW_API)
\ No newline at end of file
+    # 预先建立到各API域名的连接，缩短首个请求的延迟
+    warm_up()
+    warm_up_extraction_pool()
+    cache_janitor = get_cache_janitor()
+    if get_result_cache() is not None:
+        cache_janitor.add_task(get_result_cache().purge_expired)
+    cache_janitor.start()
+    start_metrics_server(METRICS_PORT, METRICS_HOST)
+    build_demo().launch(show_api=UI_SHOW_API)
\ No newline at end of file
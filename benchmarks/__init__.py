@@ -0,0 +1,5 @@
+"""
+离线基准测试
+
+包含本地替身大模型/TTS客户端（mocks）和端到端基准测试入口（run）。
+"""
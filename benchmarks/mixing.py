@@ -0,0 +1,111 @@
+"""
+音频合并基准测试
+
+生成一组带首尾静音的合成语音分段（单声道MP3），比较整期播客的三种合并方式：
+- ffmpeg：原先的FFmpeg concat + libmp3lame 重新编码（-ar 44100 -ac 2）
+- frames：MP3帧级拼接（tts/mp3.py，不重新编码）
+- mix：NumPy混音（tts/mixing.py，去除静音、交叉淡化、响度归一化后统一编码）
+
+需要安装FFmpeg（生成分段、ffmpeg和mix方式都依赖它）。
+
+用法：
+    python -m benchmarks.mixing
+    python -m benchmarks.mixing --segments 50 --seconds 8 --repeat 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from pydub import AudioSegment
+
+from tts.mixing import load_pcm, mix_segments, save_mp3
+from tts.mp3 import concat_mp3
+
+SAMPLE_RATE = 24000
+
+
+def make_segments(work_dir: Path, count: int, seconds: float, seed: int = 42) -> List[str]:
+    """生成近似语音的分段：调幅的谐波信号，首尾各带0.2~0.8秒静音，响度逐段不同"""
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(count):
+        t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+        pitch = 120 if i % 2 == 0 else 210
+        voice = sum(np.sin(2 * np.pi * pitch * h * t) / h for h in range(1, 6))
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)
+        speech = voice * envelope * rng.uniform(0.05, 0.3)
+        lead, tail = (np.zeros(int(SAMPLE_RATE * rng.uniform(0.2, 0.8))) for _ in range(2))
+        samples = np.concatenate([lead, speech, tail]).astype(np.float32)[:, None]
+        paths.append(save_mp3(samples, SAMPLE_RATE, str(work_dir / f"segment_{i}.mp3"), "48k"))
+    return paths
+
+
+def ffmpeg_concat(paths: List[str], output_path: str) -> None:
+    """原先的合并方式：concat demuxer后重新编码为44.1kHz立体声"""
+    list_file = Path(output_path).with_suffix(".txt")
+    list_file.write_text("".join(f"file '{Path(path).resolve()}'\n" for path in paths), encoding="utf-8")
+    subprocess.run([
+        "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", str(list_file),
+        "-c", "libmp3lame", "-q:a", "2", "-ar", "44100", "-ac", "2", output_path
+    ], capture_output=True, check=True)
+
+
+def measure(merge: Callable[[List[str], str], object], paths: List[str], output_path: str, repeat: int) -> Dict[str, float]:
+    """多次运行合并，返回耗时统计和输出文件信息"""
+    durations = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        merge(paths, output_path)
+        durations.append(time.perf_counter() - started_at)
+    samples, sample_rate = load_pcm(output_path)
+    return {
+        "mean_seconds": statistics.mean(durations),
+        "min_seconds": min(durations),
+        "output_bytes": Path(output_path).stat().st_size,
+        "output_audio_seconds": len(samples) / sample_rate,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="比较FFmpeg重新编码、MP3帧级拼接和NumPy混音的合并耗时")
+    parser.add_argument("--segments", type=int, default=24, help="分段数（对话条数）")
+    parser.add_argument("--seconds", type=float, default=6.0, help="每段语音时长，单位秒")
+    parser.add_argument("--repeat", type=int, default=3, help="每种方式重复次数")
+    parser.add_argument("--output", type=Path, default=None, help="将结果写入JSON文件")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="mixing_bench_") as work_dir:
+        work_dir = Path(work_dir)
+        paths = make_segments(work_dir, args.segments, args.seconds)
+        speakers = ["Host (Jane)" if i % 2 == 0 else "Guest" for i in range(len(paths))]
+        input_seconds = sum(AudioSegment.from_file(path).duration_seconds for path in paths)
+
+        results = {
+            "ffmpeg": measure(ffmpeg_concat, paths, str(work_dir / "ffmpeg.mp3"), args.repeat),
+            "frames": measure(concat_mp3, paths, str(work_dir / "frames.mp3"), args.repeat),
+            "mix": measure(lambda p, o: mix_segments(p, o, speakers), paths, str(work_dir / "mix.mp3"), args.repeat),
+        }
+
+    print(f"{args.segments} 段，输入音频共 {input_seconds:.1f} 秒")
+    print(f"{'方式':<8}{'均值(s)':>10}{'最小(s)':>10}{'输出(KB)':>12}{'输出时长(s)':>14}")
+    for method, result in results.items():
+        print(
+            f"{method:<8}{result['mean_seconds']:>10.3f}{result['min_seconds']:>10.3f}"
+            f"{result['output_bytes'] / 1024:>12.1f}{result['output_audio_seconds']:>14.1f}"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+基准测试用的本地替身客户端
+
+包含MockLLMClient和MockTTSClient：不访问网络，按配置模拟延迟、抖动和失败率，
+输出确定性的对话和真实的（静音）MP3文件。通过 register_mocks 注册到客户端工厂。
+"""
+
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from llm import LLMClient, LLMClientFactory
+from metrics import RETRIES
+from schema import ChunkNotes, DialoguePatch, LongDialogue, MediumDialogue
+from tts import TTSClient, TTSClientFactory
+from tts.synthetic import write_silent_mp3
+
+# 各对话结构生成的对话条数
+DIALOGUE_ITEMS = {"ShortDialogue": 13, "MediumDialogue": 24, "LongDialogue": 50}
+
+MOCK_LLM_CONFIG = {
+    "latency": 0.5,        # 每次调用的基础延迟，单位秒
+    "latency_per_char": 0.0,  # 每个输出字符增加的延迟（模拟按输出token计时的解码耗时）
+    "jitter": 0.1,         # 延迟抖动（均匀分布 ±jitter）
+    "patch_edit_ratio": 0.25,  # 按补丁改进时修改的对话项比例
+    "failure_rate": 0.0,   # 单次请求失败的概率
+    "retry_attempts": 3,
+    "retry_delay": 0.1,
+    "seed": 42,
+}
+
+MOCK_TTS_CONFIG = {
+    "latency": 0.2,
+    "jitter": 0.05,
+    "failure_rate": 0.0,
+    "retry_attempts": 3,
+    "retry_delay": 0.1,
+    "seed": 42,
+    "chars_per_second": 5.0,  # 输出音频时长 = 字符数 / chars_per_second
+    "max_concurrency": 4,
+    "rate_limit": 0.0,
+}
+
+
+class _MockBehaviour:
+    """模拟延迟、抖动和失败（随机数按种子确定，线程安全）"""
+
+    def __init__(self, config: Dict[str, Any], component: str):
+        self.config = config
+        self.component = component
+        self._random = random.Random(config.get("seed"))
+        self._lock = threading.Lock()
+
+    def call(self, extra_latency: float = 0.0) -> None:
+        """模拟一次远程调用，失败时按配置重试，重试用尽后抛出异常"""
+        attempts = self.config["retry_attempts"]
+        for attempt in range(attempts):
+            with self._lock:
+                delay = self.config["latency"] + extra_latency + self._random.uniform(-self.config["jitter"], self.config["jitter"])
+                failed = self._random.random() < self.config["failure_rate"]
+            time.sleep(max(0.0, delay))
+            if not failed:
+                return
+            if attempt == attempts - 1:
+                raise Exception(f"{self.component} 模拟调用失败")
+            RETRIES.inc(component=self.component)
+            time.sleep(self.config["retry_delay"])
+
+
+class MockLLMClient(LLMClient):
+    """本地大模型替身：根据输入文本确定性地生成笔记或对话"""
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__({**MOCK_LLM_CONFIG, **config})
+        self._behaviour = _MockBehaviour(self.config, "llm_mock")
+
+    def generate(self, system_prompt: str, user_prompt: str, response_format: Any) -> Any:
+        if response_format is ChunkNotes:
+            result = ChunkNotes(notes=user_prompt[:500])
+        elif response_format is DialoguePatch:
+            result = self._generate_patch(system_prompt)
+        else:
+            result = self._generate_dialogue(system_prompt, user_prompt, response_format)
+        self._behaviour.call(len(result.model_dump_json()) * self.config["latency_per_char"])
+        return result
+
+    def _generate_patch(self, system_prompt: str) -> DialoguePatch:
+        """按编号的初稿（"[序号] 说话者: 文本"）确定性地替换一部分对话项"""
+        lines = re.findall(r"^\[(\d+)\] ([^:]+): (.*)$", system_prompt, flags=re.MULTILINE)
+        step = max(1, round(1 / self.config["patch_edit_ratio"])) if self.config["patch_edit_ratio"] > 0 else 0
+        edits = [
+            {"op": "replace", "index": int(index), "text": f"{text}（改进）"}
+            for index, _, text in lines[::step]
+        ] if step else []
+        return DialoguePatch.model_validate({"edits": edits})
+
+    def _generate_dialogue(self, system_prompt: str, user_prompt: str, response_format: Any) -> Any:
+        sentences = [s for s in re.split(r"(?<=[。！？.!?])\s*", f"{user_prompt}\n{system_prompt}") if len(s.strip()) > 5]
+        sentences = sentences or ["这是一段用于基准测试的对话内容。"]
+        seed = int(hashlib.sha256((system_prompt + user_prompt).encode("utf-8")).hexdigest()[:8], 16)
+        rng = random.Random(seed)
+        count = DIALOGUE_ITEMS.get(getattr(response_format, "__name__", ""), DIALOGUE_ITEMS["MediumDialogue"])
+        speakers = ["Host (Jane)", "Guest"]
+        if response_format is LongDialogue:
+            speakers += ["Guest 2"]
+        dialogue = []
+        for i in range(count):
+            text = " ".join(rng.choice(sentences).strip() for _ in range(2))[:160]
+            dialogue.append({"speaker": speakers[i % len(speakers)], "text": text})
+        model = response_format if hasattr(response_format, "model_validate") else MediumDialogue
+        return model.model_validate({"scratchpad": "基准测试", "name_of_guest": "嘉宾", "dialogue": dialogue})
+
+
+class MockTTSClient(TTSClient):
+    """本地TTS替身：按字符数生成对应时长的静音MP3"""
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__({**MOCK_TTS_CONFIG, **config})
+        self._behaviour = _MockBehaviour(self.config, "tts_mock")
+
+    def synthesize(self, text: str, speaker: str, language: str, output_dir: Optional[str] = None, sequence_number: Optional[int] = None) -> str:
+        self._behaviour.call()
+        if sequence_number is not None:
+            filename = f"mock_audio_{speaker}_{sequence_number}.mp3"
+        else:
+            filename = f"mock_audio_{speaker}_{hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]}.mp3"
+        filename = re.sub(r"[^\w\-.]", "_", filename)
+        file_path = os.path.join(output_dir, filename) if output_dir else filename
+        return write_silent_mp3(file_path, len(text) / self.config["chars_per_second"])
+
+
+def register_mocks(llm_config: Optional[Dict[str, Any]] = None, tts_config: Optional[Dict[str, Any]] = None) -> List[str]:
+    """将替身注册为大模型平台 "mock" 和TTS服务 "mock"，返回注册的名称"""
+    from constants import LLM_PLATFORMS
+    from tts import TTS_SERVICES
+
+    LLM_PLATFORMS["mock"] = {**MOCK_LLM_CONFIG, **(llm_config or {})}
+    TTS_SERVICES["mock"] = {**MOCK_TTS_CONFIG, **(tts_config or {})}
+    LLMClientFactory.register("mock", MockLLMClient)
+    TTSClientFactory.register("mock", MockTTSClient)
+    return ["mock"]
@@ -0,0 +1,104 @@
+"""
+改进对话基准测试
+
+使用本地替身大模型（延迟随输出字符数增加，模拟按输出token计时的解码耗时），
+比较改进对话的两种方式：
+- full：重新生成整篇对话（原先的方式）
+- patch：只返回逐条修改并应用到初稿
+
+报告两种方式的输出字符数（近似输出token数）和改进阶段的耗时。
+
+用法：
+    python -m benchmarks.refine
+    python -m benchmarks.refine --lengths long --latency-per-char 0.01 --edit-ratio 0.5
+"""
+
+import os
+
+# 每次都要真实调用替身大模型，关闭大模型响应缓存
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from metrics import LLM_REFINE_PATCHES, LLM_RESPONSE_CHARACTERS
+from prompts import LENGTH_MODIFIERS, SYSTEM_PROMPT
+from schema import LongDialogue, MediumDialogue, ShortDialogue
+from utils import call_llm, refine_dialogue
+from .mocks import register_mocks
+
+LENGTHS = {
+    "short": ("短 (1-2分钟)", ShortDialogue),
+    "medium": ("中 (3-5分钟)", MediumDialogue),
+    "long": ("长 (15-20分钟)", LongDialogue),
+}
+INPUT_TEXT = "这是一段用于基准测试的输入文本。它介绍了一个新的研究成果。研究人员提出了更快的方法！效果如何？" * 20
+MODE_STAGES = {"full": "refine", "patch": "refine_patch"}
+
+
+def measure(mode: str, system_prompt: str, draft: Any, output_model: Any, repeat: int) -> Dict[str, float]:
+    """多次改进同一份初稿，返回平均耗时和每次的输出字符数"""
+    durations = []
+    characters = []
+    fallbacks = LLM_REFINE_PATCHES.value(platform="mock", result="fallback")
+    for _ in range(repeat):
+        before = {stage: LLM_RESPONSE_CHARACTERS.value(platform="mock", stage=stage) for stage in MODE_STAGES.values()}
+        started_at = time.perf_counter()
+        refine_dialogue(system_prompt, draft, output_model, "mock", mode=mode)
+        durations.append(time.perf_counter() - started_at)
+        # 补丁无效回退时两次调用的输出都计入
+        characters.append(sum(LLM_RESPONSE_CHARACTERS.value(platform="mock", stage=stage) - before[stage] for stage in before))
+    return {
+        "mean_seconds": statistics.mean(durations),
+        "output_characters": statistics.mean(characters),
+        "fallbacks": LLM_REFINE_PATCHES.value(platform="mock", result="fallback") - fallbacks,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="比较重新生成整篇对话和按补丁改进对话的输出量与耗时")
+    parser.add_argument("--lengths", nargs="+", default=["short", "medium"], choices=list(LENGTHS), help="对话长度")
+    parser.add_argument("--repeat", type=int, default=2, help="每种方式重复次数")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="每次调用的基础延迟，单位秒")
+    parser.add_argument("--latency-per-char", type=float, default=0.002, help="每个输出字符增加的延迟，单位秒")
+    parser.add_argument("--edit-ratio", type=float, default=0.25, help="补丁修改的对话项比例")
+    parser.add_argument("--output", type=Path, default=None, help="将结果写入JSON文件")
+    args = parser.parse_args(argv)
+
+    register_mocks({
+        "latency": args.llm_latency,
+        "latency_per_char": args.latency_per_char,
+        "jitter": 0.0,
+        "patch_edit_ratio": args.edit_ratio,
+    })
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for length in args.lengths:
+        label, output_model = LENGTHS[length]
+        system_prompt = f"{SYSTEM_PROMPT}\n\n{LENGTH_MODIFIERS[label]}"
+        draft = call_llm(system_prompt, INPUT_TEXT, output_model, "mock", stage="draft")
+        print(f"运行 {length}（初稿 {len(draft.dialogue)} 条对话）...", file=sys.stderr)
+        results[length] = {mode: measure(mode, system_prompt, draft, output_model, args.repeat) for mode in MODE_STAGES}
+
+    print(f"{'长度':<8}{'方式':<8}{'输出字符':>10}{'耗时(s)':>10}{'回退':>6}")
+    for length, modes in results.items():
+        for mode, result in modes.items():
+            print(f"{length:<8}{mode:<8}{result['output_characters']:>10.0f}{result['mean_seconds']:>10.3f}{result['fallbacks']:>6.0f}")
+        full, patch = modes["full"], modes["patch"]
+        print(
+            f"{length:<8}{'节省':<8}{1 - patch['output_characters'] / full['output_characters']:>10.0%}"
+            f"{1 - patch['mean_seconds'] / full['mean_seconds']:>10.0%}"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+离线端到端基准测试
+
+使用本地替身（benchmarks/mocks.py）代替远程大模型和TTS服务，端到端运行
+generate_podcast，统计各阶段耗时和不同并发数下的吞吐量，并与保存的基线对比。
+
+用法：
+    python -m benchmarks.run                      # 运行并与基线对比，出现回退时退出码为1
+    python -m benchmarks.run --update-baseline    # 运行并覆盖基线
+    python -m benchmarks.run --scenarios pdf --concurrency 1 4 --llm-failure-rate 0.1
+"""
+
+import os
+
+# 基准测试测量的是完整流程，关闭各级缓存（可通过环境变量覆盖）
+for _cache_env in ("RESULT_CACHE_ENABLED", "LLM_CACHE_ENABLED", "TTS_CACHE_ENABLED", "EXTRACTION_CACHE_ENABLED", "URL_CACHE_ENABLED"):
+    os.environ.setdefault(_cache_env, "false")
+
+import argparse
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from constants import HIERARCHICAL_THRESHOLD
+from jobs import JOB_STAGES
+from tts.synthetic import MP3_FRAME_BYTES, MP3_FRAME_SECONDS
+from .mocks import register_mocks
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline.json"
+EXAMPLE_PDF = BENCHMARK_DIR.parent / "examples" / "1310.4546v1.pdf"
+
+# 与基线对比的指标：(指标名, 越大越好)
+COMPARED_METRICS = [("mean_job_seconds", False), ("p95_job_seconds", False), ("jobs_per_minute", True)]
+
+
+def _synthetic_text(characters: int) -> str:
+    """生成确定性的长文本，用于触发分块总结"""
+    paragraph = (
+        "第{0}节：本节讨论分布式表示在自然语言处理中的作用。词向量能够捕捉语义和句法上的相似性。"
+        "实验表明，负采样和高频词下采样可以显著加快训练速度。短语的向量表示同样可以通过简单的方法学习。\n"
+    )
+    parts = []
+    total = 0
+    index = 0
+    while total < characters:
+        index += 1
+        part = paragraph.format(index)
+        parts.append(part)
+        total += len(part)
+    return "".join(parts)[:characters]
+
+
+def build_scenarios(work_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """构造测试场景：示例PDF（短对话）和超长合成文本（分块总结 + 中等长度对话）"""
+    large_path = work_dir / "synthetic_large.txt"
+    large_path.write_text(_synthetic_text(HIERARCHICAL_THRESHOLD * 3), encoding="utf-8")
+    return {
+        "pdf": {"files": [str(EXAMPLE_PDF)], "length": "短 (1-2分钟)"},
+        "large": {"files": [str(large_path)], "length": "中 (3-5分钟)"},
+    }
+
+
+def run_job(generate: Callable[..., Any], scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """运行一次生成流程，返回总耗时、各阶段耗时和输出音频时长"""
+    stages: Dict[str, float] = {}
+    current = {"stage": None, "started_at": 0.0}
+
+    def progress(stage: str) -> None:
+        now = time.perf_counter()
+        if current["stage"]:
+            stages[current["stage"]] = now - current["started_at"]
+        current.update(stage=stage, started_at=now)
+
+    started_at = time.perf_counter()
+    try:
+        audio_path, _ = generate(
+            scenario["files"], "", "", "有趣", scenario["length"], "中文", "mock", "mock", True, progress=progress
+        )
+    except Exception as e:
+        return {"ok": False, "error": getattr(e, "message", None) or str(e)}
+    finished_at = time.perf_counter()
+    if current["stage"]:
+        stages[current["stage"]] = finished_at - current["started_at"]
+
+    audio_bytes = Path(audio_path).stat().st_size
+    shutil.rmtree(Path(audio_path).parent, ignore_errors=True)
+    return {
+        "ok": True,
+        "seconds": finished_at - started_at,
+        "stages": stages,
+        "audio_seconds": audio_bytes / MP3_FRAME_BYTES * MP3_FRAME_SECONDS,
+    }
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(percentile * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def run_level(generate: Callable[..., Any], scenario: Dict[str, Any], concurrency: int, jobs: int) -> Dict[str, Any]:
+    """以指定并发数运行若干任务并汇总"""
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: run_job(generate, scenario), range(jobs)))
+    wall_seconds = time.perf_counter() - started_at
+
+    succeeded = [result for result in results if result["ok"]]
+    summary: Dict[str, Any] = {
+        "jobs": jobs,
+        "failed": jobs - len(succeeded),
+        "wall_seconds": wall_seconds,
+        "jobs_per_minute": len(succeeded) / wall_seconds * 60,
+    }
+    if succeeded:
+        job_seconds = [result["seconds"] for result in succeeded]
+        summary.update(
+            mean_job_seconds=statistics.mean(job_seconds),
+            p95_job_seconds=_percentile(job_seconds, 0.95),
+            audio_seconds_per_wall_second=sum(result["audio_seconds"] for result in succeeded) / wall_seconds,
+            stages={
+                stage: statistics.mean(result["stages"].get(stage, 0.0) for result in succeeded)
+                for stage in JOB_STAGES
+            },
+        )
+    errors = sorted({result["error"] for result in results if not result["ok"]})
+    if errors:
+        summary["errors"] = errors
+    return summary
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """与基线对比，返回超出容差的回退项"""
+    regressions = []
+    for key, summary in results.items():
+        expected = baseline.get(key)
+        if not expected:
+            continue
+        if summary["failed"] > expected.get("failed", 0):
+            regressions.append(f"{key}: 失败任务数 {summary['failed']} > 基线 {expected.get('failed', 0)}")
+        for metric, higher_is_better in COMPARED_METRICS:
+            if metric not in summary or metric not in expected:
+                continue
+            actual, reference = summary[metric], expected[metric]
+            if higher_is_better and actual < reference * (1 - tolerance):
+                regressions.append(f"{key}: {metric} {actual:.2f} < 基线 {reference:.2f}")
+            elif not higher_is_better and actual > reference * (1 + tolerance):
+                regressions.append(f"{key}: {metric} {actual:.2f} > 基线 {reference:.2f}")
+    return regressions
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    header = f"{'场景/并发':<12}{'任务':>6}{'失败':>6}{'均值(s)':>10}{'P95(s)':>10}{'任务/分':>10}{'音频秒/秒':>10}  " + \
+        "  ".join(f"{stage}(s)" for stage in JOB_STAGES)
+    print(header)
+    for key, summary in results.items():
+        stages = summary.get("stages", {})
+        print(
+            f"{key:<12}{summary['jobs']:>6}{summary['failed']:>6}"
+            f"{summary.get('mean_job_seconds', float('nan')):>10.2f}{summary.get('p95_job_seconds', float('nan')):>10.2f}"
+            f"{summary['jobs_per_minute']:>10.1f}{summary.get('audio_seconds_per_wall_second', 0.0):>10.1f}  "
+            + "  ".join(f"{stages.get(stage, 0.0):>{len(stage) + 3}.2f}" for stage in JOB_STAGES)
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="离线端到端基准测试（本地替身大模型和TTS）")
+    parser.add_argument("--scenarios", nargs="+", default=["pdf", "large"], help="运行的场景")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4], help="并发数列表")
+    parser.add_argument("--jobs", type=int, default=None, help="每个并发级别的任务数（默认为并发数的2倍）")
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--llm-jitter", type=float, default=0.1)
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--tts-latency", type=float, default=0.2)
+    parser.add_argument("--tts-jitter", type=float, default=0.05)
+    parser.add_argument("--tts-failure-rate", type=float, default=0.0)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="基线文件")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="允许的相对回退幅度")
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果覆盖基线")
+    parser.add_argument("--output", type=Path, default=None, help="将结果写入JSON文件")
+    args = parser.parse_args(argv)
+
+    register_mocks(
+        {"latency": args.llm_latency, "jitter": args.llm_jitter, "failure_rate": args.llm_failure_rate},
+        {"latency": args.tts_latency, "jitter": args.tts_jitter, "failure_rate": args.tts_failure_rate},
+    )
+    from app import generate_podcast
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="podcast-bench-") as work_dir:
+        scenarios = build_scenarios(Path(work_dir))
+        for name in args.scenarios:
+            # 预热一次（进程池启动、模块导入等），不计入结果
+            run_job(generate_podcast, scenarios[name])
+            for concurrency in args.concurrency:
+                key = f"{name}@{concurrency}"
+                jobs = args.jobs or concurrency * 2
+                print(f"运行 {key}（{jobs} 个任务）...", file=sys.stderr)
+                results[key] = run_level(generate_podcast, scenarios[name], concurrency, jobs)
+
+    print_report(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"基线已更新: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"基线文件不存在，跳过对比: {args.baseline}")
+        return 0
+    regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+    for regression in regressions:
+        print(f"回退: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
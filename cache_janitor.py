@@ -0,0 +1,239 @@
+"""
+cache_janitor.py
+
+后台缓存清理：维护 GRADIO_CACHE_DIR 下各任务目录的索引（占用字节数和最近访问时间），
+由后台线程定期删除超过保留时间的目录，并在总占用超过配额时按LRU淘汰。
+其他缓存的定期清理（如播客结果缓存的过期条目）也可以登记到同一线程执行。
+进行中任务的目录被固定（pin），不会被删除。
+
+Classes:
+- CacheJanitor: 任务目录索引和清理线程
+
+Functions:
+- get_cache_janitor: 获取全局缓存清理器
+"""
+
+# Standard library imports
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+# Third-party imports
+from loguru import logger
+
+# Local imports
+from constants import (
+    CACHE_JANITOR_INTERVAL,
+    GRADIO_CACHE_DIR,
+    GRADIO_CACHE_MAX_BYTES,
+    GRADIO_CLEAR_CACHE_OLDER_THAN,
+)
+
+# 任务目录中的固定标记文件：其他进程（如 worker.py 的工作进程）中的清理器据此跳过进行中的任务
+PIN_MARKER = ".in_use"
+
+
+class CacheJanitor:
+    """任务目录索引：按保留时间和总字节配额清理，跳过固定的目录"""
+
+    def __init__(self, root: str, max_age: float, max_bytes: int, interval: float):
+        """
+        Args:
+            root: 任务目录所在的根目录
+            max_age: 目录最近访问后的保留时间，单位秒
+            max_bytes: 所有任务目录的总字节配额，超出后淘汰最久未访问的目录
+            interval: 后台清理间隔，单位秒
+        """
+        self.root = Path(root)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._index: Dict[Path, Dict[str, float]] = {}  # 目录 -> {"bytes", "last_access"}
+        self._pinned: Set[Path] = set()
+        self._tasks: List[Callable[[], Any]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- 任务目录登记 ----
+
+    def pin(self, path: Path) -> None:
+        """固定目录：清理时跳过，直到 unpin"""
+        path = Path(path).resolve()
+        (path / PIN_MARKER).touch()
+        with self._lock:
+            self._pinned.add(path)
+            self._index[path] = {"bytes": 0, "last_access": time.time()}
+
+    def unpin(self, path: Path) -> None:
+        """取消固定，并记录最近访问时间"""
+        path = Path(path).resolve()
+        (path / PIN_MARKER).unlink(missing_ok=True)
+        with self._lock:
+            self._pinned.discard(path)
+            if path in self._index:
+                self._index[path]["last_access"] = time.time()
+
+    @contextmanager
+    def pinned(self, path: Path) -> Iterator[Path]:
+        """在上下文期间固定目录"""
+        self.pin(path)
+        try:
+            yield path
+        finally:
+            self.unpin(path)
+
+    def touch(self, path: Path) -> None:
+        """记录目录被访问（例如结果被读取）"""
+        path = Path(path).resolve()
+        with self._lock:
+            if path in self._index:
+                self._index[path]["last_access"] = time.time()
+
+    # ---- 索引和清理 ----
+
+    def _is_pinned(self, path: Path, last_access: float, now: float) -> bool:
+        if path in self._pinned:
+            return True
+        # 其他进程固定的目录：标记文件存在且目录仍有活动；长时间无活动说明该进程已退出
+        return (path / PIN_MARKER).exists() and now - last_access <= self.max_age
+
+    def scan(self) -> None:
+        """重新扫描根目录，刷新各任务目录的字节数和最近访问时间（取目录内文件的最新修改时间）"""
+        index = {}
+        if self.root.exists():
+            for item in self.root.iterdir():
+                if not item.is_dir():
+                    continue
+                total = 0
+                last_modified = item.stat().st_mtime
+                try:
+                    for file in item.rglob("*"):
+                        if file.is_file():
+                            stat = file.stat()
+                            total += stat.st_size
+                            last_modified = max(last_modified, stat.st_mtime)
+                except OSError:
+                    continue  # 目录正被删除
+                index[item.resolve()] = {"bytes": total, "last_access": last_modified}
+        with self._lock:
+            for path, entry in index.items():
+                previous = self._index.get(path)
+                if previous:
+                    entry["last_access"] = max(entry["last_access"], previous["last_access"])
+            self._index = index
+
+    def _remove(self, path: Path) -> bool:
+        try:
+            shutil.rmtree(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"清理目录失败: {path} ({e})")
+            return False
+        with self._lock:
+            self._index.pop(path, None)
+        return True
+
+    def sweep(self) -> List[Path]:
+        """删除超过保留时间的目录，再按LRU淘汰到配额以内，返回删除的目录"""
+        now = time.time()
+        with self._lock:
+            entries = sorted(self._index.items(), key=lambda item: item[1]["last_access"])
+            candidates = [
+                (path, entry) for path, entry in entries if not self._is_pinned(path, entry["last_access"], now)
+            ]
+            total = sum(entry["bytes"] for _, entry in entries)
+
+        removed = []
+        for path, entry in candidates:
+            expired = now - entry["last_access"] > self.max_age
+            if not expired and total <= self.max_bytes:
+                break  # 按最近访问时间排序，之后的目录既未过期也无需淘汰
+            if self._remove(path):
+                removed.append(path)
+                total -= entry["bytes"]
+                logger.info(f"清理任务目录（{'过期' if expired else '超出配额'}）: {path}")
+        return removed
+
+    def clear(self) -> Tuple[int, int]:
+        """删除所有未固定的任务目录，返回 (删除数量, 跳过的进行中目录数量)"""
+        self.scan()
+        now = time.time()
+        with self._lock:
+            entries = list(self._index.items())
+        removed = skipped = 0
+        for path, entry in entries:
+            if self._is_pinned(path, entry["last_access"], now):
+                skipped += 1
+            elif self._remove(path):
+                removed += 1
+        return removed, skipped
+
+    def stats(self) -> Dict[str, int]:
+        """返回目录数、固定目录数和总字节数"""
+        with self._lock:
+            return {
+                "directories": len(self._index),
+                "pinned": len(self._pinned),
+                "bytes": sum(int(entry["bytes"]) for entry in self._index.values()),
+                "max_bytes": self.max_bytes,
+            }
+
+    # ---- 后台线程 ----
+
+    def add_task(self, task: Callable[[], Any]) -> None:
+        """登记每轮清理后额外执行的任务"""
+        with self._lock:
+            self._tasks.append(task)
+
+    def start(self) -> None:
+        """启动后台清理线程（重复调用无副作用）"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="cache-janitor", daemon=True)
+        self._thread.start()
+        logger.info(f"缓存清理线程已启动: {self.root}（间隔 {self.interval}s）")
+
+    def stop(self) -> None:
+        """停止后台清理线程"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.scan()
+                self.sweep()
+            except Exception as e:
+                logger.warning(f"缓存清理失败: {e}")
+            with self._lock:
+                tasks = list(self._tasks)
+            for task in tasks:
+                try:
+                    task()
+                except Exception as e:
+                    logger.warning(f"定期清理任务失败: {e}")
+            self._stop.wait(self.interval)
+
+
+# 全局缓存清理器
+_cache_janitor = None
+_cache_janitor_lock = threading.Lock()
+
+
+def get_cache_janitor() -> CacheJanitor:
+    """获取任务目录的缓存清理器（懒加载）"""
+    global _cache_janitor
+    if _cache_janitor is None:
+        with _cache_janitor_lock:
+            if _cache_janitor is None:
+                _cache_janitor = CacheJanitor(
+                    GRADIO_CACHE_DIR, GRADIO_CLEAR_CACHE_OLDER_THAN, GRADIO_CACHE_MAX_BYTES, CACHE_JANITOR_INTERVAL
+                )
+    return _cache_janitor
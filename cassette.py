@@ -0,0 +1,117 @@
+"""
+cassette.py
+
+录制/回放层：record 模式下把每次大模型 generate/generate_stream 和 TTS synthesize 的
+请求与响应（含耗时）写入本地录像目录；replay 模式下不访问网络、不需要密钥，按原始耗时
+（或关闭延迟）返回录制的结果，用于离线、可复现地剖析和回归测试整条流水线。
+
+Classes:
+- Cassette: 录像目录的读写
+
+Functions:
+- get_cassette: 获取全局录像，未开启时返回None
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import logging
+logger = logging.getLogger(__name__)
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+# 录制/回放配置（支持环境变量覆盖）
+CASSETTE_CONFIG = {
+    "mode": os.getenv("CASSETTE_MODE", "off").lower(),  # off、record 或 replay
+    "dir": os.getenv("CASSETTE_DIR", "./cassettes/"),  # 录像目录
+    "replay_latency": os.getenv("CASSETTE_REPLAY_LATENCY", "true").lower() == "true",  # 回放时是否还原原始耗时
+}
+
+
+class Cassette:
+    """
+    录像目录：<类别>/<键>.json 保存请求、响应和耗时，TTS音频另存为 <类别>/<键>.<扩展名>
+
+    同一请求重复录制时以最后一次为准；回放时找不到对应录像会抛出异常，不会回退到真实调用。
+    """
+
+    def __init__(self, cassette_dir: str, mode: str, replay_latency: bool = True):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"不支持的录像模式: {mode}")
+        self.cassette_dir = Path(cassette_dir)
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._lock = threading.Lock()
+        self._stats = {"recorded": 0, "replayed": 0}
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def path(self, kind: str, key: str, suffix: str = ".json") -> Path:
+        return self.cassette_dir / kind / f"{key}{suffix}"
+
+    def load(self, kind: str, key: str) -> Dict[str, Any]:
+        """读取录像条目，不存在时抛出异常"""
+        path = self.path(kind, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            raise Exception(f"录像中没有匹配的请求: {kind}/{key}")
+        with self._lock:
+            self._stats["replayed"] += 1
+        return entry
+
+    def save(self, kind: str, key: str, entry: Dict[str, Any], audio_path: Optional[str] = None) -> None:
+        """写入录像条目（原子替换），audio_path不为空时一并保存音频文件"""
+        path = self.path(kind, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if audio_path:
+            audio_target = self.path(kind, key, Path(audio_path).suffix)
+            tmp_audio = audio_target.with_suffix(f".{threading.get_ident()}.tmp")
+            shutil.copyfile(audio_path, tmp_audio)
+            os.replace(tmp_audio, audio_target)
+            entry = {**entry, "audio": audio_target.name}
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({**entry, "recorded_at": time.time()}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._stats["recorded"] += 1
+
+    def wait(self, seconds: float) -> None:
+        """回放时按录制的耗时等待（关闭延迟时立即返回）"""
+        if self.replay_latency and seconds > 0:
+            time.sleep(seconds)
+
+    def stats(self) -> Dict[str, int]:
+        """返回录制/回放的条目数"""
+        with self._lock:
+            return dict(self._stats)
+
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """获取全局录像（懒加载），CASSETTE_MODE为off时返回None"""
+    global _cassette
+    if CASSETTE_CONFIG["mode"] == "off":
+        return None
+    if _cassette is None:
+        with _cassette_lock:
+            if _cassette is None:
+                _cassette = Cassette(CASSETTE_CONFIG["dir"], CASSETTE_CONFIG["mode"], CASSETTE_CONFIG["replay_latency"])
+                logger.info(f"录像模式: {_cassette.mode} ({_cassette.cassette_dir})")
+    return _cassette
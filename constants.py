@@ -10,16 +10,35 @@ from pathlib import Path
 APP_TITLE = "AI播客 🎙️"
 CHARACTER_LIMIT = 100_000
 
+# Hierarchical (map-reduce) script generation for long inputs
+HIERARCHICAL_ENABLED = os.getenv("HIERARCHICAL_ENABLED", "true").lower() == "true"
+HIERARCHICAL_THRESHOLD = int(os.getenv("HIERARCHICAL_THRESHOLD", str(CHARACTER_LIMIT)))  # 超过该字符数时先分块总结
+HIERARCHICAL_CHUNK_SIZE = int(os.getenv("HIERARCHICAL_CHUNK_SIZE", "20000"))
+HIERARCHICAL_MAX_WORKERS = int(os.getenv("HIERARCHICAL_MAX_WORKERS", "4"))
+HIERARCHICAL_MAX_CHARACTERS = int(os.getenv("HIERARCHICAL_MAX_CHARACTERS", "2000000"))
+
+# 输入内容的字符上限：启用分块总结时可处理书籍、长篇报告
+INPUT_CHARACTER_LIMIT = HIERARCHICAL_MAX_CHARACTERS if HIERARCHICAL_ENABLED else CHARACTER_LIMIT
+
+# Document extraction-related constants
+EXTRACTION_MAX_WORKERS = int(os.getenv("EXTRACTION_MAX_WORKERS", str(os.cpu_count() or 1)))
+EXTRACTION_PDF_PAGES_PER_TASK = int(os.getenv("EXTRACTION_PDF_PAGES_PER_TASK", "20"))
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", "./gradio_cached_examples/extract_cache/")
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))  # 512MB
+
 # Gradio-related constants
 GRADIO_CACHE_DIR = "./gradio_cached_examples/tmp/"
-GRADIO_CLEAR_CACHE_OLDER_THAN = 1 * 60 * 60  # 1 hour
+GRADIO_CLEAR_CACHE_OLDER_THAN = int(os.getenv("GRADIO_CLEAR_CACHE_OLDER_THAN", str(1 * 60 * 60)))  # 1 hour
+GRADIO_CACHE_MAX_BYTES = int(os.getenv("GRADIO_CACHE_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))  # 2GB, 超出后按LRU淘汰任务目录
+CACHE_JANITOR_INTERVAL = float(os.getenv("CACHE_JANITOR_INTERVAL", "300"))  # 后台清理间隔，单位秒
 
 # Error messages-related constants
 ERROR_MESSAGE_NO_INPUT = "请至少提供一个Word/PDF/TXT类型文件或URL。"
 ERROR_MESSAGE_NOT_PDF = "提供的文件不是PDF/Word/TXT文档。请只上传PDF/Word/TXT文件。"
 ERROR_MESSAGE_NOT_SUPPORTED_IN_MELO_TTS = "所选语言在不使用高级音频生成的情况下不受支持。请启用高级音频生成或选择受支持的语言。"
 ERROR_MESSAGE_READING_PDF = "读取PDF文件时出错"
-ERROR_MESSAGE_TOO_LONG = "总内容过长。请确保PDF和URL的组合文本少于{CHARACTER_LIMIT}个字符。"
+ERROR_MESSAGE_TOO_LONG = f"总内容过长。请确保PDF和URL的组合文本少于{INPUT_CHARACTER_LIMIT}个字符。"
 
 # 大模型平台配置
 DEFAULT_LLM_PLATFORM = os.getenv("DEFAULT_LLM_PLATFORM", "siliconflow")
@@ -62,6 +81,19 @@ LLM_PLATFORMS = {
 }
 
 
+# 是否流式生成改进稿，使逐条合成的TTS服务在大模型输出过程中即开始合成
+LLM_STREAMING = os.getenv("LLM_STREAMING", "true").lower() == "true"
+# 改进对话的方式：full（重新生成整篇对话）或 patch（只返回逐条修改并应用到初稿，修改无效时回退到full）
+LLM_REFINE_MODE = os.getenv("LLM_REFINE_MODE", "full").lower()
+
+# 大模型响应缓存配置（SQLite持久化）
+LLM_CACHE_CONFIG = {
+    "enabled": os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true",
+    "db_path": os.getenv("LLM_CACHE_PATH", "./gradio_cached_examples/llm_cache.sqlite3"),
+    "ttl": int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 60 * 60))),  # 7 days
+    "max_entries": int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000")),
+}
+
 
 # 语言映射
 LANGUAGE_MAPPING = {
@@ -85,8 +117,19 @@ JINA_READER_URL = "https://r.jina.ai/"
 JINA_RETRY_ATTEMPTS = 3
 JINA_RETRY_DELAY = 5  # in seconds
 
+# URL content cache-related constants
+URL_CACHE_ENABLED = os.getenv("URL_CACHE_ENABLED", "true").lower() == "true"
+URL_CACHE_DIR = os.getenv("URL_CACHE_DIR", "./gradio_cached_examples/url_cache/")
+URL_CACHE_TTL = int(os.getenv("URL_CACHE_TTL", str(60 * 60)))  # 1 hour, revalidated after that
+
+# Podcast result cache-related constants
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", "./gradio_cached_examples/result_cache/")
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", str(7 * 24 * 60 * 60)))  # 7 days
+RESULT_CACHE_VERSION = "1"  # 生成流程（提示词、音频处理）变化时递增，使旧结果失效
+
 # UI-related constants
-UI_DESCRIPTION = """
+UI_DESCRIPTION = f"""
 使用国内AI从PDF和Word文档生成播客。
 
 构建使用：
@@ -94,7 +137,7 @@ UI_DESCRIPTION = """
 - [百度语音合成 🎤](https://cloud.baidu.com/product/speech/tts)
 - [Jina Reader 🔍](https://jina.ai/reader/)
 
-**注意：** 仅处理文本（100k字符限制）。
+**注意：** 仅处理文本（超过{HIERARCHICAL_THRESHOLD / 10_000:g}万字符时先分块总结再生成对话）。
 """
 UI_AVAILABLE_LANGUAGES = list(set(LANGUAGE_MAPPING.keys()))
 
@@ -108,8 +151,9 @@ UI_INPUTS = {
         "file_count": "multiple",
     },
     "url": {
-        "label": "2. 🔗 粘贴URL（可选）",
-        "placeholder": "输入URL以包含其内容",
+        "label": "2. 🔗 粘贴URL（可选，多个URL用换行或逗号分隔）",
+        "placeholder": "输入一个或多个URL以包含其内容",
+        "lines": 2,
     },
     "question": {
         "label": "3. 🤔 您有特定的问题或主题吗？",
@@ -140,16 +184,55 @@ UI_INPUTS = {
         "choices": list(TTS_SERVICES.keys()),
         "value": "baidu",
     },
+    "force_regenerate": {
+        "label": "9. 🔄 强制重新生成（忽略已缓存的相同请求结果）",
+        "value": False,
+    },
 }
 UI_OUTPUTS = {
+    # 边生成边播放：每条对话合成完成后立即推送
+    "live_audio": {"label": "🎧 实时收听", "format": "mp3", "autoplay": True},
     "audio": {"label": "🔊 播客", "format": "mp3"},
     "transcript": {
         "label": "📜  transcript",
     },
 }
 UI_API_NAME = "generate_podcast"
+UI_STREAM_API_NAME = "generate_podcast_stream"  # 界面使用的流式接口：边生成边推送音频分段和文字稿
 UI_ALLOW_FLAGGING = "never"
-UI_CONCURRENCY_LIMIT = 1
+UI_CONCURRENCY_LIMIT = int(os.getenv("UI_CONCURRENCY_LIMIT", "4"))  # 同时执行生成流程的任务数
+UI_JOB_CONCURRENCY_LIMIT = 16  # 前端同时等待任务结果的请求数（等待不占用生成名额）
+UI_JOB_API_NAMES = {
+    "submit": "submit_podcast_job",
+    "status": "podcast_job_status",
+    "result": "podcast_job_result",
+}
+
+# Job scheduler-related constants
+JOB_MAX_RETAINED = 200  # 保留的已结束任务数
+JOB_POLL_INTERVAL = 1.0  # 前端轮询任务进度的间隔，单位秒
+JOB_STAGE_LABELS = {
+    "ingest": "读取内容",
+    "script": "生成播客脚本",
+    "tts": "语音合成",
+    "merge": "合并音频",
+}
+
+# Durable job queue-related constants
+# memory: 在Web进程内执行任务；sqlite: Web进程只负责入队，由 worker.py 启动的工作进程执行
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "memory")
+JOB_QUEUE_DB = os.getenv("JOB_QUEUE_DB", "./gradio_cached_examples/job_queue.sqlite3")
+JOB_QUEUE_UPLOAD_DIR = os.getenv("JOB_QUEUE_UPLOAD_DIR", "./gradio_cached_examples/uploads/")  # 上传文件复制到共享目录供工作进程读取
+JOB_QUEUE_VISIBILITY_TIMEOUT = float(os.getenv("JOB_QUEUE_VISIBILITY_TIMEOUT", "300"))  # 租约超时，超时未续约的任务重新可见
+JOB_QUEUE_HEARTBEAT_INTERVAL = float(os.getenv("JOB_QUEUE_HEARTBEAT_INTERVAL", "30"))
+JOB_QUEUE_MAX_ATTEMPTS = int(os.getenv("JOB_QUEUE_MAX_ATTEMPTS", "3"))
+JOB_QUEUE_RETRY_DELAY = float(os.getenv("JOB_QUEUE_RETRY_DELAY", "30"))  # 失败后重试的基础延迟，按尝试次数线性增加
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "1"))
+WORKER_POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "1.0"))
+
+# Metrics-related constants
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "7861"))  # Prometheus指标端口，0表示不启动
 UI_EXAMPLES = [
     [
         [str(Path("examples/1310.4546v1.pdf"))],
@@ -160,7 +243,7 @@ UI_EXAMPLES = [
         "中文",
         "siliconflow",
         "siliconflow",
-        True,
+        False,
     ],
     [
         [],
@@ -0,0 +1,326 @@
+"""
+job_queue.py
+
+基于SQLite的持久化任务队列：Web进程只负责入队，一个或多个主机上的工作进程
+（见 worker.py）通过租约领取任务，执行期间定期心跳续约。工作进程崩溃或失联时，
+租约过期后任务重新可见并被其他工作进程领取；失败的任务按尝试次数延迟重试。
+
+多主机部署时，数据库文件、上传目录和输出目录需位于共享文件系统上
+（共享文件系统需支持POSIX文件锁）。
+
+Classes:
+- SQLiteJobQueue: 任务队列，提供与 jobs.JobScheduler 相同的提交/查询接口
+
+Functions:
+- stage_uploads: 将上传文件复制到共享目录
+- remove_uploads: 删除任务的上传文件
+"""
+
+# Standard library imports
+import json
+import shutil
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+# Third-party imports
+from loguru import logger
+
+# Local imports
+from jobs import JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_STAGES, JOB_SUCCEEDED
+
+
+def stage_uploads(files: Optional[List[Any]], upload_dir: str) -> List[str]:
+    """将上传的文件复制到共享上传目录下的独立子目录，返回新路径列表"""
+    if not files:
+        return []
+    target_dir = Path(upload_dir) / uuid.uuid4().hex
+    target_dir.mkdir(parents=True, exist_ok=False)
+    staged = []
+    for file in files:
+        source = Path(str(getattr(file, "name", file)))
+        target = target_dir / source.name
+        shutil.copyfile(source, target)
+        staged.append(str(target.resolve()))
+    return staged
+
+
+def remove_uploads(files: Optional[List[str]], upload_dir: str) -> None:
+    """删除 stage_uploads 创建的上传子目录（不在上传目录下的文件不处理）"""
+    root = Path(upload_dir).resolve()
+    for parent in {Path(file).resolve().parent for file in files or []}:
+        if parent.parent == root:
+            shutil.rmtree(parent, ignore_errors=True)
+
+
+class SQLiteJobQueue:
+    """带租约、心跳和可见性超时重试的SQLite任务队列"""
+
+    def __init__(
+        self,
+        db_path: str,
+        visibility_timeout: float,
+        max_attempts: int = 3,
+        retry_delay: float = 30.0,
+        max_retained: int = 200,
+    ):
+        """
+        Args:
+            db_path: 数据库文件路径
+            visibility_timeout: 租约时长，超过该时间未续约的任务可被其他工作进程重新领取
+            max_attempts: 最大尝试次数（含首次执行）
+            retry_delay: 重试的基础延迟，第n次失败后延迟 n * retry_delay 秒
+            max_retained: 保留的已结束任务数量，超出后删除最早结束的任务
+        """
+        self.db_path = Path(db_path)
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retained = max_retained
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    stages TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    available_at REAL NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires_at REAL,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    partial TEXT,
+                    result TEXT,
+                    error TEXT
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_available ON jobs (status, available_at)")
+            # 兼容旧版本创建的数据库
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "partial" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN partial TEXT")
+
+    @contextmanager
+    def _transaction(self, write: bool = True) -> Iterator[sqlite3.Connection]:
+        """
+        打开连接并开始事务，退出时提交并关闭连接
+
+        写事务立即获取写锁（BEGIN IMMEDIATE）；只读查询使用延迟事务（BEGIN），
+        不与工作进程的续约、进度更新争抢写锁。
+        """
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    # ---- 前端接口（与 JobScheduler 一致） ----
+
+    def submit(self, *args: Any, **kwargs: Any) -> str:
+        """任务入队，立即返回任务ID"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        stages = {stage: {"status": "pending"} for stage in JOB_STAGES}
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, payload, status, stages, available_at, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, json.dumps({"args": args, "kwargs": kwargs}, ensure_ascii=False), JOB_QUEUED, json.dumps(stages), now, now),
+            )
+            self._prune(conn)
+        logger.info(f"任务已入队: {job_id}")
+        return job_id
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        """查询任务状态和各阶段进度，不存在时抛出KeyError"""
+        with self._transaction(write=False) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"任务不存在: {job_id}")
+        return self._to_dict(row)
+
+    def poll(self, job_id: str, timeout: float) -> Dict[str, Any]:
+        """等待任务结束或超时，返回最新状态"""
+        deadline = time.time() + timeout
+        while True:
+            status = self.status(job_id)
+            remaining = deadline - time.time()
+            if status["status"] in (JOB_SUCCEEDED, JOB_FAILED) or remaining <= 0:
+                return status
+            time.sleep(min(remaining, 0.5))
+
+    def result(self, job_id: str, timeout: Optional[float] = None) -> Any:
+        """等待任务结束并返回结果；任务失败时抛出异常"""
+        status = self.poll(job_id, float("inf") if timeout is None else timeout)
+        if status["status"] == JOB_FAILED:
+            raise Exception(status["error"])
+        if status["status"] != JOB_SUCCEEDED:
+            raise TimeoutError(f"任务尚未完成: {job_id}")
+        with self._transaction(write=False) as conn:
+            row = conn.execute("SELECT result FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return tuple(json.loads(row["result"]))
+
+    def list(self) -> List[Dict[str, Any]]:
+        """列出所有保留的任务状态"""
+        with self._transaction(write=False) as conn:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY created_at").fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    # ---- 工作进程接口 ----
+
+    def lease(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        领取一个可执行的任务：排队中且已到重试时间的任务，或租约已过期的执行中任务
+
+        Returns:
+            {"id", "args", "kwargs", "attempts", "created_at"}，无可执行任务时返回None
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            # 租约过期且已用完尝试次数的任务直接标记为失败
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_owner = NULL "
+                "WHERE status = ? AND lease_expires_at < ? AND attempts >= ?",
+                (JOB_FAILED, "工作进程多次失联，任务已放弃", now, JOB_RUNNING, now, self.max_attempts),
+            )
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires_at < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (JOB_QUEUED, now, JOB_RUNNING, now),
+            ).fetchone()
+            if row is None:
+                return None
+            if row["status"] == JOB_RUNNING:
+                logger.warning(f"任务租约已过期，重新领取: {row['id']} (原工作进程 {row['lease_owner']})")
+            conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1, "
+                "started_at = COALESCE(started_at, ?), error = NULL WHERE id = ?",
+                (JOB_RUNNING, worker_id, now + self.visibility_timeout, now, row["id"]),
+            )
+        payload = json.loads(row["payload"])
+        return {
+            "id": row["id"],
+            "args": payload["args"],
+            "kwargs": payload["kwargs"],
+            "attempts": row["attempts"] + 1,
+            "created_at": row["created_at"],
+        }
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """续约；返回False表示租约已被其他工作进程接管"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND lease_owner = ? AND status = ?",
+                (time.time() + self.visibility_timeout, job_id, worker_id, JOB_RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    def report_stage(self, job_id: str, worker_id: str, stage: str) -> bool:
+        """记录当前阶段（同时续约）"""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT stage, stages FROM jobs WHERE id = ? AND lease_owner = ? AND status = ?",
+                (job_id, worker_id, JOB_RUNNING),
+            ).fetchone()
+            if row is None:
+                return False
+            stages = json.loads(row["stages"])
+            if row["stage"] in stages:
+                stages[row["stage"]].update(status="done", finished_at=now)
+            if stage in stages:
+                stages[stage].update(status="running", started_at=now)
+            conn.execute(
+                "UPDATE jobs SET stage = ?, stages = ?, lease_expires_at = ? WHERE id = ?",
+                (stage, json.dumps(stages), now + self.visibility_timeout, job_id),
+            )
+        return True
+
+    def report_partial(self, job_id: str, worker_id: str, partial: Dict[str, Any]) -> bool:
+        """记录生成过程中的部分结果（已生成的文字稿和音频分段），覆盖之前的记录"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET partial = ? WHERE id = ? AND lease_owner = ? AND status = ?",
+                (json.dumps(partial, ensure_ascii=False), job_id, worker_id, JOB_RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Any) -> bool:
+        """标记任务成功并保存结果"""
+        return self._finish(job_id, worker_id, JOB_SUCCEEDED, result=json.dumps(list(result), ensure_ascii=False))
+
+    def fail(self, job_id: str, worker_id: str, error: str, retryable: bool = True) -> bool:
+        """记录失败：可重试且未用完尝试次数时延迟后重新排队，否则标记为失败"""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, stage, stages FROM jobs WHERE id = ? AND lease_owner = ? AND status = ?",
+                (job_id, worker_id, JOB_RUNNING),
+            ).fetchone()
+            if row is None:
+                return False
+            if retryable and row["attempts"] < self.max_attempts:
+                stages = {stage: {"status": "pending"} for stage in JOB_STAGES}
+                conn.execute(
+                    "UPDATE jobs SET status = ?, stage = NULL, stages = ?, partial = NULL, available_at = ?, lease_owner = NULL, "
+                    "lease_expires_at = NULL, error = ? WHERE id = ?",
+                    (JOB_QUEUED, json.dumps(stages), now + self.retry_delay * row["attempts"], error, job_id),
+                )
+                logger.warning(f"任务失败，将重试（第{row['attempts']}次）: {job_id} ({error})")
+                return True
+        return self._finish(job_id, worker_id, JOB_FAILED, error=error)
+
+    def _finish(self, job_id: str, worker_id: str, status: str, result: Optional[str] = None, error: Optional[str] = None) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT stage, stages FROM jobs WHERE id = ? AND lease_owner = ? AND status = ?",
+                (job_id, worker_id, JOB_RUNNING),
+            ).fetchone()
+            if row is None:
+                return False
+            stages = json.loads(row["stages"])
+            if row["stage"] in stages:
+                stages[row["stage"]].update(status="done" if status == JOB_SUCCEEDED else "failed", finished_at=now)
+            conn.execute(
+                "UPDATE jobs SET status = ?, stages = ?, result = ?, error = ?, finished_at = ?, "
+                "lease_owner = NULL, lease_expires_at = NULL WHERE id = ?",
+                (status, json.dumps(stages), result, error, now, job_id),
+            )
+        return True
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "DELETE FROM jobs WHERE id IN (SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY finished_at DESC LIMIT -1 OFFSET ?)",
+            (JOB_SUCCEEDED, JOB_FAILED, self.max_retained),
+        )
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "job_id": row["id"],
+            "status": row["status"],
+            "stage": row["stage"],
+            "stages": json.loads(row["stages"]),
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "partial": json.loads(row["partial"]) if row["partial"] else None,
+            "error": row["error"],
+        }
@@ -0,0 +1,180 @@
+"""
+jobs.py
+
+进程内的播客生成任务调度器：提交任务后立即返回任务ID，
+通过ID查询状态、各阶段进度、生成过程中的部分结果并获取最终结果。
+
+Classes:
+- NonRetryableError: 重试也不会成功的任务失败
+- Job: 单个任务的状态记录
+- JobScheduler: 基于线程池的任务调度器
+"""
+
+# Standard library imports
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+# Third-party imports
+from loguru import logger
+
+# Local imports
+from metrics import JOBS, QUEUE_WAIT_SECONDS, StageTimer
+
+# 任务状态
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# 任务阶段（按执行顺序）
+JOB_STAGES = ["ingest", "script", "tts", "merge"]
+
+
+class NonRetryableError(Exception):
+    """重试也不会成功的失败（如输入校验失败），持久化队列中的任务直接标记为失败"""
+
+
+class Job:
+    """单个播客生成任务"""
+
+    def __init__(self, job_id: str, args: tuple, kwargs: Dict[str, Any]):
+        self.id = job_id
+        self.args = args
+        self.kwargs = kwargs
+        self.status = JOB_QUEUED
+        self.stage: Optional[str] = None
+        self.stages: Dict[str, Dict[str, Any]] = {stage: {"status": "pending"} for stage in JOB_STAGES}
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.partial: Optional[Dict[str, Any]] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """任务状态的可序列化表示"""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "stages": {stage: dict(info) for stage, info in self.stages.items()},
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "partial": self.partial,
+            "error": self.error,
+        }
+
+
+class JobScheduler:
+    """进程内任务调度器，用固定大小的线程池执行任务"""
+
+    def __init__(self, fn: Callable[..., Any], max_workers: int, max_retained: int = 200):
+        """
+        Args:
+            fn: 任务函数，需接受关键字参数 progress（阶段回调）和 partial（部分结果回调）
+            max_workers: 同时执行的任务数
+            max_retained: 保留的已结束任务数量，超出后丢弃最早结束的任务
+        """
+        self.fn = fn
+        self.max_retained = max_retained
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="podcast-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, *args: Any, **kwargs: Any) -> str:
+        """提交任务，立即返回任务ID"""
+        job = Job(uuid.uuid4().hex, args, kwargs)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job)
+        logger.info(f"任务已提交: {job.id}")
+        return job.id
+
+    def get(self, job_id: str) -> Job:
+        """获取任务，不存在时抛出KeyError"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"任务不存在: {job_id}")
+        return job
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        """查询任务状态和各阶段进度"""
+        return self.get(job_id).to_dict()
+
+    def result(self, job_id: str, timeout: Optional[float] = None) -> Any:
+        """等待任务结束并返回结果；任务失败时抛出异常"""
+        job = self.wait(job_id, timeout)
+        if not job.finished:
+            raise TimeoutError(f"任务尚未完成: {job_id}")
+        if job.status == JOB_FAILED:
+            raise Exception(job.error)
+        return job.result
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Job:
+        """等待任务结束（或超时），返回任务"""
+        job = self.get(job_id)
+        job.done.wait(timeout)
+        return job
+
+    def poll(self, job_id: str, timeout: float) -> Dict[str, Any]:
+        """等待任务结束或超时，返回最新状态"""
+        return self.wait(job_id, timeout).to_dict()
+
+    def list(self) -> List[Dict[str, Any]]:
+        """列出所有保留的任务状态"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.to_dict() for job in jobs]
+
+    def _run(self, job: Job) -> None:
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        QUEUE_WAIT_SECONDS.observe(job.started_at - job.created_at, backend="memory")
+        stage_timer = StageTimer()
+
+        def progress(stage: str) -> None:
+            stage_timer.start(stage)
+            now = time.time()
+            if job.stage and job.stage in job.stages:
+                job.stages[job.stage].update(status="done", finished_at=now)
+            job.stage = stage
+            if stage in job.stages:
+                job.stages[stage].update(status="running", started_at=now)
+
+        def partial(update: Dict[str, Any]) -> None:
+            job.partial = update
+
+        try:
+            job.result = self.fn(*job.args, progress=progress, partial=partial, **job.kwargs)
+            if job.stage in job.stages:
+                job.stages[job.stage].update(status="done", finished_at=time.time())
+            job.status = JOB_SUCCEEDED
+            logger.info(f"任务完成: {job.id} ({time.time() - job.started_at:.1f}s)")
+        except Exception as e:
+            if job.stage in job.stages:
+                job.stages[job.stage].update(status="failed", finished_at=time.time())
+            job.error = str(e)
+            job.status = JOB_FAILED
+            logger.error(f"任务失败: {job.id} ({e})")
+        finally:
+            stage_timer.finish()
+            JOBS.inc(status=job.status)
+            job.finished_at = time.time()
+            job.done.set()
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.max_retained)]:
+            del self._jobs[job_id]
@@ -6,5 +6,15 @@ LLM模块
 
 from .base import LLMClient
 from .factory import LLMClientFactory
+from .cache import LLMResponseCache
+from .cassette import CassetteLLMClient
+from .patch import apply_dialogue_patch, format_numbered_dialogue
 
-__all__ = ["LLMClient", "LLMClientFactory"]
\ No newline at end of file
+__all__ = [
+    "LLMClient",
+    "LLMClientFactory",
+    "LLMResponseCache",
+    "CassetteLLMClient",
+    "apply_dialogue_patch",
+    "format_numbered_dialogue",
+]
\ No newline at end of file
@@ -6,6 +6,8 @@ LLM客户端基础模块
 
 from typing import Any, Dict
 
+from .stream import DialogueStream, parse_script_response
+
 
 class LLMClient:
     """大模型客户端抽象类"""
@@ -15,4 +17,17 @@ class LLMClient:
     
     def generate(self, system_prompt: str, user_prompt: str, response_format: Any) -> Any:
         """生成对话"""
-        raise NotImplementedError("子类必须实现generate方法")
\ No newline at end of file
+        raise NotImplementedError("子类必须实现generate方法")
+    
+    def generate_stream(self, system_prompt: str, user_prompt: str, response_format: Any) -> DialogueStream:
+        """流式生成对话，逐条产出对话项（默认实现退化为一次性生成）"""
+        result = self.generate(system_prompt, user_prompt, response_format)
+        if not isinstance(result, response_format):
+            # 部分平台解析失败时返回原始文本，按script/纯文本兜底解析
+            try:
+                result = parse_script_response(str(result), response_format)
+            except Exception as e:
+                raise Exception(f"大模型输出无法解析为对话: {e}") from e
+            if not result.dialogue:
+                raise Exception("大模型输出无法解析为对话")
+        return DialogueStream.from_result(result)
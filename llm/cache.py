@@ -0,0 +1,129 @@
+"""
+LLM响应缓存模块
+
+包含LLMResponseCache类，使用SQLite持久化缓存大模型的结构化输出
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from metrics import CACHE_REQUESTS
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """基于SQLite的大模型响应缓存，支持TTL过期和条目数上限"""
+
+    def __init__(self, db_path: str, ttl: int, max_entries: int):
+        self.db_path = Path(db_path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._stats = {}  # 阶段 -> {"hits": int, "misses": int}
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """打开连接，退出时提交事务并关闭连接"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(platform: str, model_id: Optional[str], temperature: Any, system_prompt: str, user_prompt: str, response_format: Any) -> str:
+        """根据平台、模型、温度、提示词哈希和输出结构计算缓存键"""
+        schema = response_format.model_json_schema() if hasattr(response_format, "model_json_schema") else str(response_format)
+        payload = {
+            "platform": platform,
+            "model_id": model_id,
+            "temperature": temperature,
+            "system_prompt": _sha256(system_prompt),
+            "user_prompt": _sha256(user_prompt),
+            "schema": _sha256(json.dumps(schema, sort_keys=True, ensure_ascii=False)),
+        }
+        return _sha256(json.dumps(payload, sort_keys=True))
+
+    def _record(self, stage: str, hit: bool) -> None:
+        with self._lock:
+            stage_stats = self._stats.setdefault(stage, {"hits": 0, "misses": 0})
+            stage_stats["hits" if hit else "misses"] += 1
+        CACHE_REQUESTS.inc(cache="llm", result="hit" if hit else "miss")
+
+    def get(self, key: str, response_format: Any, stage: str = "default") -> Optional[Any]:
+        """读取缓存并校验为response_format，未命中、过期或校验失败时返回None"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._record(stage, False)
+                return None
+
+            response, created_at = row
+            if now - created_at > self.ttl:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._record(stage, False)
+                return None
+
+            try:
+                result = response_format.model_validate_json(response)
+            except Exception as e:
+                logger.warning(f"LLM缓存条目校验失败，已删除: {e}")
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._record(stage, False)
+                return None
+
+            conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+
+        self._record(stage, True)
+        return result
+
+    def put(self, key: str, result: Any) -> None:
+        """写入缓存，仅缓存Pydantic模型结果，并按最近访问时间淘汰超出上限的条目"""
+        if not hasattr(result, "model_dump_json"):
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, result.model_dump_json(), now, now),
+            )
+            conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+            conn.execute(
+                """
+                DELETE FROM llm_cache WHERE key NOT IN (
+                    SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """按阶段（如draft/refine）返回命中/未命中次数"""
+        with self._lock:
+            return {stage: dict(counts) for stage, counts in self._stats.items()}
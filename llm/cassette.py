@@ -0,0 +1,125 @@
+"""
+LLM录制/回放模块
+
+包含CassetteLLMClient类，录制或回放任意LLMClient的 generate / generate_stream 调用
+"""
+
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from cassette import Cassette
+
+from .base import LLMClient
+from .cache import LLMResponseCache
+from .stream import DialogueStream
+
+
+def _dump_result(result: Any) -> Dict[str, Any]:
+    """序列化结果：Pydantic模型保存JSON，其他（如解析失败时返回的原始文本）保存字符串"""
+    if hasattr(result, "model_dump_json"):
+        return {"type": "model", "value": result.model_dump_json()}
+    return {"type": "text", "value": str(result)}
+
+
+def _load_result(data: Dict[str, Any], response_format: Any) -> Any:
+    if data["type"] == "model":
+        return response_format.model_validate_json(data["value"])
+    return data["value"]
+
+
+class CassetteLLMClient(LLMClient):
+    """
+    为LLMClient增加录制/回放的包装客户端
+
+    录制时保存最终结果（流式调用保存每段文本增量及其到达时间，回放时重新经过增量解析），
+    调用失败时保存错误信息，回放时原样抛出。回放模式下不需要被包装的客户端。
+    """
+
+    def __init__(self, platform: str, config: Dict[str, Any], cassette: Cassette, client: Optional[LLMClient] = None):
+        super().__init__(config)
+        self.platform = platform
+        self.cassette = cassette
+        self.client = client
+        if client is None and not cassette.replaying:
+            raise ValueError("录制模式需要提供被包装的大模型客户端")
+
+    def _key(self, system_prompt: str, user_prompt: str, response_format: Any) -> str:
+        return LLMResponseCache.make_key(
+            self.platform,
+            self.config.get("model_id"),
+            self.config.get("temperature"),
+            system_prompt,
+            user_prompt,
+            response_format,
+        )
+
+    def _request(self, system_prompt: str, user_prompt: str, response_format: Any) -> Dict[str, Any]:
+        return {
+            "platform": self.platform,
+            "model_id": self.config.get("model_id"),
+            "system_prompt": system_prompt,
+            "user_prompt": user_prompt,
+            "response_format": getattr(response_format, "__name__", str(response_format)),
+        }
+
+    def generate(self, system_prompt: str, user_prompt: str, response_format: Any) -> Any:
+        """回放时返回录制的结果，录制时调用被包装的客户端并保存请求、结果和耗时"""
+        key = self._key(system_prompt, user_prompt, response_format)
+
+        if self.cassette.replaying:
+            entry = self.cassette.load("llm", key)
+            self.cassette.wait(entry["elapsed"])
+            if "error" in entry:
+                raise Exception(entry["error"])
+            return _load_result(entry["result"], response_format)
+
+        entry = {"request": self._request(system_prompt, user_prompt, response_format)}
+        started_at = time.perf_counter()
+        try:
+            result = self.client.generate(system_prompt, user_prompt, response_format)
+        except Exception as e:
+            self.cassette.save("llm", key, {**entry, "elapsed": time.perf_counter() - started_at, "error": str(e)})
+            raise
+        self.cassette.save("llm", key, {**entry, "elapsed": time.perf_counter() - started_at, "result": _dump_result(result)})
+        return result
+
+    def generate_stream(self, system_prompt: str, user_prompt: str, response_format: Any) -> DialogueStream:
+        """回放时按录制的到达时间逐段产出文本增量，录制时边转发边记录"""
+        key = self._key(system_prompt, user_prompt, response_format) + ".stream"
+
+        if self.cassette.replaying:
+            entry = self.cassette.load("llm", key)
+            if "result" in entry:
+                self.cassette.wait(entry["elapsed"])
+                return DialogueStream.from_result(_load_result(entry["result"], response_format))
+            return DialogueStream(self._replay_chunks(entry), response_format)
+
+        entry = {"request": self._request(system_prompt, user_prompt, response_format)}
+        started_at = time.perf_counter()
+        stream = self.client.generate_stream(system_prompt, user_prompt, response_format)
+        if stream.chunks is None:
+            # 不支持流式的平台直接返回完整结果
+            self.cassette.save("llm", key, {**entry, "elapsed": time.perf_counter() - started_at, "result": _dump_result(stream.result)})
+            return stream
+        stream.chunks = self._record_chunks(stream.chunks, key, entry, started_at)
+        return stream
+
+    def _record_chunks(self, chunks: Any, key: str, entry: Dict[str, Any], started_at: float) -> Iterator[str]:
+        """转发文本增量并记录 [相对开始的秒数, 文本]，流结束或出错时写入录像"""
+        recorded = []
+        try:
+            for chunk in chunks:
+                recorded.append([time.perf_counter() - started_at, chunk])
+                yield chunk
+        except Exception as e:
+            self.cassette.save("llm", key, {**entry, "elapsed": time.perf_counter() - started_at, "chunks": recorded, "error": str(e)})
+            raise
+        self.cassette.save("llm", key, {**entry, "elapsed": time.perf_counter() - started_at, "chunks": recorded})
+
+    def _replay_chunks(self, entry: Dict[str, Any]) -> Iterator[str]:
+        started_at = time.perf_counter()
+        for offset, chunk in entry["chunks"]:
+            self.cassette.wait(offset - (time.perf_counter() - started_at))
+            yield chunk
+        if "error" in entry:
+            raise Exception(entry["error"])
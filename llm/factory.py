@@ -4,7 +4,7 @@ LLM客户端工厂模块
 包含LLMClientFactory类，用于创建不同类型的大模型客户端实例。
 """
 
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
 from .base import LLMClient
 from .ernie import ErnieClient
@@ -15,11 +15,21 @@ from .siliconflow import SiliconFlowClient
 # LLM客户端工厂
 class LLMClientFactory:
     """LLM客户端工厂"""
-    
-    @staticmethod
-    def create_client(platform: str, config: Dict[str, Any]) -> LLMClient:
+
+    # 通过register注册的额外平台（如基准测试使用的本地替身）
+    _registry: Dict[str, Callable[[Dict[str, Any]], LLMClient]] = {}
+
+    @classmethod
+    def register(cls, platform: str, creator: Callable[[Dict[str, Any]], LLMClient]) -> None:
+        """注册大模型平台，creator接收配置并返回客户端实例"""
+        cls._registry[platform] = creator
+
+    @classmethod
+    def create_client(cls, platform: str, config: Dict[str, Any]) -> LLMClient:
         """创建大模型客户端"""
-        if platform == "ernie":
+        if platform in cls._registry:
+            return cls._registry[platform](config)
+        elif platform == "ernie":
             return ErnieClient(config)
         elif platform == "qianwen":
             return QianWenClient(config)
@@ -0,0 +1,66 @@
+"""
+对话补丁模块
+
+改进对话时大模型只返回逐条修改（DialoguePatch），由 apply_dialogue_patch 应用到初稿，
+无需重新输出整篇对话。
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from schema import DialogueEdit, DialogueItem, DialoguePatch
+
+
+def format_numbered_dialogue(dialogue: Any) -> str:
+    """将对话逐行编号（"[序号] 说话者: 文本"），供大模型按序号引用"""
+    return "\n".join(f"[{i}] {item.speaker}: {item.text}" for i, item in enumerate(dialogue.dialogue))
+
+
+def _edit_item(edit: DialogueEdit, original: Optional[DialogueItem] = None) -> DialogueItem:
+    """replace/insert 修改对应的新对话项"""
+    if not edit.text or not edit.text.strip():
+        raise ValueError(f"第{edit.index}项的{edit.op}修改缺少文本")
+    speaker = edit.speaker or (original.speaker if original else None)
+    if speaker is None:
+        raise ValueError(f"第{edit.index}项的insert修改缺少说话者")
+    return DialogueItem(speaker=speaker, text=edit.text.strip())
+
+
+def apply_dialogue_patch(draft: Any, patch: DialoguePatch) -> Any:
+    """
+    将逐条修改应用到初稿，返回与初稿同类型的对话模型
+
+    所有序号都指初稿中的位置：replace/delete 修改第index项，insert 插入到第index项之前
+    （index等于对话项数量时追加到末尾），同一位置的多个insert按出现顺序插入。
+
+    Raises:
+        ValueError: 修改不合法（序号越界、同一项被重复修改、缺少文本或说话者、结果为空）
+    """
+    items: List[DialogueItem] = list(draft.dialogue)
+    count = len(items)
+    changed: Dict[int, Optional[DialogueItem]] = {}
+    inserted: Dict[int, List[DialogueItem]] = defaultdict(list)
+
+    for edit in patch.edits:
+        if edit.op == "insert":
+            if not 0 <= edit.index <= count:
+                raise ValueError(f"insert序号越界: {edit.index}（初稿共{count}项）")
+            inserted[edit.index].append(_edit_item(edit))
+            continue
+        if not 0 <= edit.index < count:
+            raise ValueError(f"{edit.op}序号越界: {edit.index}（初稿共{count}项）")
+        if edit.index in changed:
+            raise ValueError(f"第{edit.index}项被重复修改")
+        changed[edit.index] = _edit_item(edit, items[edit.index]) if edit.op == "replace" else None
+
+    dialogue: List[DialogueItem] = []
+    for i in range(count + 1):
+        dialogue.extend(inserted.get(i, []))
+        if i < count:
+            item = changed.get(i, items[i])
+            if item is not None:
+                dialogue.append(item)
+    if not dialogue:
+        raise ValueError("应用修改后对话为空")
+
+    return type(draft).model_validate({**draft.model_dump(), "dialogue": [item.model_dump() for item in dialogue]})
@@ -4,12 +4,15 @@
 
 import json
 import time
-from typing import Any, Dict
+from typing import Any, Dict, Iterator
 
-import requests
 import logging
 
+from metrics import RETRIES
+from transport import get_session, get_timeout
+
 from .base import LLMClient
+from .stream import DialogueStream, parse_script_response
 
 logger = logging.getLogger(__name__)
 
@@ -59,7 +62,7 @@ class SiliconFlowClient(LLMClient):
                     "stream": False
                 }
                 
-                response = requests.post(url, headers=headers, json=payload, timeout=120)
+                response = get_session().post(url, headers=headers, json=payload, timeout=get_timeout(120))
                 response.raise_for_status()
                 
                 result = response.json()
@@ -76,31 +79,8 @@ class SiliconFlowClient(LLMClient):
                             try:
                                 return response_format.model_validate_json(generated_text)
                             except Exception:
-                                # 如果直接解析失败，尝试将script格式转换为Pydantic模型格式
-                                try:
-                                    # 假设API返回的是{"script": "对话内容"}格式
-                                    script_data = json.loads(generated_text)
-                                    if "script" in script_data:
-                                        # 将script内容转换为Pydantic模型格式
-                                        script_text = script_data["script"]
-                                        # 创建默认的Pydantic模型对象
-                                        model_data = {
-                                            "scratchpad": "这是对话的草稿",
-                                            "name_of_guest": "嘉宾",
-                                            "dialogue": self._parse_script_to_dialogue(script_text)
-                                        }
-                                        return response_format(**model_data)
-                                    else:
-                                        raise Exception("API返回格式不包含script字段")
-                                except Exception:
-                                    # 如果JSON解析也失败，假设返回的是纯文本对话内容
-                                    # 直接解析文本为对话格式
-                                    model_data = {
-                                        "scratchpad": "这是对话的草稿",
-                                        "name_of_guest": "嘉宾",
-                                        "dialogue": self._parse_script_to_dialogue(generated_text)
-                                    }
-                                    return response_format(**model_data)
+                                # 如果直接解析失败，尝试script格式或纯文本对话
+                                return parse_script_response(generated_text, response_format)
                         else:
                             # 否则直接返回文本
                             return generated_text
@@ -114,39 +94,56 @@ class SiliconFlowClient(LLMClient):
             except Exception as e:
                 if attempt == self.config["retry_attempts"] - 1:  # Last attempt
                     raise Exception(f"硅基流动API错误: {str(e)}")
+                RETRIES.inc(component="llm_siliconflow")
                 time.sleep(self.config["retry_delay"])  # Wait for X second before retrying
     
-    def _parse_script_to_dialogue(self, script_text: str) -> list:
-        """将script文本转换为对话格式"""
-        dialogue_items = []
-        lines = script_text.strip().split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # 简单的对话解析逻辑
-            if ':' in line:
-                parts = line.split(':', 1)
-                speaker = parts[0].strip()
-                text = parts[1].strip()
-                
-                # 确定说话者类型
-                if 'Jane' in speaker or 'Host' in speaker or '主持人' in speaker:
-                    speaker_type = "Host (Jane)"
-                else:
-                    speaker_type = "Guest"
-                
-                dialogue_items.append({
-                    "speaker": speaker_type,
-                    "text": text
-                })
-            else:
-                # 如果没有明确说话者，假设是主持人的话
-                dialogue_items.append({
-                    "speaker": "Host (Jane)",
-                    "text": line
-                })
+    def generate_stream(self, system_prompt: str, user_prompt: str, response_format: Any) -> DialogueStream:
+        """使用硅基流动API流式生成对话（SSE），每条对话项生成完毕即可消费"""
+        return DialogueStream(self._iter_stream_chunks(system_prompt, user_prompt), response_format)
+    
+    def _iter_stream_chunks(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        """逐段产出流式响应中的文本增量，仅在尚未收到任何内容时重试"""
+        url = "https://api.siliconflow.cn/v1/chat/completions"
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream"
+        }
+        payload = {
+            "model": self.model_id,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "stream": True
+        }
         
-        return dialogue_items
\ No newline at end of file
+        for attempt in range(self.config["retry_attempts"]):
+            received = False
+            try:
+                with get_session().post(url, headers=headers, json=payload, timeout=get_timeout(120), stream=True) as response:
+                    response.raise_for_status()
+                    # text/event-stream 未声明charset时requests按ISO-8859-1解码，SSE规定为UTF-8
+                    response.encoding = "utf-8"
+                    for line in response.iter_lines(decode_unicode=True):
+                        if not line or not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            return
+                        event = json.loads(data)
+                        choices = event.get("choices") or []
+                        if not choices:
+                            continue
+                        content = (choices[0].get("delta") or {}).get("content")
+                        if content:
+                            received = True
+                            yield content
+                return
+            except Exception as e:
+                if received or attempt == self.config["retry_attempts"] - 1:
+                    raise Exception(f"硅基流动API流式调用错误: {str(e)}")
+                RETRIES.inc(component="llm_siliconflow")
+                time.sleep(self.config["retry_delay"])  # Wait for X second before retrying
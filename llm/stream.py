@@ -0,0 +1,224 @@
+"""
+LLM流式输出模块
+
+包含IncrementalDialogueParser类和DialogueStream类，
+用于在大模型流式输出JSON的过程中逐条解析出已经完整的对话项；
+以及parse_script_response函数，将非对话JSON的输出（{"script": ...} 或纯文本）兜底解析为对话
+"""
+
+import json
+import re
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+import logging
+logger = logging.getLogger(__name__)
+
+from schema import DialogueItem
+
+# 从（可能尚未输出完整的）JSON文本中提取嘉宾名称
+GUEST_NAME_PATTERN = re.compile(r'"name_of_guest"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def parse_script_to_dialogue(script_text: str) -> list:
+    """将"说话者: 文本"形式的script文本转换为对话项列表"""
+    dialogue_items = []
+    lines = script_text.strip().split('\n')
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        # 简单的对话解析逻辑
+        if ':' in line:
+            parts = line.split(':', 1)
+            speaker = parts[0].strip()
+            text = parts[1].strip()
+
+            # 确定说话者类型
+            if 'Jane' in speaker or 'Host' in speaker or '主持人' in speaker:
+                speaker_type = "Host (Jane)"
+            else:
+                speaker_type = "Guest"
+
+            dialogue_items.append({
+                "speaker": speaker_type,
+                "text": text
+            })
+        else:
+            # 如果没有明确说话者，假设是主持人的话
+            dialogue_items.append({
+                "speaker": "Host (Jane)",
+                "text": line
+            })
+
+    return dialogue_items
+
+
+def parse_script_response(text: str, response_format: Any) -> Any:
+    """
+    输出无法直接校验为response_format时的兜底解析：
+    先按 {"script": "对话内容"} 格式解析，失败时将整段输出视为纯文本对话
+
+    Raises:
+        Exception: 纯文本也无法构造为response_format
+    """
+    try:
+        # 假设API返回的是{"script": "对话内容"}格式
+        script_text = json.loads(text)["script"]
+        return response_format(
+            scratchpad="这是对话的草稿", name_of_guest="嘉宾", dialogue=parse_script_to_dialogue(script_text)
+        )
+    except Exception:
+        # 假设返回的是纯文本对话内容
+        return response_format(
+            scratchpad="这是对话的草稿", name_of_guest="嘉宾", dialogue=parse_script_to_dialogue(text)
+        )
+
+
+class IncrementalDialogueParser:
+    """增量JSON解析器，"dialogue" 数组中的每个对象一闭合就立即产出"""
+
+    def __init__(self, array_key: str = "dialogue"):
+        self.array_key = array_key
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = None
+        self._key = None
+        self._array_depth = None
+        self._array_done = False
+        self._object_start = None
+
+    def feed(self, chunk: str) -> List[dict]:
+        """追加一段文本，返回本次新闭合的对话对象列表"""
+        self.text += chunk
+        completed = []
+        text = self.text
+
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start + 1:i]
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c == ":":
+                self._key = self._last_string
+            elif c == ",":
+                self._key = None
+            elif c in "{[":
+                self._depth += 1
+                if c == "[" and not self._array_done and self._array_depth is None and self._key == self.array_key:
+                    self._array_depth = self._depth
+                elif c == "{" and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._object_start = i
+                self._key = None
+            elif c in "}]":
+                if c == "}" and self._object_start is not None and self._depth == self._array_depth + 1:
+                    try:
+                        completed.append(json.loads(text[self._object_start:i + 1]))
+                    except json.JSONDecodeError as e:
+                        logger.warning(f"流式对话项解析失败: {e}")
+                    self._object_start = None
+                elif c == "]" and self._array_depth is not None and self._depth == self._array_depth:
+                    self._array_depth = None
+                    self._array_done = True
+                self._depth -= 1
+
+        self._pos = len(text)
+        return completed
+
+
+class DialogueStream:
+    """
+    流式对话结果
+
+    迭代时逐条产出DialogueItem；迭代结束后可通过 result 获取校验后的完整对话模型。
+    """
+
+    def __init__(self, chunks: Optional[Iterable[str]], response_format: Any, result: Any = None):
+        self.chunks = chunks
+        self.response_format = response_format
+        self.result = result
+        self.items = []
+        self.on_complete: Optional[Callable[[Any], None]] = None
+        self._parser: Optional[IncrementalDialogueParser] = None
+
+    @classmethod
+    def from_result(cls, result: Any) -> "DialogueStream":
+        """由已经生成好的完整对话构造（用于不支持流式的平台或缓存命中）"""
+        return cls(None, type(result), result)
+
+    def __iter__(self) -> Iterator[DialogueItem]:
+        if self.chunks is None:
+            for item in self.result.dialogue:
+                self.items.append(item)
+                yield item
+            return
+
+        parser = self._parser = IncrementalDialogueParser()
+        for chunk in self.chunks:
+            for obj in parser.feed(chunk):
+                try:
+                    item = DialogueItem.model_validate(obj)
+                except Exception as e:
+                    logger.warning(f"忽略无效的对话项 {obj}: {e}")
+                    continue
+                self.items.append(item)
+                yield item
+
+        self.result = self._build_result(parser.text)
+        if not self.items:
+            # 输出不是对话JSON时，兜底解析出的对话项在输出结束后一次性产出
+            for item in self.result.dialogue:
+                self.items.append(item)
+                yield item
+        if self.on_complete:
+            self.on_complete(self.result)
+
+    @property
+    def name_of_guest(self) -> Optional[str]:
+        """嘉宾名称：有完整结果时取结果中的值，否则从已接收的输出中提取，尚未输出时为None"""
+        if self.result is not None:
+            return self.result.name_of_guest
+        match = GUEST_NAME_PATTERN.search(self._parser.text) if self._parser else None
+        return json.loads(f'"{match.group(1)}"') if match else None
+
+    def _build_result(self, text: str) -> Any:
+        """
+        将完整输出校验为response_format，失败时用已解析的对话项兜底；
+        没有解析出任何对话项时按 parse_script_response 解析整段输出
+        """
+        # 去除可能存在的代码块标记
+        cleaned = re.sub(r"^\s*```(?:json)?|```\s*$", "", text.strip())
+        try:
+            return self.response_format.model_validate_json(cleaned)
+        except Exception as e:
+            if not self.items:
+                try:
+                    result = parse_script_response(cleaned, self.response_format)
+                except Exception as fallback_error:
+                    raise Exception(f"流式输出无法解析为对话: {e}") from fallback_error
+                if not result.dialogue:
+                    raise Exception(f"流式输出无法解析为对话: {e}") from e
+                logger.warning(f"流式输出不是对话JSON，按script/纯文本解析出 {len(result.dialogue)} 条对话项")
+                return result
+            logger.warning(f"流式输出整体校验失败，使用已解析的 {len(self.items)} 条对话项: {e}")
+            match = GUEST_NAME_PATTERN.search(cleaned)
+            return self.response_format(
+                scratchpad="",
+                name_of_guest=json.loads(f'"{match.group(1)}"') if match else "嘉宾",
+                dialogue=self.items,
+            )
@@ -0,0 +1,264 @@
+"""
+metrics.py
+
+各阶段的延迟和吞吐指标（计数器、直方图），以Prometheus文本格式通过HTTP暴露。
+
+Classes:
+- Counter: 单调递增计数器
+- Histogram: 分桶直方图（带_sum和_count）
+- MetricsRegistry: 指标注册表
+- StageTimer: 按阶段切换记录耗时
+
+Functions:
+- render_metrics: 生成Prometheus文本格式的全部指标
+- start_metrics_server: 在后台线程中启动 /metrics HTTP服务
+"""
+
+# Standard library imports
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Third-party imports
+from loguru import logger
+
+# 默认直方图分桶（秒），覆盖从毫秒级缓存命中到数分钟的大模型调用
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    """指标基类：按标签值分别记录"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"指标 {self.name} 的标签应为 {self.labelnames}，实际为 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """单调递增计数器"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """增加计数"""
+        if amount < 0:
+            raise ValueError("计数器只能增加")
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """读取当前计数"""
+        with self._lock:
+            return self._values.get(self._label_values(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """分桶直方图，输出 _bucket / _sum / _count 三组样本"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelValues, Dict[str, object]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """记录一次观测值"""
+        key = self._label_values(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.setdefault(key, {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0})
+            series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """记录上下文的执行耗时（秒），异常时同样记录"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, {"counts": list(series["counts"]), "sum": series["sum"], "count": series["count"]})
+                           for key, series in self._values.items())
+        samples = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series["counts"]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                samples.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            samples.append(f"{self.name}_sum{labels} {_format_value(series['sum'])}")
+            samples.append(f"{self.name}_count{labels} {series['count']}")
+        return samples
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"指标已注册: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# ---- 指标定义 ----
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "podcast_stage_duration_seconds", "Duration of each podcast generation stage.", ["stage"]))
+JOBS = REGISTRY.register(Counter(
+    "podcast_jobs_total", "Finished podcast jobs by outcome.", ["status"]))
+QUEUE_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "podcast_job_queue_wait_seconds", "Time between job submission and start of execution.", ["backend"]))
+INGEST_BYTES = REGISTRY.register(Counter(
+    "podcast_ingest_bytes_total", "Bytes ingested from uploaded files and fetched URLs.", ["source"]))
+LLM_CALL_SECONDS = REGISTRY.register(Histogram(
+    "llm_call_duration_seconds", "Duration of LLM calls (cache misses only).", ["platform", "stage"]))
+LLM_PROMPT_CHARACTERS = REGISTRY.register(Counter(
+    "llm_prompt_characters_total", "Characters sent to the LLM (system + user prompt).", ["platform", "stage"]))
+LLM_RESPONSE_CHARACTERS = REGISTRY.register(Counter(
+    "llm_response_characters_total", "Characters of structured LLM responses.", ["platform", "stage"]))
+LLM_REFINE_PATCHES = REGISTRY.register(Counter(
+    "llm_refine_patches_total", "Patch-based refinements by outcome (applied/fallback).", ["platform", "result"]))
+LLM_REFINE_SAVED_CHARACTERS = REGISTRY.register(Counter(
+    "llm_refine_saved_characters_total", "Response characters saved by patch-based refinement versus the full dialogue.", ["platform"]))
+TTS_SYNTHESIZE_SECONDS = REGISTRY.register(Histogram(
+    "tts_synthesize_duration_seconds", "Duration of a single TTS synthesize call (including cache hits).", ["service"]))
+TTS_CHARACTERS = REGISTRY.register(Counter(
+    "tts_characters_total", "Characters sent to TTS services (cache hits excluded).", ["service"]))
+TTS_RATE_LIMIT_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "tts_rate_limit_wait_seconds", "Time spent waiting for the per-service TTS rate limiter.", ["service"]))
+RETRIES = REGISTRY.register(Counter(
+    "retries_total", "Retried external requests by component.", ["component"]))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit/miss).", ["cache", "result"]))
+FFMPEG_SECONDS = REGISTRY.register(Histogram(
+    "ffmpeg_merge_duration_seconds", "Duration of FFmpeg audio merges.", ["result"]))
+MP3_CONCAT_SECONDS = REGISTRY.register(Histogram(
+    "mp3_concat_duration_seconds", "Duration of in-process frame-level MP3 concatenation.", ["result"]))
+AUDIO_MIX_SECONDS = REGISTRY.register(Histogram(
+    "audio_mix_duration_seconds", "Duration of PCM mixing (decode, trim, crossfade, normalize, encode).", ["result"]))
+SPECULATIVE_TTS_LINES = REGISTRY.register(Counter(
+    "speculative_tts_lines_total", "Refined dialogue lines served from draft speculation (hit/miss) and discarded speculations.",
+    ["service", "result"]))
+SPECULATIVE_TTS_SAVED_SECONDS = REGISTRY.register(Counter(
+    "speculative_tts_saved_seconds_total", "Synthesis time completed ahead of need by draft speculation.", ["service"]))
+
+
+class StageTimer:
+    """按阶段切换记录各阶段耗时：start(下一阶段) 结束当前阶段，finish() 结束最后一个阶段"""
+
+    def __init__(self, histogram: Histogram = STAGE_SECONDS):
+        self.histogram = histogram
+        self._stage: Optional[str] = None
+        self._started_at = 0.0
+
+    def start(self, stage: str) -> None:
+        self.finish()
+        self._stage = stage
+        self._started_at = time.perf_counter()
+
+    def finish(self) -> None:
+        if self._stage is not None:
+            self.histogram.observe(time.perf_counter() - self._started_at, stage=self._stage)
+            self._stage = None
+
+
+def render_metrics() -> str:
+    """生成Prometheus文本格式的全部指标"""
+    return REGISTRY.render()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # 抓取请求频繁，不写访问日志
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    """在后台线程中启动 /metrics HTTP服务；端口为0时不启动"""
+    if not port:
+        return None
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"指标服务已启动: http://{host}:{port}/metrics")
+    return server
@@ -56,6 +56,37 @@ SYSTEM_PROMPT = """
 记住：始终以有效的JSON格式回复，不要使用代码块。直接以JSON输出开始。
 """
 
+CHUNK_NOTES_PROMPT = """
+你是一位播客研究助理。你会收到一篇长文档中的一个部分，请为后续的播客脚本创作整理这一部分的笔记。
+
+要求：
+- 提取关键主题、核心论点、重要事实与数据
+- 保留有趣的例子、轶事和引人深思的细节
+- 忽略页眉页脚、参考文献列表等无关内容
+- 笔记应简洁，长度不超过原文的十分之一
+- 使用与原文相同的语言
+
+始终以有效的JSON格式回复，不要使用代码块。直接以JSON输出开始。
+"""
+
+REFINE_PATCH_PROMPT = """
+这是你提供的对话初稿，每行以 [序号] 开头：
+
+{dialogue}
+
+请改进这份初稿，使其更自然、更吸引人。不要重新输出整篇对话，只输出需要修改的对话项：
+- replace：替换第index项，给出新的text（说话者变化时同时给出speaker）
+- insert：在第index项之前插入一项（index等于对话项数量时追加到末尾），给出speaker和text
+- delete：删除第index项
+
+所有序号都指初稿中的位置，同一项最多修改一次，不需要修改的对话项不要输出。
+说话者只能是 "Host (Jane)"、"Guest"、"Guest 2"、"Guest 3" 或 "Guest 4"。
+
+本次回复的JSON格式与上文不同，必须是：
+{{"edits": [{{"op": "replace", "index": 3, "text": "新的文本"}}, {{"op": "insert", "index": 5, "speaker": "Guest", "text": "新增的一句"}}, {{"op": "delete", "index": 8}}]}}
+初稿无需修改时回复 {{"edits": []}}。
+"""
+
 QUESTION_MODIFIER = "请回答以下问题："
 
 TONE_MODIFIER = "语气：播客的语气应该是"
@@ -0,0 +1,159 @@
+"""
+result_cache.py
+
+播客结果缓存：按规范化的请求指纹（文档内容哈希、URL、问题、语气、长度、语言、
+大模型平台、TTS服务）保存已完成的播客音频和文字稿，相同请求直接返回结果。
+
+Classes:
+- ResultCache: 基于磁盘的结果缓存，条目超过有效期后失效
+
+Functions:
+- request_fingerprint: 计算请求指纹
+- get_result_cache: 获取全局结果缓存
+"""
+
+# Standard library imports
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Third-party imports
+from loguru import logger
+
+# Local imports
+from constants import RESULT_CACHE_DIR, RESULT_CACHE_ENABLED, RESULT_CACHE_TTL, RESULT_CACHE_VERSION
+from metrics import CACHE_REQUESTS
+from tool import split_urls
+from tool.extract_cache import file_digest
+
+
+def request_fingerprint(
+    files: Optional[List[Any]],
+    url: Optional[str],
+    question: Optional[str],
+    tone: Optional[str],
+    length: Optional[str],
+    language: str,
+    llm_platform: str,
+    tts_service: str,
+) -> str:
+    """
+    计算请求指纹：文件按内容哈希（与文件名、上传路径无关），URL拆分去重，问题去除首尾空白
+
+    Raises:
+        OSError: 文件无法读取
+    """
+    payload = {
+        "version": RESULT_CACHE_VERSION,
+        "files": [file_digest(str(getattr(file, "name", file))) for file in files or []],
+        "urls": split_urls(url),
+        "question": (question or "").strip(),
+        "tone": tone,
+        "length": length,
+        "language": language,
+        "llm_platform": llm_platform,
+        "tts_service": tts_service,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """基于磁盘的播客结果缓存：<指纹>.mp3 保存音频，<指纹>.json 保存文字稿和元数据"""
+
+    def __init__(self, cache_dir: str, ttl: int):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.mp3"
+
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        """返回 (音频路径, 文字稿)，未命中或已过期时返回None"""
+        meta_path, audio_path = self._paths(key)
+        try:
+            entry = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            entry = None
+
+        if entry and time.time() - entry["created_at"] >= self.ttl:
+            logger.info(f"播客结果缓存已过期: {key}")
+            self._remove(key)
+            entry = None
+        if entry and not audio_path.exists():
+            entry = None
+
+        with self._lock:
+            self._stats["hits" if entry else "misses"] += 1
+        CACHE_REQUESTS.inc(cache="result", result="hit" if entry else "miss")
+        if entry is None:
+            return None
+        logger.info(f"播客结果缓存命中: {key}")
+        return str(audio_path), entry["transcript"]
+
+    def put(self, key: str, audio_file: str, transcript: str) -> str:
+        """复制音频到缓存目录并保存文字稿，返回缓存中的音频路径"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        meta_path, audio_path = self._paths(key)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+
+        tmp_audio = audio_path.with_suffix(suffix)
+        shutil.copyfile(audio_file, tmp_audio)
+        os.replace(tmp_audio, audio_path)
+
+        # 元数据最后写入，读到元数据时音频一定已就绪
+        tmp_meta = meta_path.with_suffix(suffix)
+        tmp_meta.write_text(
+            json.dumps({"transcript": transcript, "created_at": time.time()}, ensure_ascii=False), encoding="utf-8"
+        )
+        os.replace(tmp_meta, meta_path)
+        logger.info(f"播客结果已缓存: {key}")
+        return str(audio_path)
+
+    def _remove(self, key: str) -> None:
+        for path in self._paths(key):
+            path.unlink(missing_ok=True)
+
+    def purge_expired(self) -> int:
+        """删除过期条目，返回删除数量（需遍历全部条目，由缓存清理线程定期调用）"""
+        if not self.cache_dir.exists():
+            return 0
+        now = time.time()
+        removed = 0
+        for meta_path in self.cache_dir.glob("*.json"):
+            try:
+                created_at = json.loads(meta_path.read_text(encoding="utf-8"))["created_at"]
+            except (OSError, ValueError, KeyError):
+                continue
+            if now - created_at >= self.ttl:
+                self._remove(meta_path.stem)
+                removed += 1
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        """返回命中/未命中次数和条目数"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["entries"] = len(list(self.cache_dir.glob("*.json"))) if self.cache_dir.exists() else 0
+        return stats
+
+
+# 全局结果缓存
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """获取播客结果缓存（懒加载），未启用时返回None"""
+    global _result_cache
+    if _result_cache is None and RESULT_CACHE_ENABLED:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache(RESULT_CACHE_DIR, RESULT_CACHE_TTL)
+    return _result_cache
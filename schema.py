@@ -2,15 +2,18 @@
 schema.py
 """
 
-from typing import Literal, List
+from typing import Literal, List, Optional
 
 from pydantic import BaseModel, Field
 
 
+Speaker = Literal["Host (Jane)", "Guest", "Guest 2", "Guest 3", "Guest 4"]
+
+
 class DialogueItem(BaseModel):
     """单个对话项。"""
 
-    speaker: Literal["Host (Jane)", "Guest", "Guest 2", "Guest 3", "Guest 4"]
+    speaker: Speaker
     text: str
 
 
@@ -42,3 +45,26 @@ class LongDialogue(BaseModel):
     dialogue: List[DialogueItem] = Field(
         ..., description="对话项列表，通常包含40到60个项，支持多个嘉宾角色"
     )
+
+
+class ChunkNotes(BaseModel):
+    """长文档单个分块的要点笔记。"""
+
+    notes: str = Field(..., description="该部分的关键要点、事实、数据和有趣的细节")
+
+
+class DialogueEdit(BaseModel):
+    """对初稿中单个对话项的修改。"""
+
+    op: Literal["replace", "insert", "delete"]
+    index: int = Field(
+        ..., description="初稿中对话项的序号（从0开始）；insert插入到该项之前，等于对话项数量时追加到末尾"
+    )
+    speaker: Optional[Speaker] = Field(None, description="replace和insert的说话者，replace时省略表示不变")
+    text: Optional[str] = Field(None, description="replace和insert的新文本，delete时省略")
+
+
+class DialoguePatch(BaseModel):
+    """改进初稿所需的逐条修改。"""
+
+    edits: List[DialogueEdit] = Field(..., description="修改列表，序号均指初稿中的位置；初稿无需修改时为空列表")
@@ -0,0 +1,100 @@
+"""
+并发生成测试：多个线程同时调用 app.generate_podcast（使用 benchmarks/mocks.py 的本地替身），
+验证各任务的临时目录和输出互不混淆，且同一TTS服务只创建一个客户端和一个限流器
+"""
+
+import os
+
+# 测试的是完整生成流程，关闭各级缓存（与 benchmarks/run.py 相同）
+for _cache_env in ("RESULT_CACHE_ENABLED", "LLM_CACHE_ENABLED", "TTS_CACHE_ENABLED", "EXTRACTION_CACHE_ENABLED", "URL_CACHE_ENABLED"):
+    os.environ.setdefault(_cache_env, "false")
+
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+import tts.tools
+from benchmarks.mocks import MockTTSClient, register_mocks
+from tts import TTSClientFactory
+from tts.mp3 import MP3Stream
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+JOBS = 4
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    """导入app（界面示例使用相对路径，需在仓库目录下导入），任务目录放在临时目录中"""
+    monkeypatch.chdir(REPO_DIR)
+    created = not (REPO_DIR / "gradio_cached_examples").exists()
+    register_mocks({"latency": 0.01, "jitter": 0.0}, {"latency": 0.01, "jitter": 0.0})
+    import app
+
+    monkeypatch.setattr(app, "GRADIO_CACHE_DIR", str(tmp_path / "jobs"))
+    yield app
+    if created:
+        shutil.rmtree(REPO_DIR / "gradio_cached_examples", ignore_errors=True)
+
+
+@pytest.fixture
+def tts_instances(monkeypatch):
+    """记录测试期间创建的TTS客户端和限流器"""
+    clients, limiters = [], []
+
+    class CountingClient(MockTTSClient):
+        def __init__(self, config):
+            super().__init__(config)
+            clients.append(self)
+
+    class CountingLimiter(tts.tools.RateLimiter):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            limiters.append(self)
+
+    TTSClientFactory.register("mock", CountingClient)
+    monkeypatch.setattr(tts.tools, "RateLimiter", CountingLimiter)
+    for registry in (tts.tools.tts_clients, tts.tools.tts_rate_limiters, tts.tools.tts_concurrency_gates):
+        monkeypatch.delitem(registry, "mock", raising=False)
+    yield clients, limiters
+    TTSClientFactory.register("mock", MockTTSClient)
+
+
+def _write_inputs(directory: Path) -> list:
+    """每个任务一个输入文件，内容带有各自的标记，用于检查文字稿是否串到其他任务"""
+    paths = []
+    for i in range(JOBS):
+        path = directory / f"input_{i}.txt"
+        path.write_text("。".join(f"这是任务标记{i}号的第{j}句测试内容" for j in range(8)) + "。", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def test_concurrent_jobs_are_isolated(app, tts_instances, tmp_path):
+    clients, limiters = tts_instances
+    inputs = _write_inputs(tmp_path)
+
+    def run(path: Path):
+        return app.generate_podcast([str(path)], "", "", "有趣", "短 (1-2分钟)", "中文", "mock", "mock")
+
+    with ThreadPoolExecutor(max_workers=JOBS) as pool:
+        results = list(pool.map(run, inputs))
+
+    audio_dirs = [Path(audio).parent for audio, _ in results]
+    assert len(set(audio_dirs)) == JOBS  # 每个任务有自己的临时目录
+    for i, (audio, transcript) in enumerate(results):
+        assert audio_dirs[i].name.startswith(f"input_{i}_")
+        assert audio_dirs[i].parent == Path(app.GRADIO_CACHE_DIR)
+        assert MP3Stream(audio).frames
+        # 文字稿只包含本任务输入的内容
+        assert f"任务标记{i}号" in transcript
+        assert not any(f"任务标记{j}号" in transcript for j in range(JOBS) if j != i)
+        # 任务目录中只有本任务的音频
+        assert all(path.parent == audio_dirs[i] for path in audio_dirs[i].rglob("*.mp3"))
+
+    # 同一TTS服务的所有任务共享一个客户端和一个限流器
+    assert len(clients) == 1
+    assert tts.tools.tts_clients["mock"].client is clients[0]  # 外层为限流包装
+    assert len(limiters) == 1
+    assert tts.tools.tts_rate_limiters["mock"] is limiters[0]
@@ -0,0 +1,158 @@
+"""
+tts/mp3.py 的单元测试：帧头解析、帧提取、Xing/Info/LAME头重建和CRC合并
+"""
+
+import os
+import struct
+
+import pytest
+
+from tts.mp3 import MP3Stream, concat_mp3, crc16, crc16_combine, parse_header
+from tts.synthetic import MP3_FRAME_BYTES, MP3_FRAME_HEADER, write_silent_mp3
+
+# MPEG-1 Layer III，联合立体声、无CRC：信息标签位于 4字节帧头 + 32字节边信息 之后
+TAG_OFFSET = 36
+
+
+def _audio_frames(count: int, seed: int) -> list:
+    """带有不同内容的音频帧，使CRC覆盖到实际数据"""
+    return [
+        MP3_FRAME_HEADER + bytes((seed + i + j) % 256 for j in range(MP3_FRAME_BYTES - len(MP3_FRAME_HEADER)))
+        for i in range(count)
+    ]
+
+
+def _write_lame_mp3(path: str, frames: list, delay: int, padding: int) -> str:
+    """写入带Info帧和LAME扩展的MP3（与LAME编码器输出的结构相同）"""
+    audio = b"".join(frames)
+    info = bytearray(MP3_FRAME_BYTES)
+    info[:4] = MP3_FRAME_HEADER
+    info[TAG_OFFSET:TAG_OFFSET + 120] = (
+        b"Info" + struct.pack(">III", 0x0F, len(frames), MP3_FRAME_BYTES + len(audio)) + bytes(100) + struct.pack(">I", 57)
+    )
+    lame = bytearray(36)
+    lame[:9] = b"LAME3.100"
+    lame[21:24] = ((delay << 12) | padding).to_bytes(3, "big")
+    lame[28:32] = struct.pack(">I", MP3_FRAME_BYTES + len(audio))
+    lame[32:34] = struct.pack(">H", crc16(audio))
+    lame_offset = TAG_OFFSET + 120
+    info[lame_offset:lame_offset + 34] = lame[:34]
+    info[lame_offset + 34:lame_offset + 36] = struct.pack(">H", crc16(bytes(info[:lame_offset + 34])))
+    with open(path, "wb") as f:
+        f.write(bytes(info) + audio)
+    return path
+
+
+def test_parse_header_mpeg1():
+    assert parse_header(MP3_FRAME_HEADER, 0) == (1, 44100, 1, 9, 417)
+    # 填充位使帧长度加1
+    padded = bytes([0xFF, 0xFB, 0x92, 0x64])
+    assert parse_header(padded, 0)[4] == 418
+
+
+def test_parse_header_mpeg2_mono():
+    # MPEG-2 Layer III，64kbps，22.05kHz，单声道
+    assert parse_header(bytes([0xFF, 0xF3, 0x80, 0xC0]), 0) == (2, 22050, 3, 8, 208)
+
+
+@pytest.mark.parametrize("header", [
+    bytes([0xFF, 0xFB, 0x90]),         # 不完整
+    bytes([0xFE, 0xFB, 0x90, 0x64]),   # 没有同步字
+    bytes([0xFF, 0xFD, 0x90, 0x64]),   # Layer II
+    bytes([0xFF, 0xFB, 0xF0, 0x64]),   # 无效码率索引
+    bytes([0xFF, 0xFB, 0x0C, 0x64]),   # 自由码率/保留采样率
+    bytes([0xFF, 0xEB, 0x90, 0x64]),   # 保留的MPEG版本
+])
+def test_parse_header_rejects_invalid(header):
+    assert parse_header(header, 0) is None
+
+
+def test_stream_skips_id3_tags_and_garbage(tmp_path):
+    frames = _audio_frames(5, seed=1)
+    id3v2 = b"ID3\x04\x00\x00\x00\x00\x00\x0a" + bytes(10)
+    id3v1 = b"TAG" + bytes(125)
+    path = tmp_path / "tagged.mp3"
+    path.write_bytes(id3v2 + frames[0] + frames[1] + b"\x00\x01\x02" + b"".join(frames[2:]) + id3v1)
+
+    stream = MP3Stream(str(path))
+    assert stream.frames == frames
+    assert stream.params == (1, 44100, 2)
+    assert stream.lame is None
+
+
+def test_stream_rejects_file_without_frames(tmp_path):
+    path = tmp_path / "empty.mp3"
+    path.write_bytes(b"not an mp3 file" * 10)
+    with pytest.raises(ValueError):
+        MP3Stream(str(path))
+
+
+def test_stream_parses_lame_header(tmp_path):
+    frames = _audio_frames(4, seed=7)
+    stream = MP3Stream(_write_lame_mp3(str(tmp_path / "a.mp3"), frames, delay=576, padding=1234))
+    assert stream.frames == frames  # Info帧不计入音频帧
+    assert (stream.encoder_delay, stream.encoder_padding, stream.quality) == (576, 1234, 57)
+    assert stream.music_crc == crc16(b"".join(frames))
+
+
+def test_concat_rebuilds_info_header(tmp_path):
+    paths = [
+        write_silent_mp3(str(tmp_path / "a.mp3"), 0.5),
+        write_silent_mp3(str(tmp_path / "b.mp3"), 1.0),
+    ]
+    output = str(tmp_path / "out.mp3")
+    concat_mp3(paths, output)
+
+    frames = [frame for path in paths for frame in MP3Stream(path).frames]
+    data = open(output, "rb").read()
+    info_size = parse_header(data, 0)[4]
+    assert data[TAG_OFFSET:TAG_OFFSET + 4] == b"Info"
+    assert struct.unpack(">III", data[TAG_OFFSET + 4:TAG_OFFSET + 16]) == (0x0F, len(frames), os.path.getsize(output))
+    assert data[info_size:] == b"".join(frames)
+    stream = MP3Stream(output)
+    assert stream.frames == frames
+    assert stream.lame is None  # 输入没有LAME扩展时不生成
+
+
+def test_concat_rebuilds_lame_header(tmp_path):
+    first, second, third = _audio_frames(3, seed=0), _audio_frames(5, seed=100), _audio_frames(2, seed=200)
+    paths = [
+        _write_lame_mp3(str(tmp_path / "a.mp3"), first, delay=576, padding=100),
+        _write_lame_mp3(str(tmp_path / "b.mp3"), second, delay=600, padding=200),
+        _write_lame_mp3(str(tmp_path / "c.mp3"), third, delay=700, padding=300),
+    ]
+    output = str(tmp_path / "out.mp3")
+    concat_mp3(paths, output)
+
+    stream = MP3Stream(output)  # LAME扩展自身的CRC校验通过才会被识别
+    audio = b"".join(first + second + third)
+    assert b"".join(stream.frames) == audio
+    assert stream.lame is not None
+    assert stream.encoder_delay == 576   # 取第一段
+    assert stream.encoder_padding == 300  # 取最后一段
+    assert stream.music_crc == crc16(audio)
+    assert struct.unpack(">I", stream.lame[28:32])[0] == os.path.getsize(output)
+
+
+def test_concat_rejects_mismatched_params(tmp_path):
+    mono = tmp_path / "mono.mp3"
+    mono.write_bytes(bytes([0xFF, 0xF3, 0x80, 0xC0]) + bytes(204))
+    stereo = write_silent_mp3(str(tmp_path / "stereo.mp3"), 0.1)
+    with pytest.raises(ValueError):
+        concat_mp3([stereo, str(mono)], str(tmp_path / "out.mp3"))
+
+
+def test_crc16_check_value():
+    # CRC-16/ARC 的标准校验值
+    assert crc16(b"123456789") == 0xBB3D
+
+
+@pytest.mark.parametrize("split", [0, 1, 7, 255, 256, 1000])
+def test_crc16_combine_matches_concatenation(split):
+    data = bytes((i * 31 + 7) % 256 for i in range(1000))
+    first, second = data[:split], data[split:]
+    assert crc16_combine(crc16(first), crc16(second), len(second)) == crc16(data)
+
+
+def test_crc16_combine_empty_suffix():
+    assert crc16_combine(0x1234, 0, 0) == 0x1234
@@ -0,0 +1,129 @@
+"""
+llm/patch.py 的单元测试：逐条修改的应用顺序和非法修改的拒绝
+"""
+
+import pytest
+
+from llm.patch import apply_dialogue_patch, format_numbered_dialogue
+from schema import DialogueEdit, DialoguePatch, MediumDialogue, ShortDialogue
+
+DRAFT = ShortDialogue(
+    scratchpad="草稿",
+    name_of_guest="李四",
+    dialogue=[
+        {"speaker": "Host (Jane)", "text": "第0句"},
+        {"speaker": "Guest", "text": "第1句"},
+        {"speaker": "Host (Jane)", "text": "第2句"},
+        {"speaker": "Guest", "text": "第3句"},
+    ],
+)
+
+
+def _apply(*edits, draft=DRAFT):
+    return apply_dialogue_patch(draft, DialoguePatch(edits=[DialogueEdit(**edit) for edit in edits]))
+
+
+def _lines(dialogue):
+    return [(item.speaker, item.text) for item in dialogue.dialogue]
+
+
+def test_format_numbered_dialogue():
+    assert format_numbered_dialogue(DRAFT).splitlines() == [
+        "[0] Host (Jane): 第0句",
+        "[1] Guest: 第1句",
+        "[2] Host (Jane): 第2句",
+        "[3] Guest: 第3句",
+    ]
+
+
+def test_empty_patch_returns_copy_of_draft():
+    result = _apply()
+    assert result == DRAFT
+    assert result is not DRAFT
+
+
+def test_replace_keeps_speaker_unless_given():
+    result = _apply(
+        {"op": "replace", "index": 1, "text": "  新的第1句 "},
+        {"op": "replace", "index": 2, "speaker": "Guest", "text": "新的第2句"},
+    )
+    assert _lines(result) == [
+        ("Host (Jane)", "第0句"),
+        ("Guest", "新的第1句"),
+        ("Guest", "新的第2句"),
+        ("Guest", "第3句"),
+    ]
+
+
+def test_indexes_refer_to_draft_positions():
+    # 删除和插入不影响其他修改的序号，修改的先后顺序也无关
+    result = _apply(
+        {"op": "replace", "index": 3, "text": "新的第3句"},
+        {"op": "delete", "index": 0},
+        {"op": "insert", "index": 2, "speaker": "Guest", "text": "插在第2句前"},
+        {"op": "insert", "index": 4, "speaker": "Host (Jane)", "text": "追加在末尾"},
+    )
+    assert _lines(result) == [
+        ("Guest", "第1句"),
+        ("Guest", "插在第2句前"),
+        ("Host (Jane)", "第2句"),
+        ("Guest", "新的第3句"),
+        ("Host (Jane)", "追加在末尾"),
+    ]
+
+
+def test_multiple_inserts_at_same_index_keep_order():
+    result = _apply(
+        {"op": "insert", "index": 0, "speaker": "Host (Jane)", "text": "开场A"},
+        {"op": "insert", "index": 0, "speaker": "Guest", "text": "开场B"},
+        {"op": "delete", "index": 0},
+    )
+    assert [text for _, text in _lines(result)] == ["开场A", "开场B", "第1句", "第2句", "第3句"]
+
+
+def test_result_keeps_model_type_and_other_fields():
+    draft = MediumDialogue.model_validate(DRAFT.model_dump())
+    result = _apply({"op": "delete", "index": 1}, draft=draft)
+    assert type(result) is MediumDialogue
+    assert (result.scratchpad, result.name_of_guest) == ("草稿", "李四")
+
+
+@pytest.mark.parametrize("edit", [
+    {"op": "replace", "index": 4, "text": "越界"},
+    {"op": "delete", "index": -1},
+    {"op": "insert", "index": 5, "speaker": "Guest", "text": "越界"},
+    {"op": "insert", "index": -1, "speaker": "Guest", "text": "越界"},
+])
+def test_rejects_out_of_range_index(edit):
+    with pytest.raises(ValueError, match="越界"):
+        _apply(edit)
+
+
+@pytest.mark.parametrize("edits", [
+    [{"op": "replace", "index": 1, "text": "a"}, {"op": "replace", "index": 1, "text": "b"}],
+    [{"op": "replace", "index": 1, "text": "a"}, {"op": "delete", "index": 1}],
+    [{"op": "delete", "index": 2}, {"op": "delete", "index": 2}],
+])
+def test_rejects_duplicate_edits(edits):
+    with pytest.raises(ValueError, match="重复修改"):
+        _apply(*edits)
+
+
+@pytest.mark.parametrize("edit", [
+    {"op": "replace", "index": 0},
+    {"op": "replace", "index": 0, "text": "   "},
+    {"op": "insert", "index": 0, "speaker": "Guest"},
+])
+def test_rejects_missing_text(edit):
+    with pytest.raises(ValueError, match="缺少文本"):
+        _apply(edit)
+
+
+def test_rejects_insert_without_speaker():
+    with pytest.raises(ValueError, match="缺少说话者"):
+        _apply({"op": "insert", "index": 0, "text": "没有说话者"})
+
+
+def test_rejects_empty_result():
+    with pytest.raises(ValueError, match="为空"):
+        _apply(*({"op": "delete", "index": i} for i in range(4)))
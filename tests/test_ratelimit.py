@@ -0,0 +1,113 @@
+"""
+tts/ratelimit.py 的单元测试：用假时钟验证令牌桶的突发容量、等待时长和令牌补充，以及命中缓存不受限流
+"""
+
+import os
+import threading
+
+import pytest
+
+import tts.ratelimit
+from tts.base import TTSClient
+from tts.cache import CachedTTSClient, TTSCache
+from tts.ratelimit import RateLimiter, ThrottledTTSClient
+
+
+class FakeClock:
+    """替代time模块：sleep只推进时钟并记录时长"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(tts.ratelimit, "time", clock)
+    return clock
+
+
+def test_burst_capacity_is_available_immediately(clock):
+    limiter = RateLimiter(rate=2, burst=3)
+    assert [limiter.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert clock.sleeps == []
+
+
+@pytest.mark.parametrize("rate, capacity", [(0.5, 1), (2, 2), (2.5, 3), (10, 10)])
+def test_default_capacity(clock, rate, capacity):
+    assert RateLimiter(rate).capacity == capacity
+
+
+def test_waits_one_interval_per_token_after_burst(clock):
+    limiter = RateLimiter(rate=4, burst=2)
+    limiter.acquire()
+    limiter.acquire()
+    start = clock.now
+    waits = [limiter.acquire() for _ in range(3)]
+    assert waits == pytest.approx([0.25, 0.25, 0.25])
+    assert clock.now - start == pytest.approx(0.75)
+
+
+def test_partial_refill_shortens_wait(clock):
+    limiter = RateLimiter(rate=2, burst=1)
+    limiter.acquire()
+    clock.now += 0.2  # 补充了0.4个令牌，还差0.6个
+    assert limiter.acquire() == pytest.approx(0.3)
+
+
+def test_refill_is_capped_at_capacity(clock):
+    limiter = RateLimiter(rate=1, burst=2)
+    limiter.acquire()
+    limiter.acquire()
+    clock.now += 60  # 空闲很久也只补满容量
+    assert [limiter.acquire() for _ in range(2)] == [0.0, 0.0]
+    assert limiter.acquire() == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("rate", [0, -1])
+def test_non_positive_rate_disables_limiting(clock, rate):
+    limiter = RateLimiter(rate)
+    assert [limiter.acquire() for _ in range(100)] == [0.0] * 100
+    assert clock.sleeps == []
+
+
+class RecordingClient(TTSClient):
+    """记录合成请求，写出一个小文件作为音频"""
+
+    def __init__(self):
+        super().__init__({})
+        self.calls = []
+
+    def synthesize(self, text, speaker, language, output_dir=None, sequence_number=None):
+        self.calls.append(text)
+        path = os.path.join(output_dir, f"{speaker}_{sequence_number}.mp3")
+        with open(path, "wb") as f:
+            f.write(text.encode("utf-8"))
+        return path
+
+
+def test_cache_hits_skip_gate_and_limiter(clock, tmp_path):
+    provider = RecordingClient()
+    limiter = RateLimiter(rate=1, burst=1)
+    client = CachedTTSClient(
+        ThrottledTTSClient(provider, "test", threading.BoundedSemaphore(1), limiter),
+        "test", TTSCache(str(tmp_path / "cache"), 10 ** 6),
+    )
+    lines = ["第一句", "第二句"]
+    for i, text in enumerate(lines):
+        client.synthesize(text, "Guest", "zh", str(tmp_path), i)
+    assert clock.sleeps == [pytest.approx(1.0)]  # 两次未命中，第二次等待一个令牌
+
+    # 全部命中缓存：不再请求服务，也不等待令牌
+    for i, text in enumerate(lines * 5):
+        client.synthesize(text, "Guest", "zh", str(tmp_path), 10 + i)
+    assert provider.calls == lines
+    assert clock.sleeps == [pytest.approx(1.0)]
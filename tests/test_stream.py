@@ -0,0 +1,128 @@
+"""
+llm/stream.py 的单元测试：增量JSON解析跨分块边界和转义字符，以及流式结果的兜底解析
+"""
+
+import json
+
+import pytest
+
+from llm.base import LLMClient
+from llm.stream import DialogueStream, IncrementalDialogueParser
+from schema import ShortDialogue
+
+DIALOGUE = {
+    "scratchpad": "草稿里有 {花括号} 和 [方括号]，还有 \"dialogue\": [ 这样的文本",
+    "name_of_guest": "张\"三\"",
+    "dialogue": [
+        {"speaker": "Host (Jane)", "text": "欢迎收听！路径是 C:\\temp\\{x}"},
+        {"speaker": "Guest", "text": "他说：\"你好\"，然后换行\n继续 }]"},
+        {"speaker": "Host (Jane)", "text": "\\\" 结尾的反斜杠 \\"},
+    ],
+}
+TEXT = json.dumps(DIALOGUE, ensure_ascii=False)
+FIRST_ITEM = json.dumps(DIALOGUE["dialogue"][0], ensure_ascii=False)
+FIRST_ITEM_END = TEXT.index(FIRST_ITEM) + len(FIRST_ITEM)
+
+
+def _feed(chunks):
+    parser = IncrementalDialogueParser()
+    completed = []
+    for chunk in chunks:
+        completed.extend(parser.feed(chunk))
+    return completed
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 17, len(TEXT)])
+def test_parser_yields_items_across_chunk_boundaries(size):
+    chunks = [TEXT[i:i + size] for i in range(0, len(TEXT), size)]
+    assert _feed(chunks) == DIALOGUE["dialogue"]
+
+
+def test_parser_yields_each_item_as_soon_as_it_closes():
+    parser = IncrementalDialogueParser()
+    assert parser.feed(TEXT[:FIRST_ITEM_END - 1]) == []
+    assert parser.feed(TEXT[FIRST_ITEM_END - 1:FIRST_ITEM_END]) == [DIALOGUE["dialogue"][0]]
+
+
+def test_parser_splits_inside_escape_sequences():
+    # 在反斜杠和被转义字符之间断开
+    chunks = []
+    rest = TEXT
+    while "\\" in rest:
+        cut = rest.index("\\") + 1
+        chunks.append(rest[:cut])
+        rest = rest[cut:]
+    chunks.append(rest)
+    assert len(chunks) > 3
+    assert _feed(chunks) == DIALOGUE["dialogue"]
+
+
+def test_parser_ignores_objects_outside_dialogue_array():
+    text = json.dumps({
+        "meta": {"dialogue": "不是数组"},
+        "other": [{"speaker": "Guest", "text": "不属于对话"}],
+        "dialogue": [{"speaker": "Guest", "text": "对话", "extra": {"nested": [1, {"a": 2}]}}],
+        "after": [{"speaker": "Guest", "text": "数组结束后"}],
+    }, ensure_ascii=False)
+    assert _feed([text]) == [{"speaker": "Guest", "text": "对话", "extra": {"nested": [1, {"a": 2}]}}]
+
+
+def test_parser_tolerates_code_fences_and_whitespace():
+    text = "```json\n" + json.dumps(DIALOGUE, ensure_ascii=False, indent=2) + "\n```"
+    assert _feed([text[i:i + 4] for i in range(0, len(text), 4)]) == DIALOGUE["dialogue"]
+
+
+def test_stream_builds_validated_result():
+    stream = DialogueStream(iter([TEXT[i:i + 7] for i in range(0, len(TEXT), 7)]), ShortDialogue)
+    completed = []
+    stream.on_complete = completed.append
+    items = list(stream)
+    assert [item.model_dump() for item in items] == DIALOGUE["dialogue"]
+    assert stream.result == ShortDialogue.model_validate(DIALOGUE)
+    assert completed == [stream.result]
+    assert stream.name_of_guest == '张"三"'
+
+
+def test_stream_keeps_parsed_items_when_output_is_truncated():
+    stream = DialogueStream(iter([TEXT[:FIRST_ITEM_END]]), ShortDialogue)
+    assert len(list(stream)) == 1
+    assert stream.result.name_of_guest == '张"三"'
+
+
+def test_stream_falls_back_to_plain_text_script():
+    stream = DialogueStream(iter(["主持人: 大家好\n", "嘉宾: 你好"]), ShortDialogue)
+    items = list(stream)
+    assert [(item.speaker, item.text) for item in items] == [("Host (Jane)", "大家好"), ("Guest", "你好")]
+    assert stream.result.dialogue == items
+
+
+def test_stream_falls_back_to_script_field():
+    stream = DialogueStream(iter([json.dumps({"script": "Host: hi\nGuest: hello"})]), ShortDialogue)
+    assert [(item.speaker, item.text) for item in stream] == [("Host (Jane)", "hi"), ("Guest", "hello")]
+
+
+def test_stream_raises_when_nothing_can_be_parsed():
+    with pytest.raises(Exception, match="流式输出无法解析为对话"):
+        list(DialogueStream(iter(["  "]), ShortDialogue))
+
+
+class TextClient(LLMClient):
+    """generate 返回原始文本的平台（解析失败时的硅基流动）"""
+
+    def __init__(self, output):
+        super().__init__({})
+        self.output = output
+
+    def generate(self, system_prompt, user_prompt, response_format):
+        return self.output
+
+
+def test_default_generate_stream_parses_raw_text_result():
+    stream = TextClient("主持人: 大家好\n嘉宾: 你好").generate_stream("", "", ShortDialogue)
+    assert [(item.speaker, item.text) for item in stream] == [("Host (Jane)", "大家好"), ("Guest", "你好")]
+    assert isinstance(stream.result, ShortDialogue)
+
+
+def test_default_generate_stream_rejects_unparseable_text():
+    with pytest.raises(Exception, match="大模型输出无法解析为对话"):
+        TextClient("  ").generate_stream("", "", ShortDialogue)
@@ -0,0 +1,37 @@
+"""
+tts/config.py 的单元测试：环境变量覆盖默认配置（包括字典类配置）
+"""
+
+import pytest
+
+from tts.config import get_config_with_env_overrides
+from tts.synthetic import SyntheticTTSClient
+
+
+def test_scalar_overrides_keep_type(monkeypatch):
+    monkeypatch.setenv("SYNTHETIC_MAX_CONCURRENCY", "3")
+    monkeypatch.setenv("SYNTHETIC_PAUSE", "0.5")
+    monkeypatch.setenv("SYNTHETIC_FORMAT", "wav")
+    config = get_config_with_env_overrides(SyntheticTTSClient, "SYNTHETIC")
+    assert (config["max_concurrency"], config["pause"], config["format"]) == (3, 0.5, "wav")
+
+
+def test_dict_overrides_are_parsed_and_merged(monkeypatch):
+    monkeypatch.setenv("SYNTHETIC_CHARS_PER_SECOND", '{"zh": 9.0, "fr": 12}')
+    monkeypatch.setenv("SYNTHETIC_SPEAKER_SPEED", '{"Guest": 0.5}')
+    config = get_config_with_env_overrides(SyntheticTTSClient, "SYNTHETIC")
+    assert config["chars_per_second"] == {"zh": 9.0, "ja": 7.0, "ko": 6.0, "default": 14.0, "fr": 12}
+    assert config["speaker_speed"]["Guest"] == 0.5
+    assert config["speaker_speed"]["Host (Jane)"] == 1.0
+    # 默认配置不受影响
+    assert SyntheticTTSClient.DEFAULT_CONFIG["chars_per_second"]["zh"] == 4.5
+
+    client = SyntheticTTSClient(config)
+    assert client.estimate_duration("一二三四五六七八九", "Guest", "zh") == pytest.approx(9 / (9.0 * 0.5) + 0.3)
+
+
+@pytest.mark.parametrize("value", ["4.5", "{zh: 4.5}", "[1, 2]"])
+def test_dict_override_must_be_json_object(monkeypatch, value):
+    monkeypatch.setenv("SYNTHETIC_CHARS_PER_SECOND", value)
+    with pytest.raises(ValueError, match="SYNTHETIC_CHARS_PER_SECOND"):
+        get_config_with_env_overrides(SyntheticTTSClient, "SYNTHETIC")
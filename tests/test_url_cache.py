@@ -0,0 +1,67 @@
+"""
+tool/url_cache.py 的单元测试：条件请求重新验证（响应头名大小写不敏感）
+"""
+
+import pytest
+from requests.structures import CaseInsensitiveDict
+
+from tool.url_cache import URLCache
+
+URL = "https://example.com/article"
+
+
+class FakeFetcher:
+    """记录每次请求的条件请求头，按顺序返回预设的响应"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def __call__(self, url, headers):
+        self.requests.append(dict(headers))
+        return self.responses.pop(0)
+
+
+@pytest.mark.parametrize("headers", [
+    {"etag": '"v1"', "last-modified": "Wed, 01 Jan 2025 00:00:00 GMT"},
+    {"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"},
+    CaseInsensitiveDict({"etag": '"v1"', "last-modified": "Wed, 01 Jan 2025 00:00:00 GMT"}),
+])
+def test_revalidates_with_stored_validators(tmp_path, headers):
+    cache = URLCache(str(tmp_path), ttl=0)  # 每次读取都已过期，需要重新验证
+    fetcher = FakeFetcher((200, "正文", headers), (304, "", {}))
+
+    assert cache.get(URL, fetcher) == "正文"
+    assert cache.get(URL, fetcher) == "正文"
+    assert fetcher.requests == [
+        {},
+        {"If-None-Match": '"v1"', "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT"},
+    ]
+
+
+def test_fresh_entry_is_served_without_request(tmp_path):
+    cache = URLCache(str(tmp_path), ttl=3600)
+    fetcher = FakeFetcher((200, "正文", {"etag": '"v1"'}))
+    assert cache.get(URL, fetcher) == "正文"
+    assert cache.get(URL, fetcher) == "正文"
+    assert len(fetcher.requests) == 1
+
+
+def test_modified_content_replaces_entry(tmp_path):
+    cache = URLCache(str(tmp_path), ttl=0)
+    fetcher = FakeFetcher((200, "旧正文", {"etag": '"v1"'}), (200, "新正文", {"etag": '"v2"'}), (304, "", {}))
+    assert cache.get(URL, fetcher) == "旧正文"
+    assert cache.get(URL, fetcher) == "新正文"
+    assert cache.get(URL, fetcher) == "新正文"
+    assert fetcher.requests[2] == {"If-None-Match": '"v2"'}
+
+
+def test_failed_refetch_falls_back_to_stale_entry(tmp_path):
+    cache = URLCache(str(tmp_path), ttl=0)
+    fetcher = FakeFetcher((200, "正文", {}))
+    assert cache.get(URL, fetcher) == "正文"
+
+    def failing(url, headers):
+        raise Exception("网络错误")
+
+    assert cache.get(URL, failing) == "正文"
@@ -0,0 +1,11 @@
+"""
+内容读取模块
+
+包含文档解析、网页读取等输入处理函数。
+"""
+
+from .files import process_files, warm_up_extraction_pool
+from .url import parse_url, process_url
+from .ingest import ingest_sources, split_urls
+
+__all__ = ["process_files", "warm_up_extraction_pool", "parse_url", "process_url", "ingest_sources", "split_urls"]
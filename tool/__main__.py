@@ -0,0 +1,12 @@
+"""
+tool模块命令行入口
+
+用法：
+    python -m tool stats                      # 查看文档提取缓存占用
+    python -m tool list                       # 列出缓存条目
+    python -m tool purge [--older-than 秒数]  # 清理缓存
+"""
+
+from .extract_cache import main
+
+main()
@@ -0,0 +1,188 @@
+"""
+文档提取缓存模块
+
+包含ExtractionCache类，按文件内容SHA-256和提取器版本缓存规范化后的文本、
+分页偏移和字符数，重复上传的文档无需再次解析。
+
+命令行管理（见 tool/__main__.py）：
+    python -m tool stats
+    python -m tool list
+    python -m tool purge [--older-than 秒数]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from constants import (
+    EXTRACTION_CACHE_DIR,
+    EXTRACTION_CACHE_ENABLED,
+    EXTRACTION_CACHE_MAX_BYTES,
+)
+from metrics import CACHE_REQUESTS
+from .extractors import EXTRACTOR_VERSION, normalize_text
+
+
+def file_digest(path: str) -> str:
+    """计算文件内容的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_entry(digest: str, name: str, pages: List[str]) -> Dict[str, Any]:
+    """将各页文本规范化并拼接，记录每页在全文中的起始偏移"""
+    page_offsets = []
+    normalized_pages = []
+    offset = 0
+    for page in pages:
+        page_text = normalize_text(page)
+        page_offsets.append(offset)
+        normalized_pages.append(page_text)
+        offset += len(page_text) + 1  # 页之间以换行分隔
+    text = "\n".join(normalized_pages)
+    return {
+        "sha256": digest,
+        "extractor_version": EXTRACTOR_VERSION,
+        "name": name,
+        "text": text,
+        "page_offsets": page_offsets,
+        "char_count": len(text),
+        "created_at": time.time(),
+    }
+
+
+class ExtractionCache:
+    """基于磁盘的文档提取缓存，按总字节数进行LRU淘汰"""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}_v{EXTRACTOR_VERSION}.json"
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """读取缓存条目，未命中返回None"""
+        path = self._path(digest)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            CACHE_REQUESTS.inc(cache="extraction", result="miss")
+            return None
+        CACHE_REQUESTS.inc(cache="extraction", result="hit")
+        try:
+            os.utime(path)  # 更新访问时间，用于LRU淘汰
+        except OSError:
+            pass
+        return entry
+
+    def put(self, entry: Dict[str, Any]) -> None:
+        """写入缓存条目，超出容量时淘汰最久未使用的条目"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(entry["sha256"])
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._evict()
+
+    def _files(self) -> List[Tuple[Path, os.stat_result]]:
+        files = []
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    files.append((path, path.stat()))
+                except OSError:
+                    continue
+        return files
+
+    def _evict(self) -> None:
+        files = sorted(self._files(), key=lambda item: item[1].st_mtime)
+        total = sum(stat.st_size for _, stat in files)
+        while files and total > self.max_bytes:
+            path, stat = files.pop(0)
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+            logger.info(f"提取缓存淘汰: {path.name}")
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """列出缓存条目的摘要信息（不含正文）"""
+        result = []
+        for path, stat in sorted(self._files(), key=lambda item: item[1].st_mtime, reverse=True):
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            result.append({
+                "sha256": entry.get("sha256"),
+                "extractor_version": entry.get("extractor_version"),
+                "name": entry.get("name"),
+                "pages": len(entry.get("page_offsets", [])),
+                "char_count": entry.get("char_count"),
+                "bytes": stat.st_size,
+                "last_access": stat.st_mtime,
+            })
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """返回条目数和占用字节数"""
+        files = self._files()
+        return {"entries": len(files), "bytes": sum(stat.st_size for _, stat in files), "max_bytes": self.max_bytes}
+
+    def purge(self, older_than: Optional[float] = None) -> int:
+        """删除缓存条目；指定older_than时只删除超过该秒数未访问的条目，返回删除数量"""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for path, stat in self._files():
+                if older_than is None or now - stat.st_mtime > older_than:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+        return removed
+
+
+# 全局提取缓存
+_extraction_cache = None
+_extraction_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """获取文档提取缓存（懒加载），未启用时返回None"""
+    global _extraction_cache
+    if _extraction_cache is None and EXTRACTION_CACHE_ENABLED:
+        with _extraction_cache_lock:
+            if _extraction_cache is None:
+                _extraction_cache = ExtractionCache(EXTRACTION_CACHE_DIR, EXTRACTION_CACHE_MAX_BYTES)
+    return _extraction_cache
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """命令行入口：查看或清理文档提取缓存"""
+    parser = argparse.ArgumentParser(description="查看或清理文档提取缓存")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="显示缓存条目数和占用空间")
+    subparsers.add_parser("list", help="列出缓存条目")
+    purge_parser = subparsers.add_parser("purge", help="清理缓存")
+    purge_parser.add_argument("--older-than", type=float, default=None, help="只清理超过该秒数未访问的条目")
+    args = parser.parse_args(argv)
+
+    cache = ExtractionCache(EXTRACTION_CACHE_DIR, EXTRACTION_CACHE_MAX_BYTES)
+    if args.command == "stats":
+        print(json.dumps(cache.stats(), ensure_ascii=False, indent=2))
+    elif args.command == "list":
+        for entry in cache.entries():
+            print(json.dumps(entry, ensure_ascii=False))
+    elif args.command == "purge":
+        removed = cache.purge(args.older_than)
+        print(f"已清理 {removed} 个缓存条目")
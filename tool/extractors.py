@@ -0,0 +1,56 @@
+"""
+文档文本提取模块
+
+包含在解析进程中执行的各类文档提取函数。本模块只依赖解析库，
+避免子进程导入整个应用的配置。
+"""
+
+import re
+import unicodedata
+from pathlib import Path
+from typing import List
+
+import chardet
+from docx import Document
+from pypdf import PdfReader
+
+# 提取逻辑版本号，提取或规范化方式变化时递增，使旧的提取缓存失效
+EXTRACTOR_VERSION = "1"
+
+# 支持的文件类型
+PDF_SUFFIXES = {".pdf"}
+DOCX_SUFFIXES = {".docx"}
+TEXT_SUFFIXES = {".txt", ".md"}
+SUPPORTED_SUFFIXES = PDF_SUFFIXES | DOCX_SUFFIXES | TEXT_SUFFIXES
+
+
+def count_pdf_pages(path: str) -> int:
+    """获取PDF页数"""
+    return len(PdfReader(path).pages)
+
+
+def extract_pdf_pages(path: str, start: int, end: int) -> List[str]:
+    """提取PDF中[start, end)范围内各页的文本"""
+    reader = PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+def extract_docx(path: str) -> List[str]:
+    """提取Word文档的文本（整篇作为一页）"""
+    document = Document(path)
+    return ["\n".join(paragraph.text for paragraph in document.paragraphs)]
+
+
+def extract_text(path: str) -> List[str]:
+    """读取纯文本文件，自动检测编码（整篇作为一页）"""
+    raw = Path(path).read_bytes()
+    encoding = chardet.detect(raw[:100_000]).get("encoding") or "utf-8"
+    return [raw.decode(encoding, errors="replace")]
+
+
+def normalize_text(text: str) -> str:
+    """规范化提取出的文本：统一换行、去除行尾空白、合并多余空行"""
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    text = re.sub(r"[ \t]+\n", "\n", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
@@ -0,0 +1,201 @@
+"""
+文档解析模块
+
+包含process_files函数，使用进程池按文件/页范围并行提取文本，
+按原始顺序汇总，并在累计字符数超过上限时立即停止。
+"""
+
+import multiprocessing
+import os
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+from loguru import logger
+
+from constants import (
+    CHARACTER_LIMIT,
+    ERROR_MESSAGE_NOT_PDF,
+    ERROR_MESSAGE_TOO_LONG,
+    EXTRACTION_MAX_WORKERS,
+    EXTRACTION_PDF_PAGES_PER_TASK,
+)
+from .extract_cache import ExtractionCache, build_entry, file_digest, get_extraction_cache
+from .extractors import (
+    DOCX_SUFFIXES,
+    PDF_SUFFIXES,
+    SUPPORTED_SUFFIXES,
+    count_pdf_pages,
+    extract_docx,
+    extract_pdf_pages,
+    extract_text,
+)
+
+# 跨请求复用的解析进程池
+_extraction_pool = None
+_extraction_pool_lock = threading.Lock()
+
+
+def _preload_modules() -> List[str]:
+    """
+    文档解析进程池的forkserver预加载的模块
+
+    forkserver/spawn 子进程启动时会重新执行主程序（以 __mp_main__ 运行）。预加载主程序模块后，
+    它导入的依赖（如Gradio）已在forkserver中加载，子进程重新执行主程序时不必再次导入。
+    """
+    modules = ["tool.extractors"]
+    main_module = sys.modules.get("__main__")
+    spec = getattr(main_module, "__spec__", None)
+    main_name = spec.name if spec is not None else Path(getattr(main_module, "__file__", None) or "").stem
+    # python -m 运行的 __main__.py 不会在子进程中重新执行，也不能预加载
+    if main_name and not main_name.endswith("__main__"):
+        modules.append(main_name)
+    return modules
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """
+    获取文档解析进程池（懒加载）
+
+    在Gradio/任务调度的多线程进程中fork可能复制被其他线程持有的锁而死锁，因此子进程由
+    单线程的forkserver派生（不支持时使用spawn），forkserver预先加载解析和主程序的依赖
+    """
+    global _extraction_pool
+    if _extraction_pool is None:
+        with _extraction_pool_lock:
+            if _extraction_pool is None:
+                if "forkserver" in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context("forkserver")
+                    context.set_forkserver_preload(_preload_modules())
+                else:
+                    context = multiprocessing.get_context("spawn")
+                _extraction_pool = ProcessPoolExecutor(max_workers=max(1, EXTRACTION_MAX_WORKERS), mp_context=context)
+    return _extraction_pool
+
+
+def warm_up_extraction_pool() -> None:
+    """在后台预先启动文档解析进程池（不等待），首次上传文档时不必等待forkserver启动"""
+    get_extraction_pool().submit(os.getpid)
+
+
+def _file_path(file: Any) -> str:
+    """兼容Gradio传入的文件路径或临时文件对象"""
+    return str(getattr(file, "name", file))
+
+
+def _validate_suffixes(paths: List[str]) -> None:
+    """检查文件类型，不支持时抛出ValueError"""
+    for path in paths:
+        if Path(path).suffix.lower() not in SUPPORTED_SUFFIXES:
+            raise ValueError(f"{ERROR_MESSAGE_NOT_PDF} ({Path(path).name})")
+
+
+def _plan_tasks(paths: List[str], indexes: List[int]) -> List[Tuple[int, Callable[..., List[str]], tuple]]:
+    """将需要解析的文件拆分为任务：(文件序号, 提取函数, 参数)，大PDF按页范围拆分"""
+    tasks = []
+    for index in indexes:
+        path = paths[index]
+        suffix = Path(path).suffix.lower()
+        if suffix in PDF_SUFFIXES:
+            page_count = count_pdf_pages(path)
+            step = max(1, EXTRACTION_PDF_PAGES_PER_TASK)
+            for start in range(0, page_count, step):
+                tasks.append((index, extract_pdf_pages, (path, start, min(start + step, page_count))))
+        elif suffix in DOCX_SUFFIXES:
+            tasks.append((index, extract_docx, (path,)))
+        else:
+            tasks.append((index, extract_text, (path,)))
+    return tasks
+
+
+def process_files(files: List[Any], character_limit: Optional[int] = CHARACTER_LIMIT) -> str:
+    """
+    并行提取PDF/Word/TXT文档的文本
+
+    已解析过的文件（按内容哈希）直接读取提取缓存，不再解析。
+
+    Args:
+        files: 文件路径列表
+        character_limit: 字符数上限，累计超过时立即停止解析并抛出ValueError；None表示不限制
+
+    Returns:
+        按上传顺序拼接的规范化文本，文件之间以空行分隔
+    """
+    paths = [_file_path(file) for file in files]
+    _validate_suffixes(paths)
+
+    # 先查提取缓存
+    cache = get_extraction_cache()
+    digests = [file_digest(path) if cache else "" for path in paths]
+    file_texts: List[Optional[str]] = [None] * len(paths)
+    total_characters = 0
+    uncached = []
+    for index, digest in enumerate(digests):
+        entry = cache.get(digest) if cache else None
+        if entry:
+            file_texts[index] = entry["text"]
+            total_characters += entry["char_count"]
+        else:
+            uncached.append(index)
+
+    if cache:
+        logger.info(f"提取缓存命中 {len(paths) - len(uncached)}/{len(paths)} 个文件")
+    if character_limit is not None and total_characters > character_limit:
+        raise ValueError(ERROR_MESSAGE_TOO_LONG)
+
+    tasks = _plan_tasks(paths, uncached)
+    remaining_tasks = {index: 0 for index in uncached}
+    for index, _, _ in tasks:
+        remaining_tasks[index] += 1
+
+    pool = get_extraction_pool() if tasks else None
+    # 限制在途任务数量，超出字符上限时尚未提交的任务不会被解析
+    max_in_flight = max(1, EXTRACTION_MAX_WORKERS) * 2
+    pending: deque = deque()
+    file_pages: List[List[str]] = [[] for _ in paths]
+    next_task = 0
+
+    try:
+        while next_task < len(tasks) or pending:
+            while next_task < len(tasks) and len(pending) < max_in_flight:
+                index, func, args = tasks[next_task]
+                pending.append((index, pool.submit(func, *args)))
+                next_task += 1
+
+            index, future = pending.popleft()
+            pages = future.result()
+            file_pages[index].extend(pages)
+            total_characters += sum(len(page) for page in pages)
+
+            if character_limit is not None and total_characters > character_limit:
+                logger.warning(f"文档文本超过 {character_limit} 字符，停止解析")
+                raise ValueError(ERROR_MESSAGE_TOO_LONG)
+
+            remaining_tasks[index] -= 1
+            if remaining_tasks[index] == 0:
+                _finish_file(index, paths, digests, file_pages, file_texts, cache)
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+    # 没有任何解析任务的文件（如空PDF）
+    for index in uncached:
+        if file_texts[index] is None:
+            _finish_file(index, paths, digests, file_pages, file_texts, cache)
+
+    logger.info(f"解析 {len(paths)} 个文件，共 {len(tasks)} 个任务，{total_characters} 字符")
+    return "\n\n".join(text for text in file_texts if text)
+
+
+def _finish_file(index: int, paths: List[str], digests: List[str], file_pages: List[List[str]], file_texts: List[Optional[str]], cache: Optional[ExtractionCache]) -> None:
+    """文件全部页面解析完成后规范化文本并写入提取缓存"""
+    entry = build_entry(digests[index], Path(paths[index]).name, file_pages[index])
+    file_texts[index] = entry["text"]
+    if cache:
+        try:
+            cache.put(entry)
+        except OSError as e:
+            logger.warning(f"写入提取缓存失败: {e}")
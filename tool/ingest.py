@@ -0,0 +1,85 @@
+"""
+内容汇总模块
+
+包含ingest_sources函数，并发读取上传文件和多个URL，并按确定顺序拼接
+"""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional
+
+from loguru import logger
+
+from constants import CHARACTER_LIMIT
+from metrics import INGEST_BYTES
+from .files import process_files
+from .url import process_url
+
+
+def split_urls(url_text: Optional[str]) -> List[str]:
+    """将输入框中的URL按换行、空白或逗号拆分，去重并保持顺序"""
+    if not url_text:
+        return []
+    urls = []
+    for url in re.split(r"[\s,，]+", url_text.strip()):
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def ingest_sources(files: Optional[List[Any]], urls: List[str], character_limit: Optional[int] = CHARACTER_LIMIT) -> str:
+    """
+    并发读取文件（CPU密集，进程池解析）和各URL（网络等待），按 文件、URL1、URL2… 的顺序拼接
+
+    Args:
+        files: 上传的文件列表
+        urls: URL列表
+        character_limit: 文件解析的字符数上限
+
+    Returns:
+        拼接后的文本
+
+    Raises:
+        ValueError: 文件类型不支持、内容过长或URL无效
+        Exception: 读取文件或URL时出错（消息中注明来源）
+    """
+    executor = ThreadPoolExecutor(max_workers=1 + len(urls), thread_name_prefix="ingest")
+    try:
+        files_future = executor.submit(process_files, files, character_limit) if files else None
+        url_futures = [(url, executor.submit(process_url, url)) for url in urls]
+
+        text = ""
+        if files_future:
+            try:
+                files_text = files_future.result()
+            except ValueError:
+                raise
+            except Exception as e:
+                raise Exception(f"读取文件时出错: {str(e)}") from e
+            for file in files:
+                try:
+                    INGEST_BYTES.inc(os.path.getsize(str(getattr(file, "name", file))), source="file")
+                except OSError:
+                    pass
+            if files_text:
+                text += files_text + "\n\n"
+
+        for url, future in url_futures:
+            try:
+                url_text = future.result()
+            except ValueError:
+                raise
+            except Exception as e:
+                raise Exception(f"处理URL时出错: {str(e)}") from e
+            INGEST_BYTES.inc(len((url_text or "").encode("utf-8")), source="url")
+            if url_text:
+                text += "\n\n" + url_text
+            else:
+                logger.warning(f"URL解析成功，但未提取到文本: {url}")
+                # 继续执行，不中断流程
+    finally:
+        # 出错时不再等待其他来源
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return text
@@ -0,0 +1,73 @@
+"""
+网页内容读取模块
+
+包含parse_url和process_url函数，通过Jina Reader获取网页正文
+"""
+
+import threading
+import time
+from typing import Dict, Mapping, Optional, Tuple
+from urllib.parse import urlparse
+
+from loguru import logger
+
+from constants import (
+    JINA_READER_URL,
+    JINA_RETRY_ATTEMPTS,
+    JINA_RETRY_DELAY,
+    URL_CACHE_DIR,
+    URL_CACHE_ENABLED,
+    URL_CACHE_TTL,
+)
+from metrics import RETRIES
+from transport import get_session, get_timeout
+from .url_cache import URLCache
+
+# 全局URL内容缓存
+_url_cache = None
+_url_cache_lock = threading.Lock()
+
+
+def get_url_cache() -> Optional[URLCache]:
+    """获取URL内容缓存（懒加载），未启用时返回None"""
+    global _url_cache
+    if _url_cache is None and URL_CACHE_ENABLED:
+        with _url_cache_lock:
+            if _url_cache is None:
+                _url_cache = URLCache(URL_CACHE_DIR, URL_CACHE_TTL)
+    return _url_cache
+
+
+def _fetch_jina(url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[int, str, Mapping[str, str]]:
+    """通过Jina Reader抓取网页，返回 (状态码, 文本, 响应头)，失败时按配置重试"""
+    for attempt in range(JINA_RETRY_ATTEMPTS):
+        try:
+            response = get_session().get(f"{JINA_READER_URL}{url}", headers=headers or {}, timeout=get_timeout(60))
+            response.raise_for_status()
+            # 保留requests的大小写不敏感响应头（HTTP/2的头名均为小写）
+            return response.status_code, response.text, response.headers
+        except Exception as e:
+            if attempt == JINA_RETRY_ATTEMPTS - 1:  # Last attempt
+                raise Exception(f"Jina Reader读取失败: {str(e)}") from e
+            logger.warning(f"Jina Reader读取失败，{JINA_RETRY_DELAY}秒后重试: {e}")
+            RETRIES.inc(component="jina_reader")
+            time.sleep(JINA_RETRY_DELAY)  # Wait for X second before retrying
+
+
+def parse_url(url: str) -> str:
+    """直接通过Jina Reader获取网页正文（不使用缓存）"""
+    _, text, _ = _fetch_jina(url)
+    return text
+
+
+def process_url(url: str) -> str:
+    """获取网页正文，优先使用URL缓存"""
+    url = url.strip()
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.netloc:
+        raise ValueError(f"无效的URL: {url}")
+
+    cache = get_url_cache()
+    if cache:
+        return cache.get(url, _fetch_jina)
+    return parse_url(url)
@@ -0,0 +1,120 @@
+"""
+URL内容缓存模块
+
+包含URLCache类：在有效期内直接返回缓存内容，过期后携带ETag/Last-Modified
+发起条件请求重新验证；同一URL的并发请求合并为一次抓取。
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from loguru import logger
+
+from metrics import CACHE_REQUESTS
+
+# 抓取函数：接收URL和条件请求头，返回 (状态码, 文本, 响应头)
+Fetcher = Callable[[str, Dict[str, str]], Tuple[int, str, Mapping[str, str]]]
+
+
+class URLCache:
+    """带条件请求重新验证和并发合并的URL内容缓存"""
+
+    def __init__(self, cache_dir: str, ttl: int):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+
+    def _path(self, url: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def _load(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._path(url).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, entry: Dict[str, Any]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(entry["url"])
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def get(self, url: str, fetcher: Fetcher) -> str:
+        """获取URL内容：新鲜缓存直接返回，否则（合并并发请求后）抓取或重新验证"""
+        entry = self._load(url)
+        if entry and time.time() - entry["fetched_at"] < self.ttl:
+            CACHE_REQUESTS.inc(cache="url", result="hit")
+            logger.info(f"URL缓存命中: {url}")
+            return entry["text"]
+
+        with self._lock:
+            future = self._in_flight.get(url)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[url] = future
+
+        if not owner:
+            CACHE_REQUESTS.inc(cache="url", result="coalesced")
+            logger.info(f"合并并发的URL请求: {url}")
+            return future.result()
+
+        try:
+            # 等锁期间可能已有其他请求刷新了缓存
+            entry = self._load(url)
+            if entry and time.time() - entry["fetched_at"] < self.ttl:
+                text = entry["text"]
+            else:
+                text = self._revalidate(url, entry, fetcher)
+            future.set_result(text)
+            return text
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(url, None)
+
+    def _revalidate(self, url: str, entry: Optional[Dict[str, Any]], fetcher: Fetcher) -> str:
+        """发起（条件）请求并更新缓存；请求失败时如有旧内容则降级返回旧内容"""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            status, text, response_headers = fetcher(url, headers)
+        except Exception as e:
+            if entry:
+                logger.warning(f"URL抓取失败，使用过期缓存: {url} ({e})")
+                return entry["text"]
+            raise
+
+        if status == 304 and entry:
+            CACHE_REQUESTS.inc(cache="url", result="revalidated")
+            logger.info(f"URL内容未修改(304)，沿用缓存: {url}")
+            entry["fetched_at"] = time.time()
+            self._store(entry)
+            return entry["text"]
+
+        CACHE_REQUESTS.inc(cache="url", result="miss")
+        # 响应头名不区分大小写（HTTP/2的头名均为小写），统一转为小写后查找
+        response_headers = {name.lower(): value for name, value in response_headers.items()}
+        self._store({
+            "url": url,
+            "text": text,
+            "etag": response_headers.get("etag"),
+            "last_modified": response_headers.get("last-modified"),
+            "fetched_at": time.time(),
+        })
+        return text
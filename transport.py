@@ -0,0 +1,84 @@
+"""
+transport.py
+
+共享HTTP传输层，所有大模型/TTS客户端复用同一个带连接池的requests.Session，
+避免每次请求都重新建立TCP+TLS连接。
+
+Functions:
+- get_session: 获取共享的HTTP会话
+- get_timeout: 获取(连接超时, 读取超时)
+- warm_up: 启动时预先建立到各API域名的连接
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import logging
+logger = logging.getLogger(__name__)
+
+# HTTP传输配置（支持环境变量覆盖）
+HTTP_TRANSPORT_CONFIG = {
+    "pool_connections": int(os.getenv("HTTP_POOL_CONNECTIONS", "10")),  # 缓存的主机连接池数量
+    "pool_maxsize": int(os.getenv("HTTP_POOL_MAXSIZE", "20")),  # 每个主机保持的最大连接数
+    "connect_timeout": float(os.getenv("HTTP_CONNECT_TIMEOUT", "10")),  # 连接超时，单位秒
+    "read_timeout": float(os.getenv("HTTP_READ_TIMEOUT", "120")),  # 默认读取超时，单位秒
+    "warmup_urls": [
+        url.strip()
+        for url in os.getenv("HTTP_WARMUP_URLS", "https://api.siliconflow.cn/,https://r.jina.ai/").split(",")
+        if url.strip()
+    ],
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """获取共享的HTTP会话（懒加载，连接保持keep-alive）"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                # 重试由各客户端自行处理，这里不做自动重试
+                adapter = HTTPAdapter(
+                    pool_connections=HTTP_TRANSPORT_CONFIG["pool_connections"],
+                    pool_maxsize=HTTP_TRANSPORT_CONFIG["pool_maxsize"],
+                    max_retries=0,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def get_timeout(read_timeout: Optional[float] = None) -> Tuple[float, float]:
+    """获取requests使用的(连接超时, 读取超时)"""
+    return (
+        HTTP_TRANSPORT_CONFIG["connect_timeout"],
+        read_timeout if read_timeout is not None else HTTP_TRANSPORT_CONFIG["read_timeout"],
+    )
+
+
+def warm_up(urls: Optional[Iterable[str]] = None) -> None:
+    """并发请求各API域名以预先建立连接，失败只记录日志不影响启动"""
+    target_urls = list(urls) if urls is not None else HTTP_TRANSPORT_CONFIG["warmup_urls"]
+    if not target_urls:
+        return
+
+    session = get_session()
+
+    def open_connection(url: str) -> None:
+        try:
+            session.head(url, timeout=get_timeout(HTTP_TRANSPORT_CONFIG["connect_timeout"]))
+            logger.info(f"HTTP连接预热完成: {url}")
+        except requests.RequestException as e:
+            logger.warning(f"HTTP连接预热失败: {url} ({e})")
+
+    with ThreadPoolExecutor(max_workers=len(target_urls)) as executor:
+        list(executor.map(open_connection, target_urls))
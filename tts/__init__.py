@@ -6,6 +6,7 @@ TTS模块
 - 阿里语音合成 (ali) 
 - 讯飞语音合成 (xunfei)
 - 硅基流动语音合成 (siliconflow)
+- 合成语音 (synthetic)：离线生成静音音频，用于压测
 """
 
 from .base import TTSClient
@@ -13,21 +14,34 @@ from .baidu import BaiduTTSClient
 from .ali import AliTTSClient
 from .xunfei import XunfeiTTSClient
 from .siliconflow import SiliconFlowTTSClient
+from .synthetic import SyntheticTTSClient
 from .factory import TTSClientFactory
+from .cache import TTSCache, CachedTTSClient
+from .cassette import CassetteTTSClient
+from .ratelimit import RateLimiter, ThrottledTTSClient
+from .mp3 import concat_mp3, merge_audio_files
+from .mixing import assemble_audio, mix_segments
 from .config import (
     DEFAULT_TTS_SERVICE,
     BAIDU_TTS_CONFIG,
     ALI_TTS_CONFIG,
     XUNFEI_TTS_CONFIG,
     SILICONFLOW_TTS_CONFIG,
+    SYNTHETIC_TTS_CONFIG,
+    TTS_CACHE_CONFIG,
+    AUDIO_MIX_CONFIG,
+    SPECULATIVE_TTS_CONFIG,
     TTS_SERVICES
 )
 from .tools import (
     generate_podcast_audio,
     generate_podcast_audio_segmented,
+    iter_podcast_audio,
     split_text_by_speaker_tags,
-    init_tts_client
+    init_tts_client,
+    get_tts_cache
 )
+from .speculative import SpeculativeSynthesis
 
 __all__ = [
     "TTSClient",
@@ -35,15 +49,32 @@ __all__ = [
     "AliTTSClient",
     "XunfeiTTSClient",
     "SiliconFlowTTSClient",
+    "SyntheticTTSClient",
     "TTSClientFactory",
+    "RateLimiter",
+    "ThrottledTTSClient",
+    "TTSCache",
+    "CachedTTSClient",
+    "CassetteTTSClient",
     "generate_podcast_audio",
     "generate_podcast_audio_segmented", 
+    "iter_podcast_audio",
     "split_text_by_speaker_tags",
     "init_tts_client",
+    "get_tts_cache",
+    "concat_mp3",
+    "merge_audio_files",
+    "assemble_audio",
+    "mix_segments",
+    "SpeculativeSynthesis",
     "DEFAULT_TTS_SERVICE",
     "BAIDU_TTS_CONFIG",
     "ALI_TTS_CONFIG", 
     "XUNFEI_TTS_CONFIG",
     "SILICONFLOW_TTS_CONFIG",
+    "SYNTHETIC_TTS_CONFIG",
+    "TTS_CACHE_CONFIG",
+    "AUDIO_MIX_CONFIG",
+    "SPECULATIVE_TTS_CONFIG",
     "TTS_SERVICES"
 ]
\ No newline at end of file
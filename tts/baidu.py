@@ -15,6 +15,8 @@ from aip import AipSpeech
 import logging
 logger = logging.getLogger(__name__)
 
+from transport import get_session
+
 from .base import TTSClient
 
 
@@ -34,7 +36,9 @@ class BaiduTTSClient(TTSClient):
             "Guest": "105"  # 度小美，女声
         },
         "retry_attempts": 3,
-        "retry_delay": 5   # 重试延迟，单位秒
+        "retry_delay": 5,  # 重试延迟，单位秒
+        "max_concurrency": 3,  # 最大并发合成数
+        "rate_limit": 3.0      # 每秒最多请求数，0表示不限流
     }
     
     def __init__(self, config: Dict[str, Any]):
@@ -47,6 +51,9 @@ class BaiduTTSClient(TTSClient):
         
         # 初始化百度语音合成客户端
         self.client = AipSpeech(self.app_id, self.api_key, self.secret_key)
+        # SDK默认直接调用requests模块（每次新建连接），改为使用共享的连接池会话
+        if hasattr(self.client, "_AipBase__client"):
+            self.client._AipBase__client = get_session()
     
     def synthesize(self, text: str, speaker: str, language: str, output_dir: Optional[str] = None, sequence_number: Optional[int] = None) -> str:
         """合成语音"""
@@ -0,0 +1,190 @@
+"""
+TTS音频缓存模块
+
+包含TTSCache类和CachedTTSClient类，按内容寻址缓存合成结果，可包装任意TTSClient
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import logging
+logger = logging.getLogger(__name__)
+
+from metrics import CACHE_REQUESTS
+from .base import TTSClient
+
+# 参与缓存键计算的配置项（影响合成结果的参数，不含密钥）
+CACHE_KEY_CONFIG_FIELDS = ("model_id", "per", "voice", "voice_name", "speed", "pitch", "volume")
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """优先使用硬链接，跨文件系统等失败时回退为复制"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+class TTSCache:
+    """基于磁盘的TTS音频缓存，按总字节数进行LRU淘汰（线程安全）"""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = None  # OrderedDict[str, Tuple[int, str]]，键 -> (文件大小, 扩展名)，按最近访问排序
+        self._total_bytes = 0
+
+    @staticmethod
+    def make_key(service: str, config: Dict[str, Any], text: str, speaker: str, language: str) -> str:
+        """根据服务、音色/语速等参数、语言和文本计算缓存键"""
+        payload = {
+            "service": service,
+            "config": {k: config.get(k) for k in CACHE_KEY_CONFIG_FIELDS if k in config},
+            "speaker": speaker,
+            "language": language,
+            "text": text,
+        }
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{suffix}"
+
+    def _load_index(self) -> None:
+        """首次使用时扫描缓存目录，按修改时间建立LRU索引"""
+        if self._entries is not None:
+            return
+        files = []
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob("*/*.*"):
+                key, _, suffix = path.name.partition(".")
+                if suffix.endswith("tmp"):
+                    continue  # 写入中的临时文件
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, key, stat.st_size, path.suffix))
+        files.sort()
+        self._entries = OrderedDict((key, (size, suffix)) for _, key, size, suffix in files)
+        self._total_bytes = sum(size for size, _ in self._entries.values())
+
+    def _drop(self, key: str) -> None:
+        """从索引中移除条目（调用方需持有锁）"""
+        size, _ = self._entries.pop(key)
+        self._total_bytes -= size
+
+    def _evict(self) -> None:
+        while self._entries and self._total_bytes > self.max_bytes:
+            key, (size, suffix) = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self._path(key, suffix).unlink(missing_ok=True)
+            logger.info(f"TTS缓存淘汰: {key}")
+
+    def get(self, key: str, target_stem: str) -> Optional[str]:
+        """
+        命中时将缓存音频链接/复制到 target_stem 加原扩展名（如 .mp3、.wav）的路径
+
+        文件在读取前被淘汰或被其他进程删除时按未命中处理。
+
+        Returns:
+            链接/复制后的音频路径，未命中时返回None
+        """
+        with self._lock:
+            self._load_index()
+            entry = self._entries.get(key)
+            if entry is not None:
+                path = self._path(key, entry[1])
+                try:
+                    os.utime(path)
+                except FileNotFoundError:
+                    self._drop(key)
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        target_path = f"{target_stem}{path.suffix}"
+        try:
+            _link_or_copy(str(path), target_path)
+        except FileNotFoundError:
+            with self._lock:
+                if key in self._entries:
+                    self._drop(key)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return target_path
+
+    def put(self, key: str, source_path: str) -> None:
+        """将合成好的音频写入缓存，保留源文件的扩展名"""
+        path = self._path(key, Path(source_path).suffix or ".mp3")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        shutil.copyfile(source_path, tmp_path)
+        os.replace(tmp_path, path)
+        size = path.stat().st_size
+        with self._lock:
+            self._load_index()
+            if key in self._entries:
+                _, suffix = self._entries[key]
+                self._drop(key)
+                if suffix != path.suffix:
+                    self._path(key, suffix).unlink(missing_ok=True)
+            self._entries[key] = (size, path.suffix)
+            self._total_bytes += size
+            self._evict()
+
+    def stats(self) -> Dict[str, int]:
+        """返回命中/未命中次数及缓存占用"""
+        with self._lock:
+            self._load_index()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+            }
+
+
+class CachedTTSClient(TTSClient):
+    """为任意TTSClient增加内容寻址缓存的包装客户端"""
+
+    def __init__(self, client: TTSClient, service: str, cache: TTSCache):
+        super().__init__(client.config)
+        self.client = client
+        self.service = service
+        self.cache = cache
+
+    def synthesize(self, text: str, speaker: str, language: str, output_dir: Optional[str] = None, sequence_number: Optional[int] = None) -> str:
+        """命中缓存时直接返回缓存音频，否则调用被包装的客户端合成并写入缓存"""
+        key = self.cache.make_key(self.service, self.config, text, speaker, language)
+
+        if sequence_number is not None:
+            stem = f"{self.service}_cached_{speaker}_{sequence_number}_{key[:12]}"
+        else:
+            stem = f"{self.service}_cached_{speaker}_{key[:12]}"
+        file_path = self.cache.get(key, os.path.join(output_dir, stem) if output_dir else stem)
+
+        if file_path:
+            CACHE_REQUESTS.inc(cache="tts", result="hit")
+            logger.info(f"TTS缓存命中: {speaker} ({len(text)} 字符)")
+            return file_path
+        CACHE_REQUESTS.inc(cache="tts", result="miss")
+
+        audio_path = self.client.synthesize(text, speaker, language, output_dir, sequence_number)
+        try:
+            self.cache.put(key, audio_path)
+        except OSError as e:
+            logger.warning(f"写入TTS缓存失败: {e}")
+        return audio_path
@@ -0,0 +1,54 @@
+"""
+TTS录制/回放模块
+
+包含CassetteTTSClient类，录制或回放任意TTSClient的合成结果（音频文件随录像保存）
+"""
+
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from cassette import Cassette
+from .base import TTSClient
+from .cache import TTSCache
+
+
+class CassetteTTSClient(TTSClient):
+    """为TTSClient增加录制/回放的包装客户端，回放模式下不需要被包装的客户端"""
+
+    def __init__(self, service: str, config: Dict[str, Any], cassette: Cassette, client: Optional[TTSClient] = None):
+        super().__init__(config)
+        self.service = service
+        self.cassette = cassette
+        self.client = client
+        if client is None and not cassette.replaying:
+            raise ValueError("录制模式需要提供被包装的TTS客户端")
+
+    def synthesize(self, text: str, speaker: str, language: str, output_dir: Optional[str] = None, sequence_number: Optional[int] = None) -> str:
+        """回放时复制录制的音频，录制时调用被包装的客户端并保存音频和耗时"""
+        key = TTSCache.make_key(self.service, self.config, text, speaker, language)
+
+        if self.cassette.replaying:
+            entry = self.cassette.load("tts", key)
+            self.cassette.wait(entry["elapsed"])
+            if "error" in entry:
+                raise Exception(entry["error"])
+            if sequence_number is not None:
+                filename = f"{self.service}_replay_{speaker}_{sequence_number}_{key[:12]}{Path(entry['audio']).suffix}"
+            else:
+                filename = f"{self.service}_replay_{speaker}_{key[:12]}{Path(entry['audio']).suffix}"
+            file_path = os.path.join(output_dir, filename) if output_dir else filename
+            shutil.copyfile(self.cassette.path("tts", key, Path(entry["audio"]).suffix), file_path)
+            return file_path
+
+        entry = {"request": {"service": self.service, "text": text, "speaker": speaker, "language": language}}
+        started_at = time.perf_counter()
+        try:
+            audio_path = self.client.synthesize(text, speaker, language, output_dir, sequence_number)
+        except Exception as e:
+            self.cassette.save("tts", key, {**entry, "elapsed": time.perf_counter() - started_at, "error": str(e)})
+            raise
+        self.cassette.save("tts", key, {**entry, "elapsed": time.perf_counter() - started_at}, audio_path)
+        return audio_path
@@ -3,14 +3,16 @@ TTS配置管理模块
 从各个TTS客户端获取默认配置，并支持环境变量覆盖
 """
 
+import json
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
 # 导入各个TTS客户端以获取默认配置
 from .baidu import BaiduTTSClient
 from .ali import AliTTSClient
 from .xunfei import XunfeiTTSClient
 from .siliconflow import SiliconFlowTTSClient
+from .synthetic import SyntheticTTSClient
 
 # TTS服务配置
 DEFAULT_TTS_SERVICE = os.getenv("DEFAULT_TTS_SERVICE", "baidu")
@@ -42,7 +44,16 @@ def get_config_with_env_overrides(client_class, env_prefix: str) -> Dict[str, An
         
         if os.getenv(env_key):
             # 根据值的类型进行转换
-            if isinstance(config[key], int):
+            if isinstance(config[key], dict):
+                # 字典类配置（如各语言语速）使用JSON，只覆盖给出的键
+                try:
+                    overrides = json.loads(os.getenv(env_key))
+                except ValueError as e:
+                    raise ValueError(f"环境变量 {env_key} 不是有效的JSON: {e}") from e
+                if not isinstance(overrides, dict):
+                    raise ValueError(f"环境变量 {env_key} 应为JSON对象")
+                config[key] = {**config[key], **overrides}
+            elif isinstance(config[key], int):
                 config[key] = int(os.getenv(env_key))
             elif isinstance(config[key], float):
                 config[key] = float(os.getenv(env_key))
@@ -56,6 +67,7 @@ BAIDU_TTS_CONFIG = get_config_with_env_overrides(BaiduTTSClient, "BAIDU")
 ALI_TTS_CONFIG = get_config_with_env_overrides(AliTTSClient, "ALI")
 XUNFEI_TTS_CONFIG = get_config_with_env_overrides(XunfeiTTSClient, "XUNFEI")
 SILICONFLOW_TTS_CONFIG = get_config_with_env_overrides(SiliconFlowTTSClient, "SILICONFLOW")
+SYNTHETIC_TTS_CONFIG = get_config_with_env_overrides(SyntheticTTSClient, "SYNTHETIC")
 
 # TTS服务配置映射
 TTS_SERVICES = {
@@ -63,4 +75,47 @@ TTS_SERVICES = {
     "ali": ALI_TTS_CONFIG,
     "xunfei": XUNFEI_TTS_CONFIG,
     "siliconflow": SILICONFLOW_TTS_CONFIG,
-}
\ No newline at end of file
+    "synthetic": SYNTHETIC_TTS_CONFIG,
+}
+# TTS音频缓存配置（跨任务共享，按内容寻址）
+TTS_CACHE_CONFIG = {
+    "enabled": os.getenv("TTS_CACHE_ENABLED", "true").lower() == "true",
+    "cache_dir": os.getenv("TTS_CACHE_DIR", "./gradio_cached_examples/tts_cache/"),
+    "max_bytes": int(os.getenv("TTS_CACHE_MAX_BYTES", str(1024 * 1024 * 1024))),  # 默认1GB
+}
+# 播客音频混音配置（解码为PCM后去除首尾静音、说话人之间等功率交叉淡化、响度归一化，再统一编码）
+# 关闭时按MP3帧直接拼接，不重新编码
+AUDIO_MIX_CONFIG = {
+    "enabled": os.getenv("AUDIO_MIX_ENABLED", "false").lower() == "true",
+    "silence_threshold_db": float(os.getenv("AUDIO_MIX_SILENCE_THRESHOLD_DB", "-45")),  # 低于该电平（dBFS）视为静音
+    "keep_silence": float(os.getenv("AUDIO_MIX_KEEP_SILENCE", "0.15")),  # 去除静音后每段首尾保留的时长，单位秒
+    "crossfade": float(os.getenv("AUDIO_MIX_CROSSFADE", "0.1")),  # 说话人切换时的交叉淡化时长，单位秒
+    "target_lufs": float(os.getenv("AUDIO_MIX_TARGET_LUFS", "-16")),  # 响度归一化目标
+    "peak_db": float(os.getenv("AUDIO_MIX_PEAK_DB", "-1")),  # 归一化后的峰值上限（dBFS）
+    "bitrate": os.getenv("AUDIO_MIX_BITRATE", "128k"),
+    "max_workers": int(os.getenv("AUDIO_MIX_MAX_WORKERS", "4")),  # 并行解码的分段数
+}
+# 推测式语音合成：改进对话期间先按初稿合成，改进稿中相同（或几乎相同）的对话复用已合成的音频
+SPECULATIVE_TTS_CONFIG = {
+    "enabled": os.getenv("SPECULATIVE_TTS_ENABLED", "false").lower() == "true",
+    # 复用所需的最低文本相似度（去除空白和标点后比较），1表示只复用文本相同的对话
+    "min_similarity": float(os.getenv("SPECULATIVE_TTS_MIN_SIMILARITY", "1.0")),
+}
+
+
+def get_service_limits(service: str) -> Tuple[int, float]:
+    """
+    获取TTS服务的并发上限和限流速率
+
+    可通过环境变量覆盖，例如 BAIDU_MAX_CONCURRENCY、BAIDU_RATE_LIMIT
+
+    Args:
+        service: TTS服务名称
+
+    Returns:
+        (最大并发数, 每秒最多请求数)
+    """
+    config = TTS_SERVICES.get(service) or {}
+    max_concurrency = max(1, int(config.get("max_concurrency", 1)))
+    rate_limit = float(config.get("rate_limit", 0))
+    return max_concurrency, rate_limit
@@ -4,22 +4,33 @@ TTS客户端工厂模块
 包含TTSClientFactory类，用于创建不同类型的TTS客户端实例。
 """
 
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
 from .base import TTSClient
 from .baidu import BaiduTTSClient
 from .ali import AliTTSClient
 from .xunfei import XunfeiTTSClient
 from .siliconflow import SiliconFlowTTSClient
+from .synthetic import SyntheticTTSClient
 
 # TTS客户端工厂
 class TTSClientFactory:
     """TTS客户端工厂"""
-    
-    @staticmethod
-    def create_client(service: str, config: Dict[str, Any]) -> TTSClient:
+
+    # 通过register注册的额外服务（如基准测试使用的本地替身）
+    _registry: Dict[str, Callable[[Dict[str, Any]], TTSClient]] = {}
+
+    @classmethod
+    def register(cls, service: str, creator: Callable[[Dict[str, Any]], TTSClient]) -> None:
+        """注册TTS服务，creator接收配置并返回客户端实例"""
+        cls._registry[service] = creator
+
+    @classmethod
+    def create_client(cls, service: str, config: Dict[str, Any]) -> TTSClient:
         """创建TTS客户端"""
-        if service == "baidu":
+        if service in cls._registry:
+            return cls._registry[service](config)
+        elif service == "baidu":
             return BaiduTTSClient(config)
         elif service == "ali":
             return AliTTSClient(config)
@@ -27,5 +38,7 @@ class TTSClientFactory:
             return XunfeiTTSClient(config)
         elif service == "siliconflow":
             return SiliconFlowTTSClient(config)
+        elif service == "synthetic":
+            return SyntheticTTSClient(config)
         else:
             raise ValueError(f"不支持的TTS服务: {service}")
\ No newline at end of file
@@ -0,0 +1,215 @@
+"""
+混音模块
+
+将各段音频解码一次为NumPy数组（float32，形状为 [采样数, 声道数]），向量化地去除首尾静音、
+在说话人切换处做等功率交叉淡化、按ITU-R BS.1770归一化响度，最后统一编码为MP3。
+解码和编码通过pydub完成（依赖FFmpeg）；混音不可用或失败时回退到MP3帧级拼接。
+"""
+
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+from pydub import AudioSegment
+
+from metrics import AUDIO_MIX_SECONDS
+from .config import AUDIO_MIX_CONFIG
+from .mp3 import merge_audio_files
+
+LOUDNESS_BLOCK_SECONDS = 0.4   # 门限块长度
+LOUDNESS_STEP_SECONDS = 0.1    # 块间步长（75%重叠）
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_LU = -10.0
+
+
+def load_pcm(path: str, sample_rate: Optional[int] = None, channels: Optional[int] = None) -> Tuple[np.ndarray, int]:
+    """解码音频文件，必要时转换采样率和声道数，返回 (采样数组, 采样率)"""
+    segment = AudioSegment.from_file(path)
+    if sample_rate and segment.frame_rate != sample_rate:
+        segment = segment.set_frame_rate(sample_rate)
+    if channels and segment.channels != channels:
+        segment = segment.set_channels(channels)
+    samples = np.array(segment.get_array_of_samples(), dtype=np.float32).reshape(-1, segment.channels)
+    return samples / float(1 << (8 * segment.sample_width - 1)), segment.frame_rate
+
+
+def save_mp3(samples: np.ndarray, sample_rate: int, output_path: str, bitrate: str) -> str:
+    """将float32采样编码为MP3"""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    segment = AudioSegment(pcm.tobytes(), sample_width=2, frame_rate=sample_rate, channels=samples.shape[1])
+    segment.export(output_path, format="mp3", bitrate=bitrate).close()
+    return output_path
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int, threshold_db: float, keep: float, window: float = 0.01) -> np.ndarray:
+    """按10毫秒窗口的RMS电平去除首尾静音，首尾各保留keep秒；整段都是静音时只保留keep秒"""
+    window_size = max(1, int(sample_rate * window))
+    count = len(samples) // window_size
+    keep_size = int(sample_rate * keep)
+    if count == 0:
+        return samples
+    windows = samples[:count * window_size].reshape(count, window_size, -1)
+    rms = np.sqrt(np.mean(np.square(windows), axis=1)).max(axis=1)
+    loud = np.flatnonzero(rms > 10 ** (threshold_db / 20))
+    if len(loud) == 0:
+        return samples[:keep_size]
+    start = max(0, loud[0] * window_size - keep_size)
+    end = min(len(samples), (loud[-1] + 1) * window_size + keep_size)
+    return samples[start:end]
+
+
+def equal_power_crossfade(tail: np.ndarray, head: np.ndarray) -> np.ndarray:
+    """等功率交叉淡化：前段乘cos、后段乘sin，两者能量之和保持不变"""
+    t = np.linspace(0.0, math.pi / 2, len(tail), dtype=np.float32)[:, None]
+    return tail * np.cos(t) + head * np.sin(t)
+
+
+def _k_weighting_filters(sample_rate: int) -> List[Tuple[Tuple[float, ...], Tuple[float, ...]]]:
+    """BS.1770 K加权滤波器（高架 + 高通）在任意采样率下的系数，48kHz时与标准给出的系数一致"""
+    # 第一级：高架滤波器，模拟头部的声学效应
+    k = math.tan(math.pi * 1681.974450955533 / sample_rate)
+    q = 0.7071752369554196
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf = (
+        ((vh + vb * k / q + k * k) / a0, 2 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0),
+        (1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0),
+    )
+    # 第二级：RLB高通滤波器
+    k = math.tan(math.pi * 38.13547087602444 / sample_rate)
+    q = 0.5003270373238773
+    a0 = 1 + k / q + k * k
+    high_pass = (
+        (1.0, -2.0, 1.0),
+        (1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0),
+    )
+    return [shelf, high_pass]
+
+
+def _k_weighting_power(frequencies: np.ndarray, sample_rate: int) -> np.ndarray:
+    """K加权滤波器在各频率上的功率响应 |H(f)|^2"""
+    z = np.exp(-2j * np.pi * frequencies / sample_rate)
+    power = np.ones(len(frequencies))
+    for b, a in _k_weighting_filters(sample_rate):
+        response = (b[0] + b[1] * z + b[2] * z ** 2) / (a[0] + a[1] * z + a[2] * z ** 2)
+        power *= np.abs(response) ** 2
+    return power
+
+
+def integrated_loudness(samples: np.ndarray, sample_rate: int) -> float:
+    """
+    计算整体响度（LUFS）
+
+    在频域对每个100毫秒子块做K加权求能量（按Parseval定理，无需逐采样滤波），
+    400毫秒门限块的能量取相邻4个子块的平均，再依次应用绝对门限和相对门限。
+    """
+    step = int(sample_rate * LOUDNESS_STEP_SECONDS)
+    per_block = int(round(LOUDNESS_BLOCK_SECONDS / LOUDNESS_STEP_SECONDS))
+    count = len(samples) // step
+    if count < per_block:
+        return -math.inf
+
+    spectrum = np.fft.rfft(samples[:count * step].reshape(count, step, -1), axis=1)
+    # 单边谱中除直流和奈奎斯特分量外的能量需要计两次
+    weights = np.full(spectrum.shape[1], 2.0)
+    weights[0] = 1.0
+    if step % 2 == 0:
+        weights[-1] = 1.0
+    weights *= _k_weighting_power(np.fft.rfftfreq(step, 1.0 / sample_rate), sample_rate)
+    sub_block_power = np.einsum("nfc,f->n", np.abs(spectrum) ** 2, weights) / step ** 2
+
+    cumulative = np.concatenate(([0.0], np.cumsum(sub_block_power)))
+    block_power = (cumulative[per_block:] - cumulative[:-per_block]) / per_block
+    with np.errstate(divide="ignore"):
+        block_loudness = -0.691 + 10 * np.log10(block_power)
+
+    gated = block_power[block_loudness > ABSOLUTE_GATE_LUFS]
+    if len(gated) == 0:
+        return -math.inf
+    relative_gate = -0.691 + 10 * math.log10(gated.mean()) + RELATIVE_GATE_LU
+    gated = block_power[(block_loudness > ABSOLUTE_GATE_LUFS) & (block_loudness > relative_gate)]
+    return -0.691 + 10 * math.log10(gated.mean())
+
+
+def normalize_loudness(samples: np.ndarray, sample_rate: int, target_lufs: float, peak_db: float) -> np.ndarray:
+    """将整体响度调整到target_lufs，峰值超过peak_db时降低增益"""
+    loudness = integrated_loudness(samples, sample_rate)
+    if math.isinf(loudness):
+        return samples
+    gain = 10 ** ((target_lufs - loudness) / 20)
+    peak = float(np.abs(samples).max()) * gain
+    peak_limit = 10 ** (peak_db / 20)
+    if peak > peak_limit:
+        gain *= peak_limit / peak
+    logger.info(f"响度归一化: {loudness:.1f} LUFS -> {target_lufs:.1f} LUFS (增益 {20 * math.log10(gain):+.1f} dB)")
+    return samples * np.float32(gain)
+
+
+def mix_segments(
+    paths: Sequence[str], output_path: str, speakers: Optional[Sequence[str]] = None, config: Dict[str, Any] = AUDIO_MIX_CONFIG
+) -> str:
+    """
+    解码各段音频并混音为一个MP3文件
+
+    Args:
+        paths: 按播放顺序排列的音频文件
+        output_path: 输出MP3路径
+        speakers: 各段的说话人，只在说话人切换处交叉淡化；为None时每段之间都交叉淡化
+        config: 混音配置，见 AUDIO_MIX_CONFIG
+    """
+    # TTS输出为人声，统一为单声道；采样率以第一段为准
+    first, sample_rate = load_pcm(paths[0], channels=1)
+
+    def trim(samples: np.ndarray) -> np.ndarray:
+        return trim_silence(samples, sample_rate, config["silence_threshold_db"], config["keep_silence"])
+
+    def decode(path: str) -> np.ndarray:
+        return trim(load_pcm(path, sample_rate, 1)[0])
+
+    with ThreadPoolExecutor(max_workers=max(1, config["max_workers"])) as executor:
+        clips = [trim(first)] + list(executor.map(decode, paths[1:]))
+
+    crossfade_size = int(sample_rate * config["crossfade"])
+    pieces: List[np.ndarray] = []
+    previous = clips[0]
+    for i, clip in enumerate(clips[1:], start=1):
+        speaker_changed = speakers is None or speakers[i] != speakers[i - 1]
+        overlap = min(crossfade_size, len(previous), len(clip)) if speaker_changed else 0
+        if overlap:
+            pieces.append(previous[:-overlap])
+            pieces.append(equal_power_crossfade(previous[-overlap:], clip[:overlap]))
+            previous = clip[overlap:]
+        else:
+            pieces.append(previous)
+            previous = clip
+    pieces.append(previous)
+
+    mixed = normalize_loudness(np.concatenate(pieces), sample_rate, config["target_lufs"], config["peak_db"])
+    return save_mp3(mixed, sample_rate, output_path, config["bitrate"])
+
+
+def assemble_audio(paths: Sequence[str], output_path: str, speakers: Optional[Sequence[str]] = None) -> str:
+    """
+    合并播客音频：启用混音时解码混音，否则（或混音失败时）按MP3帧直接拼接
+
+    Returns:
+        使用的方式："mix"、"frames" 或 "ffmpeg"
+
+    Raises:
+        RuntimeError: 所有方式都失败
+    """
+    if AUDIO_MIX_CONFIG["enabled"]:
+        started_at = time.perf_counter()
+        try:
+            mix_segments(paths, output_path, speakers)
+            AUDIO_MIX_SECONDS.observe(time.perf_counter() - started_at, result="ok")
+            logger.info(f"混音 {len(paths)} 段音频，耗时 {time.perf_counter() - started_at:.3f} 秒")
+            return "mix"
+        except Exception as e:
+            AUDIO_MIX_SECONDS.observe(time.perf_counter() - started_at, result="failed")
+            logger.warning(f"混音失败，回退到帧级拼接: {e}")
+    return merge_audio_files(paths, output_path)
@@ -0,0 +1,344 @@
+"""
+MP3拼接模块
+
+包含MP3Stream类和concat_mp3、merge_audio_files函数：解析MPEG Layer III帧头，
+各段的MPEG版本、采样率和声道数一致时直接拼接音频帧，不重新编码，并重新生成Xing/Info头
+（帧数、字节数、TOC）。所有分段都带有LAME扩展时同时保留LAME扩展，编码器延迟取第一段、
+补齐取最后一段，音乐长度和CRC按拼接结果更新。参数不一致时才回退到FFmpeg重新采样编码。
+"""
+
+import struct
+import subprocess
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from metrics import FFMPEG_SECONDS, MP3_CONCAT_SECONDS
+
+# Layer III 码率表（kbps），下标为帧头中的码率索引
+BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],  # MPEG-1
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],      # MPEG-2 / 2.5
+}
+SAMPLE_RATES = {
+    3: (1, [44100, 48000, 32000]),    # MPEG-1
+    2: (2, [22050, 24000, 16000]),    # MPEG-2
+    0: (2.5, [11025, 12000, 8000]),   # MPEG-2.5
+}
+MONO = 3  # 声道模式：单声道
+
+XING_FLAGS = 0x0F  # 帧数、字节数、TOC、质量
+XING_SIZE = 120    # "Xing"/"Info" + 标志 + 帧数 + 字节数 + TOC + 质量
+LAME_SIZE = 36     # LAME扩展长度
+
+
+def _crc16_table() -> List[int]:
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+CRC16_TABLE = _crc16_table()
+
+
+def crc16(data: bytes, crc: int = 0) -> int:
+    """LAME使用的CRC-16（多项式0x8005，反射）"""
+    for byte in data:
+        crc = (crc >> 8) ^ CRC16_TABLE[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def _gf2_times(matrix: List[int], vector: int) -> int:
+    result = 0
+    i = 0
+    while vector:
+        if vector & 1:
+            result ^= matrix[i]
+        vector >>= 1
+        i += 1
+    return result
+
+
+def _gf2_square(matrix: List[int]) -> List[int]:
+    return [_gf2_times(matrix, column) for column in matrix]
+
+
+def crc16_combine(crc1: int, crc2: int, length2: int) -> int:
+    """由 crc16(A)、crc16(B) 和 len(B) 计算 crc16(A + B)，无需重新扫描数据"""
+    if length2 <= 0:
+        return crc1
+    # 追加一个0比特的线性变换，按平方倍增到追加length2个0字节
+    odd = [0xA001] + [1 << n for n in range(15)]
+    even = _gf2_square(odd)
+    odd = _gf2_square(even)
+    while True:
+        even = _gf2_square(odd)
+        if length2 & 1:
+            crc1 = _gf2_times(even, crc1)
+        length2 >>= 1
+        if not length2:
+            break
+        odd = _gf2_square(even)
+        if length2 & 1:
+            crc1 = _gf2_times(odd, crc1)
+        length2 >>= 1
+        if not length2:
+            break
+    return crc1 ^ crc2
+
+
+def parse_header(data: bytes, offset: int) -> Optional[Tuple[float, int, int, int, int]]:
+    """
+    解析Layer III帧头
+
+    Returns:
+        (MPEG版本, 采样率, 声道模式, 码率索引, 帧长度)，不是有效帧头时返回None
+    """
+    if offset + 4 > len(data) or data[offset] != 0xFF or data[offset + 1] & 0xE0 != 0xE0:
+        return None
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    version_bits = (b1 >> 3) & 3
+    layer_bits = (b1 >> 1) & 3
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 3
+    if version_bits not in SAMPLE_RATES or layer_bits != 1 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    version, sample_rates = SAMPLE_RATES[version_bits]
+    sample_rate = sample_rates[sample_rate_index]
+    bitrate = BITRATES[1 if version == 1 else 2][bitrate_index] * 1000
+    frame_size = (144 if version == 1 else 72) * bitrate // sample_rate + ((b2 >> 1) & 1)
+    return version, sample_rate, b3 >> 6, bitrate_index, frame_size
+
+
+def _side_info_size(version: float, channel_mode: int) -> int:
+    if version == 1:
+        return 17 if channel_mode == MONO else 32
+    return 9 if channel_mode == MONO else 17
+
+
+def _id3v2_size(data: bytes) -> int:
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    return size + 10 + (10 if data[5] & 0x10 else 0)
+
+
+class MP3Stream:
+    """一个MP3文件的音频帧（不含ID3标签和Xing/Info/VBRI帧）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            data = f.read()
+
+        start = _id3v2_size(data)
+        end = len(data) - 128 if len(data) >= 128 and data[-128:-125] == b"TAG" else len(data)
+
+        self.frames: List[bytes] = []
+        self.version = None
+        self.sample_rate = None
+        self.channels = None
+        self.encoder_delay = None
+        self.encoder_padding = None
+        self.lame = None          # 第一帧中的LAME扩展（36字节）
+        self.quality = 0
+
+        offset = start
+        skipped = 0
+        while offset < end:
+            header = parse_header(data, offset)
+            if header is None or offset + header[4] > end:
+                # 失去同步时逐字节寻找下一个帧头
+                offset += 1
+                skipped += 1
+                continue
+            version, sample_rate, channel_mode, _, frame_size = header
+            frame = data[offset:offset + frame_size]
+            offset += frame_size
+            if not self.frames and self.version is None and self._parse_info_frame(frame, version, channel_mode):
+                self.version, self.sample_rate, self.channels = version, sample_rate, 1 if channel_mode == MONO else 2
+                continue
+            if self.version is None:
+                self.version, self.sample_rate, self.channels = version, sample_rate, 1 if channel_mode == MONO else 2
+            elif (version, sample_rate, 1 if channel_mode == MONO else 2) != self.params:
+                raise ValueError(f"MP3文件内部参数不一致: {path}")
+            self.frames.append(frame)
+
+        if not self.frames:
+            raise ValueError(f"没有找到MP3音频帧: {path}")
+        if skipped:
+            logger.warning(f"MP3文件中跳过 {skipped} 字节无法解析的数据: {path}")
+
+    @property
+    def params(self) -> Tuple[float, int, int]:
+        """(MPEG版本, 采样率, 声道数)，相同时才能直接拼接"""
+        return self.version, self.sample_rate, self.channels
+
+    @property
+    def music_crc(self) -> Optional[int]:
+        """LAME扩展中记录的音频帧CRC"""
+        return struct.unpack(">H", self.lame[32:34])[0] if self.lame else None
+
+    def _parse_info_frame(self, frame: bytes, version: float, channel_mode: int) -> bool:
+        """识别第一帧是否为Xing/Info/VBRI信息帧，是则记录其中的LAME扩展"""
+        if frame[36:40] == b"VBRI":
+            return True
+        position = 4 + (0 if frame[1] & 1 else 2) + _side_info_size(version, channel_mode)
+        if frame[position:position + 4] not in (b"Xing", b"Info"):
+            return False
+        flags = struct.unpack(">I", frame[position + 4:position + 8])[0]
+        position += 8
+        for flag, size in ((0x01, 4), (0x02, 4), (0x04, 100)):
+            if flags & flag:
+                position += size
+        if flags & 0x08:
+            self.quality = struct.unpack(">I", frame[position:position + 4])[0]
+            position += 4
+        lame = frame[position:position + LAME_SIZE]
+        # LAME扩展以CRC结尾，CRC覆盖信息帧开头到CRC之前的全部字节
+        if len(lame) == LAME_SIZE and crc16(frame[:position + 34]) == struct.unpack(">H", lame[34:36])[0]:
+            self.lame = lame
+            delay_padding = int.from_bytes(lame[21:24], "big")
+            self.encoder_delay = delay_padding >> 12
+            self.encoder_padding = delay_padding & 0xFFF
+        return True
+
+
+def _build_info_frame(first_frame: bytes, version: float, streams: Sequence[MP3Stream], frames: Sequence[bytes]) -> bytes:
+    """按拼接后的音频帧生成Xing/Info帧"""
+    channel_mode = first_frame[3] >> 6
+    lame = streams[0].lame if all(stream.lame for stream in streams) else None
+    tag_offset = 4 + _side_info_size(version, channel_mode)
+    needed = tag_offset + XING_SIZE + (LAME_SIZE if lame else 0)
+
+    # 选取能容纳信息标签的最小码率，不带CRC、不带填充
+    b1 = first_frame[1] | 0x01
+    sample_rate_bits = first_frame[2] & 0x0C
+    for bitrate_index in range(1, 15):
+        header = bytes([0xFF, b1, (bitrate_index << 4) | sample_rate_bits, first_frame[3]])
+        frame_size = parse_header(header, 0)[4]
+        if frame_size >= needed:
+            break
+    frame = bytearray(frame_size)
+    frame[:4] = header
+
+    audio_bytes = sum(len(f) for f in frames)
+    total_bytes = frame_size + audio_bytes
+    toc = bytearray(100)
+    offsets = []
+    position = frame_size
+    for f in frames:
+        offsets.append(position)
+        position += len(f)
+    for i in range(100):
+        toc[i] = min(255, offsets[i * len(frames) // 100] * 256 // total_bytes)
+
+    vbr = len({f[2] >> 4 for f in frames}) > 1
+    frame[tag_offset:tag_offset + XING_SIZE] = (
+        (b"Xing" if vbr else b"Info")
+        + struct.pack(">III", XING_FLAGS, len(frames), total_bytes)
+        + bytes(toc)
+        + struct.pack(">I", streams[0].quality)
+    )
+
+    if lame:
+        lame = bytearray(lame)
+        lame[21:24] = ((streams[0].encoder_delay << 12) | streams[-1].encoder_padding).to_bytes(3, "big")
+        lame[28:32] = struct.pack(">I", total_bytes)
+        music_crc = streams[0].music_crc
+        for stream in streams[1:]:
+            music_crc = crc16_combine(music_crc, stream.music_crc, sum(len(f) for f in stream.frames))
+        lame[32:34] = struct.pack(">H", music_crc)
+        lame_offset = tag_offset + XING_SIZE
+        frame[lame_offset:lame_offset + 34] = lame[:34]
+        frame[lame_offset + 34:lame_offset + 36] = struct.pack(">H", crc16(bytes(frame[:lame_offset + 34])))
+    return bytes(frame)
+
+
+def concat_mp3(paths: Sequence[str], output_path: str) -> str:
+    """
+    不重新编码地拼接MP3文件
+
+    Raises:
+        ValueError: 文件无法解析，或各段的MPEG版本、采样率、声道数不一致
+    """
+    streams = [MP3Stream(path) for path in paths]
+    params = {stream.params for stream in streams}
+    if len(params) > 1:
+        raise ValueError(f"MP3参数不一致，无法直接拼接: {sorted(params)}")
+
+    frames = [frame for stream in streams for frame in stream.frames]
+    info_frame = _build_info_frame(frames[0], streams[0].version, streams, frames)
+    tmp_path = Path(f"{output_path}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(info_frame)
+        for frame in frames:
+            f.write(frame)
+    tmp_path.replace(output_path)
+    return output_path
+
+
+def _ffmpeg_merge(paths: Sequence[str], output_path: str) -> None:
+    """使用FFmpeg解码后拼接并重新编码，统一到第一段可解析的采样率和声道数"""
+    target = None
+    for path in paths:
+        try:
+            stream = MP3Stream(path)
+        except (OSError, ValueError):
+            continue
+        target = (stream.sample_rate, stream.channels)
+        break
+    sample_rate, channels = target or (44100, 2)
+
+    input_args = []
+    filters = []
+    for i, path in enumerate(paths):
+        input_args.extend(["-i", str(path)])
+        filters.append(f"[{i}:a]aresample={sample_rate},aformat=channel_layouts={'mono' if channels == 1 else 'stereo'}[a{i}]")
+    filter_complex = ";".join(filters) + ";" + "".join(f"[a{i}]" for i in range(len(paths))) + f"concat=n={len(paths)}:v=0:a=1[out]"
+
+    result = subprocess.run([
+        "ffmpeg", "-y", *input_args,
+        "-filter_complex", filter_complex,
+        "-map", "[out]",
+        "-c:a", "libmp3lame", "-q:a", "2",
+        str(output_path)
+    ], capture_output=True, text=True, timeout=600)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg合并失败: {result.stderr[-2000:]}")
+
+
+def merge_audio_files(paths: Sequence[str], output_path: str) -> str:
+    """
+    合并多段MP3音频：优先帧级拼接，参数不一致或无法解析时回退到FFmpeg
+
+    Returns:
+        使用的方式："frames" 或 "ffmpeg"
+
+    Raises:
+        RuntimeError: FFmpeg回退也失败（或未安装FFmpeg）
+    """
+    started_at = time.perf_counter()
+    try:
+        concat_mp3(paths, output_path)
+        MP3_CONCAT_SECONDS.observe(time.perf_counter() - started_at, result="ok")
+        logger.info(f"帧级拼接 {len(paths)} 段MP3，耗时 {time.perf_counter() - started_at:.3f} 秒")
+        return "frames"
+    except (OSError, ValueError) as e:
+        MP3_CONCAT_SECONDS.observe(time.perf_counter() - started_at, result="failed")
+        logger.warning(f"帧级拼接失败，回退到FFmpeg: {e}")
+
+    started_at = time.perf_counter()
+    try:
+        _ffmpeg_merge(paths, output_path)
+    except (OSError, subprocess.TimeoutExpired, RuntimeError) as e:
+        FFMPEG_SECONDS.observe(time.perf_counter() - started_at, result="failed")
+        raise RuntimeError(f"音频合并失败: {e}") from e
+    FFMPEG_SECONDS.observe(time.perf_counter() - started_at, result="ok")
+    return "ffmpeg"
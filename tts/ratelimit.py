@@ -0,0 +1,70 @@
+"""
+TTS限流模块
+
+包含RateLimiter类，基于令牌桶算法控制各TTS服务的请求速率；
+以及ThrottledTTSClient类，为实际调用服务的合成请求加上并发闸门和限流
+"""
+
+import math
+import threading
+import time
+from typing import Optional
+
+from metrics import TTS_CHARACTERS, TTS_RATE_LIMIT_WAIT_SECONDS
+from .base import TTSClient
+
+
+class RateLimiter:
+    """令牌桶限流器（线程安全）"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Args:
+            rate: 每秒补充的令牌数，小于等于0表示不限流
+            burst: 令牌桶容量，默认取 ceil(rate)，至少为1
+        """
+        self.rate = float(rate)
+        self.capacity = max(1, burst if burst is not None else math.ceil(self.rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """获取一个令牌，必要时阻塞等待，返回等待的秒数"""
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class ThrottledTTSClient(TTSClient):
+    """
+    为TTSClient增加并发闸门和限流的包装客户端
+
+    包装在缓存之内，只有未命中缓存、真正请求服务的合成才占用并发名额和令牌，并计入合成字符数。
+    """
+
+    def __init__(self, client: TTSClient, service: str, gate: threading.BoundedSemaphore, rate_limiter: RateLimiter):
+        super().__init__(client.config)
+        self.client = client
+        self.service = service
+        self.gate = gate
+        self.rate_limiter = rate_limiter
+
+    def synthesize(self, text: str, speaker: str, language: str, output_dir: Optional[str] = None, sequence_number: Optional[int] = None) -> str:
+        """获取并发名额和令牌后调用被包装的客户端合成"""
+        with self.gate:
+            TTS_RATE_LIMIT_WAIT_SECONDS.observe(self.rate_limiter.acquire(), service=self.service)
+            TTS_CHARACTERS.inc(len(text), service=self.service)
+            return self.client.synthesize(text, speaker, language, output_dir, sequence_number)
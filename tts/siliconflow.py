@@ -6,12 +6,14 @@
 
 import time
 import os
-import requests
 from typing import Any, Dict, Optional
 
 import logging
 logger = logging.getLogger(__name__)
 
+from metrics import RETRIES
+from transport import get_session, get_timeout
+
 from .base import TTSClient
 
 
@@ -28,7 +30,9 @@ class SiliconFlowTTSClient(TTSClient):
         },
         "speed": 1.0,        # 语速，取值0.25-4.0，默认为1.0
         "retry_attempts": 3,
-        "retry_delay": 5     # 重试延迟，单位秒
+        "retry_delay": 5,    # 重试延迟，单位秒
+        "max_concurrency": 2,  # 最大并发合成数
+        "rate_limit": 1.0    # 每秒最多请求数，0表示不限流
     }
     
     def __init__(self, config: Dict[str, Any]):
@@ -98,7 +102,7 @@ class SiliconFlowTTSClient(TTSClient):
                     "speed": self.config["speed"]
                 }
                 
-                response = requests.post(url, headers=headers, json=payload, timeout=60)
+                response = get_session().post(url, headers=headers, json=payload, timeout=get_timeout(60))
                 response.raise_for_status()
                 
                 # 生成唯一文件名，使用speaker+sequence_number+timestamp格式
@@ -123,4 +127,5 @@ class SiliconFlowTTSClient(TTSClient):
             except Exception as e:
                 if attempt == self.config["retry_attempts"] - 1:  # Last attempt
                     raise Exception(f"硅基流动TTS API错误: {str(e)}")
+                RETRIES.inc(component="tts_siliconflow")
                 time.sleep(self.config["retry_delay"])  # Wait for X second before retrying
\ No newline at end of file
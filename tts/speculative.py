@@ -0,0 +1,186 @@
+"""
+推测式语音合成模块
+
+大模型改进对话期间，先按初稿逐条合成语音；改进稿中与初稿相同（或几乎相同）的对话直接复用
+已合成的音频，其余的推测结果丢弃（尚未开始的合成直接取消）。
+"""
+
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from metrics import SPECULATIVE_TTS_LINES, SPECULATIVE_TTS_SAVED_SECONDS
+from .config import DEFAULT_TTS_SERVICE, SPECULATIVE_TTS_CONFIG, get_service_limits
+from .tools import generate_podcast_audio
+
+
+def normalize_line(text: str) -> str:
+    """比较用的对话文本：去除空白和标点，忽略大小写"""
+    return re.sub(r"[\W_]+", "", text).lower()
+
+
+class _Speculation:
+    """一条初稿对话的推测合成"""
+
+    def __init__(self, index: int, text: str, speaker: str):
+        self.index = index
+        self.text = text
+        self.speaker = speaker
+        self.key = normalize_line(text)
+        self.future: Optional[Future] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.claimed_at: Optional[float] = None
+
+
+class SpeculativeSynthesis:
+    """
+    按初稿推测合成语音，改进稿到达后按说话人和文本匹配复用
+
+    合成请求与正式合成共用同一TTS服务的并发闸门和限流器，不会突破服务的并发数和请求速率上限。
+    """
+
+    def __init__(
+        self,
+        language: str,
+        random_voice_number: int,
+        tts_service: Optional[str] = None,
+        output_dir: Optional[str] = None,
+        config: Dict[str, Any] = SPECULATIVE_TTS_CONFIG,
+    ):
+        """
+        Args:
+            language: 语言代码
+            random_voice_number: 随机音色编号
+            tts_service: TTS服务名称
+            output_dir: 任务目录，推测合成的音频写入其下的 speculative 子目录（避免与正式合成的序号冲突）
+            config: 推测合成配置，见 SPECULATIVE_TTS_CONFIG
+        """
+        self.language = language
+        self.random_voice_number = random_voice_number
+        self.tts_service = tts_service or DEFAULT_TTS_SERVICE
+        self.output_dir = str(Path(output_dir or ".") / "speculative")
+        self.min_similarity = config["min_similarity"]
+        max_concurrency, _ = get_service_limits(self.tts_service)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"tts-{self.tts_service}-speculative")
+        self._speculations: List[_Speculation] = []
+        self._lock = threading.Lock()
+        self._refined_lines = 0
+        self._discarded = False
+
+    def start(self, lines: Iterable[Tuple[str, str]]) -> None:
+        """提交初稿各条对话 (文本, 说话者) 的合成"""
+        Path(self.output_dir).mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            for text, speaker in lines:
+                speculation = _Speculation(len(self._speculations), text, speaker)
+                speculation.future = self._executor.submit(self._synthesize, speculation)
+                self._speculations.append(speculation)
+        logger.info(f"推测合成初稿的 {len(self._speculations)} 条对话 (服务: {self.tts_service})")
+
+    def _synthesize(self, speculation: _Speculation) -> str:
+        speculation.started_at = time.perf_counter()
+        try:
+            return generate_podcast_audio(
+                speculation.text, speculation.speaker, self.language, self.random_voice_number,
+                self.tts_service, self.output_dir, speculation.index
+            )
+        finally:
+            speculation.finished_at = time.perf_counter()
+
+    def claim(self, text: str, speaker: str) -> Optional[Future]:
+        """
+        为改进稿中的一条对话查找可复用的推测合成
+
+        同一说话者、规范化后文本相同的初稿对话优先；min_similarity 小于1时，
+        也接受相似度不低于该值的对话。每条推测结果最多被复用一次。
+
+        Returns:
+            推测合成的Future（结果为音频文件路径），没有可复用的结果时返回None
+        """
+        key = normalize_line(text)
+        with self._lock:
+            self._refined_lines += 1
+            candidates = [
+                s for s in self._speculations
+                if s.claimed_at is None and s.speaker == speaker and not s.future.cancelled()
+            ]
+            match = next((s for s in candidates if s.key == key), None)
+            if match is None and self.min_similarity < 1.0 and key:
+                scored = [(SequenceMatcher(None, s.key, key).ratio(), s) for s in candidates]
+                scored = [(ratio, s) for ratio, s in scored if ratio >= self.min_similarity]
+                if scored:
+                    match = max(scored, key=lambda item: item[0])[1]
+            if match is None:
+                SPECULATIVE_TTS_LINES.inc(service=self.tts_service, result="miss")
+                return None
+            match.claimed_at = time.perf_counter()
+        SPECULATIVE_TTS_LINES.inc(service=self.tts_service, result="hit")
+        return match.future
+
+    def discard(self) -> None:
+        """改进稿已全部到达：取消尚未开始的未匹配合成（已被复用的合成不受影响）"""
+        with self._lock:
+            if self._discarded:
+                return
+            self._discarded = True
+            unclaimed = [s for s in self._speculations if s.claimed_at is None]
+        cancelled = sum(1 for s in unclaimed if s.future.cancel())
+        SPECULATIVE_TTS_LINES.inc(len(unclaimed), service=self.tts_service, result="discarded")
+        if unclaimed:
+            logger.info(f"丢弃 {len(unclaimed)} 条未匹配的推测合成（其中 {cancelled} 条尚未开始）")
+
+    def shutdown(self) -> None:
+        """
+        丢弃未匹配的合成，取消仍在排队的合成并等待已开始的合成结束
+
+        须在 iter_podcast_audio 结束（或放弃）后调用，调用后才能释放任务目录。
+        """
+        self.discard()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        推测合成统计
+
+        saved_seconds 为被复用的对话在改进稿到达前已完成的合成时间，
+        wasted_seconds 为被丢弃的对话已花费的合成时间。
+        """
+        with self._lock:
+            speculations = list(self._speculations)
+            refined_lines = self._refined_lines
+        hits = [s for s in speculations if s.claimed_at is not None]
+        saved = sum(
+            min(s.finished_at or s.claimed_at, s.claimed_at) - s.started_at
+            for s in hits
+            if s.started_at is not None and s.started_at < s.claimed_at and not (s.future.done() and s.future.exception())
+        )
+        wasted = sum(
+            (s.finished_at or time.perf_counter()) - s.started_at
+            for s in speculations if s.claimed_at is None and s.started_at is not None
+        )
+        return {
+            "draft_lines": len(speculations),
+            "refined_lines": refined_lines,
+            "hits": len(hits),
+            "hit_rate": len(hits) / refined_lines if refined_lines else 0.0,
+            "saved_seconds": round(saved, 3),
+            "wasted_seconds": round(wasted, 3),
+        }
+
+    def close(self) -> Dict[str, Any]:
+        """结束推测合成（见 shutdown），记录并返回统计"""
+        self.shutdown()
+        stats = self.stats()
+        SPECULATIVE_TTS_SAVED_SECONDS.inc(stats["saved_seconds"], service=self.tts_service)
+        logger.info(
+            f"推测合成: 命中 {stats['hits']}/{stats['refined_lines']} 条 ({stats['hit_rate']:.0%})，"
+            f"节省 {stats['saved_seconds']:.1f} 秒，浪费 {stats['wasted_seconds']:.1f} 秒"
+        )
+        return stats
@@ -0,0 +1,114 @@
+"""
+合成语音客户端模块
+
+包含SyntheticTTSClient类：不访问网络、不需要密钥，按"每秒字符数"模型生成对应时长的
+静音MP3或WAV文件，并可模拟合成延迟。用于在无网络的CI机器上对音频拼接、缓存和调度
+进行压测，输出文件大小与真实音频相当。
+"""
+
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+import wave
+from typing import Any, Dict, Optional
+
+from .base import TTSClient
+
+# MPEG-1 Layer III, 128kbps, 44.1kHz, 联合立体声；每帧417字节、1152个采样（约26.1毫秒）
+MP3_FRAME_HEADER = bytes([0xFF, 0xFB, 0x90, 0x64])
+MP3_FRAME_BYTES = 417
+MP3_FRAME_SECONDS = 1152 / 44100
+
+# WAV输出参数：16kHz、单声道、16位
+WAV_SAMPLE_RATE = 16000
+
+
+def write_silent_mp3(path: str, seconds: float) -> str:
+    """写入指定时长的静音MP3（由完整的MPEG帧组成，可被播放器和FFmpeg解码）"""
+    frame = MP3_FRAME_HEADER + bytes(MP3_FRAME_BYTES - len(MP3_FRAME_HEADER))
+    frames = max(1, int(round(seconds / MP3_FRAME_SECONDS)))
+    with open(path, "wb") as f:
+        f.write(frame * frames)
+    return path
+
+
+def write_silent_wav(path: str, seconds: float, sample_rate: int = WAV_SAMPLE_RATE) -> str:
+    """写入指定时长的静音WAV（16位单声道PCM）"""
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(bytes(2 * max(1, int(seconds * sample_rate))))
+    return path
+
+
+class SyntheticTTSClient(TTSClient):
+    """合成语音客户端（用于压测，输出静音音频）"""
+
+    # 默认配置
+    DEFAULT_CONFIG = {
+        # 各语言的语速（每秒字符数），未列出的语言使用default
+        "chars_per_second": {
+            "zh": 4.5,
+            "ja": 7.0,
+            "ko": 6.0,
+            "default": 14.0,
+        },
+        # 各说话人的相对语速，未列出的说话人为1.0
+        "speaker_speed": {
+            "Host (Jane)": 1.0,
+            "Guest": 0.9,
+            "Guest 2": 1.1,
+        },
+        "speed": 1.0,             # 全局语速倍数
+        "pause": 0.3,             # 每段音频末尾的停顿，单位秒
+        "format": "mp3",          # 输出格式：mp3 或 wav
+        "latency": 0.0,           # 每次合成的基础延迟，单位秒
+        "latency_per_char": 0.0,  # 每个字符额外增加的延迟，单位秒
+        "jitter": 0.0,            # 延迟抖动（均匀分布 ±jitter）
+        "seed": 42,
+        "max_concurrency": 8,     # 最大并发合成数
+        "rate_limit": 0.0         # 每秒最多请求数，0表示不限流
+    }
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__({**self.DEFAULT_CONFIG, **config})
+        if self.config["format"] not in ("mp3", "wav"):
+            raise ValueError(f"不支持的合成音频格式: {self.config['format']}")
+        self._random = random.Random(self.config.get("seed"))
+        self._lock = threading.Lock()
+
+    def estimate_duration(self, text: str, speaker: str, language: str) -> float:
+        """按语言和说话人的语速估算音频时长，单位秒"""
+        rates = self.config["chars_per_second"]
+        chars_per_second = rates.get(language, rates["default"])
+        speed = self.config["speaker_speed"].get(speaker, 1.0) * self.config["speed"]
+        characters = len(re.sub(r"\s+", "", text))
+        return characters / (chars_per_second * speed) + self.config["pause"]
+
+    def _simulate_latency(self, text: str) -> None:
+        with self._lock:
+            jitter = self._random.uniform(-self.config["jitter"], self.config["jitter"])
+        delay = self.config["latency"] + self.config["latency_per_char"] * len(text) + jitter
+        if delay > 0:
+            time.sleep(delay)
+
+    def synthesize(self, text: str, speaker: str, language: str, output_dir: Optional[str] = None, sequence_number: Optional[int] = None) -> str:
+        """生成与文本长度相符的静音音频"""
+        self._simulate_latency(text)
+
+        extension = self.config["format"]
+        if sequence_number is not None:
+            filename = f"synthetic_audio_{speaker}_{sequence_number}.{extension}"
+        else:
+            filename = f"synthetic_audio_{speaker}_{hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]}.{extension}"
+        filename = re.sub(r"[^\w\-.]", "_", filename)
+        file_path = os.path.join(output_dir, filename) if output_dir else filename
+
+        seconds = self.estimate_duration(text, speaker, language)
+        if extension == "wav":
+            return write_silent_wav(file_path, seconds)
+        return write_silent_mp3(file_path, seconds)
@@ -4,29 +4,97 @@ TTS工具模块
 提供音频生成、文本分割等高级功能
 """
 
-import time
+import shutil
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Dict, Any
-import subprocess
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Iterable, Iterator, Tuple
 import requests
 from loguru import logger
 
 from .factory import TTSClientFactory
-from .config import DEFAULT_TTS_SERVICE, TTS_SERVICES
+from .cache import CachedTTSClient, TTSCache
+from .cassette import CassetteTTSClient
+from .config import DEFAULT_TTS_SERVICE, TTS_CACHE_CONFIG, TTS_SERVICES, get_service_limits
+from .mixing import assemble_audio
+from .ratelimit import RateLimiter, ThrottledTTSClient
+from cassette import get_cassette
+from metrics import TTS_SYNTHESIZE_SECONDS
 
-# 初始化TTS客户端
+if TYPE_CHECKING:
+    from .speculative import SpeculativeSynthesis
+
+# 各服务的TTS客户端（按服务缓存，线程安全）
 tts_clients = {}
+tts_clients_lock = threading.Lock()
 
 def init_tts_client(service: Optional[str] = None, config: Optional[Dict[str, Any]] = None) -> Any:
-    """初始化TTS客户端"""
-    global tts_clients
+    """获取（必要时初始化）指定服务的TTS客户端，线程安全"""
+    target_service = service or DEFAULT_TTS_SERVICE
+    client = tts_clients.get(target_service)
+    if client is not None:
+        return client
+
+    with tts_clients_lock:
+        if target_service not in tts_clients:
+            target_config = config or TTS_SERVICES.get(target_service)
+            if not target_config:
+                raise ValueError(f"找不到TTS服务配置: {target_service}")
+            cassette = get_cassette()
+            if cassette and cassette.replaying:
+                # 回放录像时不创建真实客户端，无需密钥
+                client = CassetteTTSClient(target_service, target_config, cassette)
+            else:
+                client = TTSClientFactory.create_client(target_service, target_config)
+                if cassette:
+                    client = CassetteTTSClient(target_service, client.config, cassette, client)
+            # 只有未命中缓存的合成才占用服务的并发名额和限流令牌
+            client = ThrottledTTSClient(client, target_service, get_concurrency_gate(target_service), get_rate_limiter(target_service))
+            if TTS_CACHE_CONFIG["enabled"]:
+                client = CachedTTSClient(client, target_service, get_tts_cache())
+            tts_clients[target_service] = client
+        return tts_clients[target_service]
+
+# 跨任务共享的TTS音频缓存
+tts_cache = None
+tts_cache_lock = threading.Lock()
+
+def get_tts_cache() -> TTSCache:
+    """获取TTS音频缓存（懒加载），可通过 stats() 查看命中/未命中次数"""
+    global tts_cache
+    if tts_cache is None:
+        with tts_cache_lock:
+            if tts_cache is None:
+                tts_cache = TTSCache(TTS_CACHE_CONFIG["cache_dir"], TTS_CACHE_CONFIG["max_bytes"])
+    return tts_cache
+
+# 各TTS服务的限流器（同一服务的所有任务共享，保证总请求速率不超限）
+tts_rate_limiters = {}
+tts_rate_limiters_lock = threading.Lock()
+
+def get_rate_limiter(service: Optional[str] = None) -> RateLimiter:
+    """获取TTS服务对应的限流器"""
+    target_service = service or DEFAULT_TTS_SERVICE
+    with tts_rate_limiters_lock:
+        if target_service not in tts_rate_limiters:
+            _, rate_limit = get_service_limits(target_service)
+            tts_rate_limiters[target_service] = RateLimiter(rate_limit)
+        return tts_rate_limiters[target_service]
+
+# 各TTS服务的并发闸门（同一服务的正式合成和推测合成共享，保证同时进行的请求数不超过max_concurrency）
+tts_concurrency_gates = {}
+tts_concurrency_gates_lock = threading.Lock()
+
+def get_concurrency_gate(service: Optional[str] = None) -> threading.BoundedSemaphore:
+    """获取TTS服务对应的并发闸门"""
     target_service = service or DEFAULT_TTS_SERVICE
-    if target_service not in tts_clients:
-        target_config = config or TTS_SERVICES.get(target_service)
-        if not target_config:
-            raise ValueError(f"找不到TTS服务配置: {target_service}")
-        tts_clients[target_service] = TTSClientFactory.create_client(target_service, target_config)
-    return tts_clients[target_service]
+    with tts_concurrency_gates_lock:
+        if target_service not in tts_concurrency_gates:
+            max_concurrency, _ = get_service_limits(target_service)
+            tts_concurrency_gates[target_service] = threading.BoundedSemaphore(max_concurrency)
+        return tts_concurrency_gates[target_service]
 
 def split_text_by_speaker_tags(text: str, max_length: int = 1000) -> List[str]:
     """将包含说话者标签的文本分割成多个段落"""
@@ -65,6 +133,19 @@ def split_text_by_speaker_tags(text: str, max_length: int = 1000) -> List[str]:
     
     return segments
 
+def _add_context_prefix(segments: List[str], i: int) -> str:
+    """音色一致性优化：非第一段添加前一段的最后一句作为上下文前缀"""
+    segment = segments[i]
+    if i == 0 or not segments[i-1]:
+        return segment
+    # 获取前一段的最后一句（如果有多个句子）
+    prev_segment_lines = segments[i-1].strip().split('\n')
+    last_line = prev_segment_lines[-1].strip()
+    # 确保有足够的内容，并避免重复
+    if last_line and len(last_line) > 10 and not segment.strip().startswith(last_line):
+        return last_line + "\n" + segment
+    return segment
+
 def generate_podcast_audio_segmented(
     text: str, speaker: str, language: str, random_voice_number: int, tts_service: Optional[str] = None, output_dir: Optional[str] = None, sequence_number: Optional[int] = None
 ) -> str:
@@ -79,100 +160,40 @@ def generate_podcast_audio_segmented(
         
         # 分段合成
         segments = split_text_by_speaker_tags(text, max_length=1000)
-        logger.info(f"将文本分割为 {len(segments)} 个段落进行分段合成")
+        target_service = tts_service or DEFAULT_TTS_SERVICE
+        max_concurrency, _ = get_service_limits(target_service)
+        logger.info(f"将文本分割为 {len(segments)} 个段落进行分段合成 (并发: {min(max_concurrency, len(segments))})")
         
-        audio_files = []
         temp_dir = Path(output_dir) if output_dir else Path(".")
+        # 每次调用使用独立的分段目录，避免并发合成的多条对话互相覆盖分段文件
+        run_id = uuid.uuid4().hex[:12]
+        segment_dir = temp_dir / f"segments_{run_id}"
+        segment_dir.mkdir(parents=True, exist_ok=True)
         
-        # 音色一致性优化：添加上下文保持机制
-        context_seed = str(int(time.time()))  # 使用时间戳作为种子，确保同一批次调用参数一致
+        # 上下文前缀只取决于分段结果，先全部确定下来再并发合成，保证音色一致性优化不受完成顺序影响
+        enhanced_segments = [_add_context_prefix(segments, i) for i in range(len(segments))]
         
-        for i, segment in enumerate(segments):
-            logger.info(f"合成第 {i+1}/{len(segments)} 段音频 (长度: {len(segment)} 字符)")
-            
-            # 音色一致性优化：添加上下文前缀
-            # 对于非第一段，添加前一段的最后一句作为上下文
-            if i > 0 and len(segments[i-1]) > 0:
-                # 获取前一段的最后一句（如果有多个句子）
-                prev_segment_lines = segments[i-1].strip().split('\n')
-                if prev_segment_lines:
-                    last_line = prev_segment_lines[-1].strip()
-                    if last_line and len(last_line) > 10:  # 确保有足够的内容
-                        # 添加上下文前缀，但避免重复
-                        if not segment.strip().startswith(last_line):
-                            enhanced_segment = last_line + "\n" + segment
-                        else:
-                            enhanced_segment = segment
-                    else:
-                        enhanced_segment = segment
-                else:
-                    enhanced_segment = segment
-            else:
-                enhanced_segment = segment
-            
-            # 合成当前段落的音频
-            segment_audio = tts_client.synthesize(
-                enhanced_segment, speaker, language, str(temp_dir), 
-                sequence_number if sequence_number is not None else i
-            )
-            audio_files.append(segment_audio)
-            
-            # 添加延迟避免API限制，但减少延迟时间
-            time.sleep(0.5)  # 从1秒减少到0.5秒，减少音色变化的机会
+        def synthesize_segment(i: int) -> str:
+            logger.info(f"合成第 {i+1}/{len(segments)} 段音频 (长度: {len(enhanced_segments[i])} 字符)")
+            return tts_client.synthesize(enhanced_segments[i], speaker, language, str(segment_dir), i)
+        
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(segments)), thread_name_prefix=f"tts-{target_service}-segment") as executor:
+            audio_files = list(executor.map(synthesize_segment, range(len(segments))))
         
-        # 合并音频文件，优化音色一致性
+        # 合并音频文件：启用混音时段间交叉淡化，否则按MP3帧直接拼接（不重新编码）
         if len(audio_files) > 1:
-            # 创建合并列表文件
-            list_file_path = temp_dir / f"merge_list_{int(time.time())}.txt"
-            with open(list_file_path, 'w', encoding='utf-8') as f:
-                for audio_file in audio_files:
-                    f.write(f"file '{audio_file}'\n")
-            
-            # 合并音频，添加淡入淡出效果
-            merged_audio_path = temp_dir / f"merged_audio_{int(time.time())}.mp3"
-            
-            # 尝试使用带淡入淡出效果的合并方式
+            merged_audio_path = temp_dir / f"merged_audio_{run_id}.mp3"
             try:
-                # 方法1：使用复杂的FFmpeg命令添加淡入淡出
-                filter_complex = ""
-                for i in range(len(audio_files)):
-                    filter_complex += f"[{i}:a]"
-                
-                # 添加淡入淡出效果：每段音频开头0.5秒淡入，结尾0.5秒淡出
-                filter_complex += f"concat=n={len(audio_files)}:v=0:a=1[out]"
-                
-                # 构建输入文件列表
-                input_args = []
-                for audio_file in audio_files:
-                    input_args.extend(['-i', str(audio_file)])
-                
-                result = subprocess.run([
-                    'ffmpeg', *input_args,
-                    '-filter_complex', filter_complex,
-                    '-map', '[out]',
-                    '-c:a', 'libmp3lame', '-q:a', '2',
-                    str(merged_audio_path)
-                ], capture_output=True, text=True, timeout=60)
-                
-            except (subprocess.TimeoutExpired, Exception):
-                # 方法1失败时，回退到简单合并
-                result = subprocess.run([
-                    'ffmpeg', '-f', 'concat', '-safe', '0', '-i', str(list_file_path),
-                    '-c', 'copy', str(merged_audio_path)
-                ], capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                # 删除临时文件
-                list_file_path.unlink(missing_ok=True)
-                for audio_file in audio_files:
-                    Path(audio_file).unlink(missing_ok=True)
-                
-                logger.info(f"成功合并 {len(audio_files)} 段音频，音色一致性已优化")
-                return str(merged_audio_path)
-            else:
-                logger.warning(f"音频合并失败: {result.stderr}")
+                assemble_audio(audio_files, str(merged_audio_path))
+            except RuntimeError as e:
+                logger.warning(str(e))
                 # 返回第一段音频作为备选
                 return audio_files[0]
+            
+            # 删除临时文件
+            shutil.rmtree(segment_dir, ignore_errors=True)
+            logger.info(f"成功合并 {len(audio_files)} 段音频，音色一致性已优化")
+            return str(merged_audio_path)
         else:
             return audio_files[0]
             
@@ -187,14 +208,16 @@ def generate_podcast_audio(
     text: str, speaker: str, language: str, random_voice_number: int, tts_service: Optional[str] = None, output_dir: Optional[str] = None, sequence_number: Optional[int] = None
 ) -> str:
     """Generate audio for podcast using TTS or advanced audio models."""
+    service = tts_service or DEFAULT_TTS_SERVICE
     try:
-        # 对于硅基流动TTS，使用分段合成
-        if tts_service == "siliconflow":
-            return generate_podcast_audio_segmented(text, speaker, language, random_voice_number, tts_service, output_dir, sequence_number)
-        
-        # 其他TTS服务使用原有方式
-        tts_client = init_tts_client(tts_service)
-        return tts_client.synthesize(text, speaker, language, output_dir, sequence_number)
+        with TTS_SYNTHESIZE_SECONDS.time(service=service):
+            # 对于硅基流动TTS，使用分段合成
+            if tts_service == "siliconflow":
+                return generate_podcast_audio_segmented(text, speaker, language, random_voice_number, tts_service, output_dir, sequence_number)
+
+            # 其他TTS服务使用原有方式
+            tts_client = init_tts_client(tts_service)
+            return tts_client.synthesize(text, speaker, language, output_dir, sequence_number)
     except Exception as e:
         # 添加更详细的错误信息
         error_msg = f"TTS语音合成失败: {str(e)}"
@@ -202,5 +225,64 @@ def generate_podcast_audio(
             error_msg += f" (服务: {tts_service})"
         raise Exception(error_msg) from e
 
+def iter_podcast_audio(
+    lines: Iterable[Tuple[str, str]], language: str, random_voice_number: int, tts_service: Optional[str] = None, output_dir: Optional[str] = None,
+    speculation: Optional["SpeculativeSynthesis"] = None,
+) -> Iterator[str]:
+    """
+    并发合成多条对话音频，按对话顺序逐条产出音频文件路径
+
+    并发上限和请求速率由 tts/config.py 中对应服务的 max_concurrency、rate_limit 决定，
+    同一服务的所有任务和推测合成共享并发闸门和限流器（由 init_tts_client 包装在缓存之内，命中缓存不受限）。
+    lines 可以是惰性迭代器，每读到一条就提交合成，已按顺序完成的结果会立即产出。
+
+    Args:
+        lines: (文本, 说话者) 序列
+        language: 语言代码
+        random_voice_number: 随机音色编号
+        tts_service: TTS服务名称
+        output_dir: 输出目录
+        speculation: 按初稿进行的推测合成，可复用的对话不再重新合成；lines 读完后丢弃其余推测结果
+
+    Yields:
+        按对话顺序排列的音频文件路径
+    """
+    target_service = tts_service or DEFAULT_TTS_SERVICE
+    max_concurrency, _ = get_service_limits(target_service)
+
+    def synthesize_line(text: str, speaker: str, sequence_number: int) -> str:
+        return generate_podcast_audio(
+            text, speaker, language, random_voice_number, tts_service, output_dir, sequence_number
+        )
+
+    def resolve(future: Future, text: str, speaker: str, sequence_number: int, speculative: bool) -> str:
+        if not speculative:
+            return future.result()
+        try:
+            return future.result()
+        except Exception as e:
+            # 推测合成失败时按改进稿重新合成
+            logger.warning(f"推测合成失败，重新合成第 {sequence_number + 1} 条对话: {e}")
+            return synthesize_line(text, speaker, sequence_number)
+
+    executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"tts-{target_service}")
+    pending = deque()
+    try:
+        for i, (text, speaker) in enumerate(lines):
+            future = speculation.claim(text, speaker) if speculation else None
+            if future is not None:
+                pending.append((future, text, speaker, i, True))
+            else:
+                pending.append((executor.submit(synthesize_line, text, speaker, i), text, speaker, i, False))
+            # 产出队首已经完成的结果，保持对话顺序
+            while pending and pending[0][0].done():
+                yield resolve(*pending.popleft())
+        if speculation:
+            speculation.discard()
+        while pending:
+            yield resolve(*pending.popleft())
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
 # 注意：移除了全局初始化调用，改为懒加载模式
 # TTS客户端将在首次使用时初始化
\ No newline at end of file
@@ -25,7 +25,9 @@ class XunfeiTTSClient(TTSClient):
         "pitch": 50,        # 音调，取值0-100，默认为50
         "volume": 50,       # 音量，取值0-100，默认为50
         "retry_attempts": 3,
-        "retry_delay": 5    # 重试延迟，单位秒
+        "retry_delay": 5,   # 重试延迟，单位秒
+        "max_concurrency": 4,  # 最大并发合成数
+        "rate_limit": 5.0   # 每秒最多请求数，0表示不限流
     }
     
     def __init__(self, config: Dict[str, Any]):
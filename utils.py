@@ -3,12 +3,18 @@ utils.py
 
 Functions:
 - generate_script: Get the dialogue from the LLM.
+- generate_script_stream: Get the dialogue from the LLM, streaming the refined dialogue.
+- refine_dialogue: Improve a first draft, either by full regeneration or by a line-level patch.
+- refine_dialogue_with_patch: Ask the LLM for line-level edits and apply them to the draft.
+- condense_input: Summarize long inputs chunk by chunk (map-reduce) before script generation.
 - call_llm: Call the LLM with the given prompt and dialogue format.
 """
 
 # Standard library imports
+import threading
 import time
-from typing import Any, Union, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Union, Dict, List, Optional
 
 # Third-party imports
 import requests
@@ -17,60 +23,266 @@ import requests
 import logging
 from constants import (
     DEFAULT_LLM_PLATFORM,
+    HIERARCHICAL_CHUNK_SIZE,
+    HIERARCHICAL_ENABLED,
+    HIERARCHICAL_MAX_WORKERS,
+    HIERARCHICAL_THRESHOLD,
+    LLM_CACHE_CONFIG,
     LLM_PLATFORMS,
+    LLM_REFINE_MODE,
+)
+from prompts import CHUNK_NOTES_PROMPT, REFINE_PATCH_PROMPT
+from schema import ChunkNotes, DialoguePatch, ShortDialogue, MediumDialogue
+from llm import CassetteLLMClient, LLMClientFactory, LLMResponseCache, apply_dialogue_patch, format_numbered_dialogue
+from llm.stream import DialogueStream
+from cassette import get_cassette
+from metrics import (
+    LLM_CALL_SECONDS,
+    LLM_PROMPT_CHARACTERS,
+    LLM_REFINE_PATCHES,
+    LLM_REFINE_SAVED_CHARACTERS,
+    LLM_RESPONSE_CHARACTERS,
 )
-from schema import ShortDialogue, MediumDialogue
-from llm import LLMClientFactory
 from tool import parse_url
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
-# 初始化大模型客户端
-llm_client = None
+# 改进对话时的用户输入
+REFINE_USER_PROMPT = "请改进对话，使其更自然、更吸引人。"
+REFINE_PATCH_USER_PROMPT = "请列出改进对话所需的修改。"
+
+# 各平台的大模型客户端（按平台缓存，多任务并发时互不替换）
+llm_clients: Dict[str, Any] = {}
+llm_clients_lock = threading.Lock()
 
 def init_llm_client(platform: Optional[str] = None, config: Optional[Dict[str, Any]] = None) -> Any:
-    """初始化大模型客户端"""
-    global llm_client
-    
+    """获取（必要时初始化）指定平台的大模型客户端，线程安全"""
     # 确定目标平台和配置
     target_platform = platform or DEFAULT_LLM_PLATFORM
-    target_config = config or LLM_PLATFORMS.get(target_platform)
-    
-    if not target_config:
-        raise ValueError(f"找不到大模型平台配置: {target_platform}")
-    
-    # 如果指定了不同的平台或客户端尚未初始化，重新初始化客户端
-    if not llm_client or (platform and platform != getattr(llm_client, 'platform', None)):
-        try:
-            llm_client = LLMClientFactory.create_client(target_platform, target_config)
-            # 保存平台信息
-            llm_client.platform = target_platform
-        except Exception as e:
-            logger.warning(f"初始化大模型客户端失败: {e}")
-            # 如果初始化失败，保持llm_client为None
-            llm_client = None
-            raise
-    
-    return llm_client
+
+    client = llm_clients.get(target_platform)
+    if client is not None:
+        return client
+
+    with llm_clients_lock:
+        if target_platform not in llm_clients:
+            target_config = config or LLM_PLATFORMS.get(target_platform)
+            if not target_config:
+                raise ValueError(f"找不到大模型平台配置: {target_platform}")
+            cassette = get_cassette()
+            try:
+                if cassette and cassette.replaying:
+                    # 回放录像时不创建真实客户端，无需密钥
+                    client = CassetteLLMClient(target_platform, target_config, cassette)
+                else:
+                    client = LLMClientFactory.create_client(target_platform, target_config)
+                    if cassette:
+                        client = CassetteLLMClient(target_platform, client.config, cassette, client)
+                # 保存平台信息
+                client.platform = target_platform
+            except Exception as e:
+                logger.warning(f"初始化大模型客户端失败: {e}")
+                raise
+            llm_clients[target_platform] = client
+        return llm_clients[target_platform]
+
+# 大模型响应缓存
+llm_cache = None
+llm_cache_lock = threading.Lock()
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """获取大模型响应缓存（懒加载），未启用时返回None"""
+    global llm_cache
+    if llm_cache is None and LLM_CACHE_CONFIG["enabled"]:
+        with llm_cache_lock:
+            if llm_cache is None:
+                llm_cache = LLMResponseCache(
+                    LLM_CACHE_CONFIG["db_path"], LLM_CACHE_CONFIG["ttl"], LLM_CACHE_CONFIG["max_entries"]
+                )
+    return llm_cache
+
+def _make_cache_key(cache: LLMResponseCache, client: Any, platform: Optional[str], system_prompt: str, text: str, dialogue_format: Any) -> str:
+    """根据客户端配置计算大模型响应缓存键"""
+    return cache.make_key(
+        platform or DEFAULT_LLM_PLATFORM,
+        client.config.get("model_id"),
+        client.config.get("temperature"),
+        system_prompt,
+        text,
+        dialogue_format,
+    )
+
+def _response_text(result: Any) -> str:
+    """大模型结果的文本形式，用于统计响应字符数"""
+    return result.model_dump_json() if hasattr(result, "model_dump_json") else str(result)
 
 def generate_script(
     system_prompt: str,
     input_text: str,
     output_model: Union[ShortDialogue, MediumDialogue],
     llm_platform: Optional[str] = None,
+    on_draft: Optional[Callable[[Any], None]] = None,
 ) -> Union[ShortDialogue, MediumDialogue]:
-    """Get the dialogue from the LLM."""
+    """Get the dialogue from the LLM.
+
+    on_draft is called with the first draft before the refinement call starts
+    (used to speculatively synthesize the draft while the refinement runs).
+    """
     
     logger.info("=== 播客脚本生成开始 ===")
     logger.info(f"目标模型: {output_model.__name__}")
     logger.info(f"输入文本长度: {len(input_text)}")
 
+    # 超长输入先分块总结，控制单次调用的输入规模
+    input_text = condense_input(input_text, llm_platform)
+
     # Call the LLM for the first time
     logger.info("--- 第一次大模型调用：生成初稿 ---")
-    first_draft_dialogue = call_llm(system_prompt, input_text, output_model, llm_platform)
+    first_draft_dialogue = call_llm(system_prompt, input_text, output_model, llm_platform, stage="draft")
+    logger.info("--- 第一次大模型调用完成 ---")
+    if on_draft:
+        on_draft(first_draft_dialogue)
+
+    # Call the LLM a second time to improve the dialogue
+    logger.info("--- 第二次大模型调用：改进对话 ---")
+    final_dialogue = refine_dialogue(system_prompt, first_draft_dialogue, output_model, llm_platform)
+    logger.info("--- 第二次大模型调用完成 ---")
+    
+    logger.info("=== 播客脚本生成完成 ===")
+    cache = get_llm_cache()
+    if cache:
+        logger.info(f"大模型缓存统计: {cache.stats()}")
+
+    return final_dialogue
+
+
+def generate_script_stream(
+    system_prompt: str,
+    input_text: str,
+    output_model: Union[ShortDialogue, MediumDialogue],
+    llm_platform: Optional[str] = None,
+    on_draft: Optional[Callable[[Any], None]] = None,
+) -> DialogueStream:
+    """Get the dialogue from the LLM, streaming the refined dialogue item by item.
+
+    on_draft is called with the first draft before the refinement call starts
+    (used to speculatively synthesize the draft while the refinement runs).
+    """
+
+    logger.info("=== 播客脚本流式生成开始 ===")
+    logger.info(f"目标模型: {output_model.__name__}")
+    logger.info(f"输入文本长度: {len(input_text)}")
+
+    # 超长输入先分块总结，控制单次调用的输入规模
+    input_text = condense_input(input_text, llm_platform)
+
+    # 初稿仍然一次性生成（可命中缓存）
+    logger.info("--- 第一次大模型调用：生成初稿 ---")
+    first_draft_dialogue = call_llm(system_prompt, input_text, output_model, llm_platform, stage="draft")
     logger.info("--- 第一次大模型调用完成 ---")
+    if on_draft:
+        on_draft(first_draft_dialogue)
+
+    # 补丁模式的输出很短，无需流式；补丁无效时回退到流式重新生成整篇对话
+    if LLM_REFINE_MODE == "patch":
+        logger.info("--- 第二次大模型调用：按补丁改进对话 ---")
+        refined = refine_dialogue_with_patch(system_prompt, first_draft_dialogue, output_model, llm_platform)
+        if refined is not None:
+            logger.info("=== 播客脚本流式生成完成 ===")
+            return DialogueStream.from_result(refined)
+
+    # 改进对话使用流式输出，调用方可以边接收对话项边合成语音
+    logger.info("--- 第二次大模型调用：流式改进对话 ---")
+    system_prompt_with_dialogue = _build_refine_prompt(system_prompt, first_draft_dialogue)
+    client = init_llm_client(llm_platform)
 
+    cache = get_llm_cache()
+    cache_key = None
+    if cache:
+        cache_key = _make_cache_key(cache, client, llm_platform, system_prompt_with_dialogue, REFINE_USER_PROMPT, output_model)
+        cached = cache.get(cache_key, output_model, "refine")
+        if cached is not None:
+            logger.info("大模型缓存命中 (阶段: refine)")
+            return DialogueStream.from_result(cached)
+
+    metric_labels = {"platform": llm_platform or DEFAULT_LLM_PLATFORM, "stage": "refine"}
+    LLM_PROMPT_CHARACTERS.inc(len(system_prompt_with_dialogue) + len(REFINE_USER_PROMPT), **metric_labels)
+    started_at = time.perf_counter()
+    try:
+        stream = client.generate_stream(system_prompt_with_dialogue, REFINE_USER_PROMPT, output_model)
+    except Exception as e:
+        error_msg = f"大模型调用失败: {str(e)}"
+        if llm_platform:
+            error_msg += f" (平台: {llm_platform})"
+        raise Exception(error_msg) from e
+
+    def on_complete(result: Any) -> None:
+        LLM_CALL_SECONDS.observe(time.perf_counter() - started_at, **metric_labels)
+        LLM_RESPONSE_CHARACTERS.inc(len(_response_text(result)), **metric_labels)
+        logger.info("=== 播客脚本流式生成完成 ===")
+        if cache:
+            cache.put(cache_key, result)
+            logger.info(f"大模型缓存统计: {cache.stats()}")
+
+    stream.on_complete = on_complete
+    return stream
+
+
+def chunk_text(text: str, chunk_size: int) -> List[str]:
+    """按段落边界将文本切分为不超过chunk_size字符的块，超长段落直接截断切分"""
+    chunks = []
+    current = ""
+    for paragraph in text.split("\n\n"):
+        while len(paragraph) > chunk_size:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:chunk_size])
+            paragraph = paragraph[chunk_size:]
+        if current and len(current) + len(paragraph) + 2 > chunk_size:
+            chunks.append(current)
+            current = paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current.strip():
+        chunks.append(current)
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+def condense_input(input_text: str, llm_platform: Optional[str] = None, max_rounds: int = 3) -> str:
+    """
+    分层（map-reduce）压缩超长输入
+
+    文本超过 HIERARCHICAL_THRESHOLD 时切块并行总结，再将各块笔记按顺序合并；
+    合并后仍然过长则继续下一轮，最多 max_rounds 轮。未超过阈值时原样返回。
+    """
+    if not HIERARCHICAL_ENABLED:
+        return input_text
+
+    for round_number in range(1, max_rounds + 1):
+        if len(input_text) <= HIERARCHICAL_THRESHOLD:
+            break
+
+        chunks = chunk_text(input_text, HIERARCHICAL_CHUNK_SIZE)
+        logger.info(f"--- 分块总结第 {round_number} 轮：{len(input_text)} 字符，{len(chunks)} 块 ---")
+
+        def summarize(index: int) -> str:
+            text = f"（第 {index + 1}/{len(chunks)} 部分）\n\n{chunks[index]}"
+            result = call_llm(CHUNK_NOTES_PROMPT, text, ChunkNotes, llm_platform, stage="map")
+            return result.notes if hasattr(result, "notes") else str(result)
+
+        with ThreadPoolExecutor(max_workers=max(1, HIERARCHICAL_MAX_WORKERS)) as executor:
+            notes = list(executor.map(summarize, range(len(chunks))))
+
+        input_text = "\n\n".join(f"## 第 {i + 1} 部分\n\n{note}" for i, note in enumerate(notes))
+        logger.info(f"--- 分块总结第 {round_number} 轮完成：合并后 {len(input_text)} 字符 ---")
+
+    return input_text
+
+
+def _build_refine_prompt(system_prompt: str, first_draft_dialogue: Any) -> str:
+    """构造改进对话所用的系统提示词"""
     # 检查返回的是否是Pydantic模型对象
     if hasattr(first_draft_dialogue, 'model_dump_json'):
         # 如果是Pydantic模型对象，使用model_dump_json()
@@ -78,23 +290,79 @@ def generate_script(
     else:
         # 如果是字符串或其他类型，直接使用
         dialogue_json = str(first_draft_dialogue)
+    return f"{system_prompt}\n\n这是你提供的对话初稿：\n\n{dialogue_json}."
 
-    # Call the LLM a second time to improve the dialogue
-    logger.info("--- 第二次大模型调用：改进对话 ---")
-    system_prompt_with_dialogue = f"{system_prompt}\n\n这是你提供的对话初稿：\n\n{dialogue_json}."
-    final_dialogue = call_llm(system_prompt_with_dialogue, "请改进对话，使其更自然、更吸引人。", output_model, llm_platform)
-    logger.info("--- 第二次大模型调用完成 ---")
-    
-    logger.info("=== 播客脚本生成完成 ===")
 
-    return final_dialogue
+def refine_dialogue(
+    system_prompt: str,
+    first_draft_dialogue: Any,
+    output_model: Union[ShortDialogue, MediumDialogue],
+    llm_platform: Optional[str] = None,
+    mode: str = LLM_REFINE_MODE,
+) -> Any:
+    """
+    改进对话初稿
 
+    mode为 "patch" 时大模型只返回逐条修改并应用到初稿，修改无效时回退到重新生成整篇对话；
+    为 "full" 时直接重新生成整篇对话。
+    """
+    if mode == "patch":
+        refined = refine_dialogue_with_patch(system_prompt, first_draft_dialogue, output_model, llm_platform)
+        if refined is not None:
+            return refined
+    system_prompt_with_dialogue = _build_refine_prompt(system_prompt, first_draft_dialogue)
+    return call_llm(system_prompt_with_dialogue, REFINE_USER_PROMPT, output_model, llm_platform, stage="refine")
 
-def call_llm(system_prompt: str, text: str, dialogue_format: Any, platform: Optional[str] = None) -> Any:
+
+def refine_dialogue_with_patch(
+    system_prompt: str,
+    first_draft_dialogue: Any,
+    output_model: Union[ShortDialogue, MediumDialogue],
+    llm_platform: Optional[str] = None,
+) -> Optional[Any]:
+    """让大模型返回逐条修改（DialoguePatch）并应用到初稿，修改无效或调用失败时返回None"""
+    platform = llm_platform or DEFAULT_LLM_PLATFORM
+    if not isinstance(first_draft_dialogue, output_model):
+        logger.warning("初稿不是结构化对话，无法按补丁改进")
+        return None
+    system_prompt_with_patch = f"{system_prompt}\n\n{REFINE_PATCH_PROMPT.format(dialogue=format_numbered_dialogue(first_draft_dialogue))}"
+    try:
+        patch = call_llm(system_prompt_with_patch, REFINE_PATCH_USER_PROMPT, DialoguePatch, llm_platform, stage="refine_patch")
+        if not isinstance(patch, DialoguePatch):
+            raise ValueError(f"大模型未返回修改列表: {str(patch)[:200]}")
+        refined = apply_dialogue_patch(first_draft_dialogue, patch)
+    except Exception as e:
+        LLM_REFINE_PATCHES.inc(platform=platform, result="fallback")
+        logger.warning(f"按补丁改进对话失败，回退到重新生成整篇对话: {e}")
+        return None
+
+    # 与重新生成整篇对话相比节省的输出字符数（近似输出token的节省比例）
+    patch_characters = len(patch.model_dump_json())
+    full_characters = len(refined.model_dump_json())
+    LLM_REFINE_PATCHES.inc(platform=platform, result="applied")
+    LLM_REFINE_SAVED_CHARACTERS.inc(max(0, full_characters - patch_characters), platform=platform)
+    logger.info(
+        f"按补丁改进对话: {len(patch.edits)} 处修改，输出 {patch_characters} 字符"
+        f"（整篇对话 {full_characters} 字符，节省 {1 - patch_characters / full_characters:.0%}）"
+    )
+    return refined
+
+
+def call_llm(system_prompt: str, text: str, dialogue_format: Any, platform: Optional[str] = None, stage: str = "default") -> Any:
     """Call the LLM with the given prompt and dialogue format."""
     try:
         # 获取大模型客户端
         client = init_llm_client(platform)
+
+        # 查询响应缓存，stage用于区分初稿/改进等阶段的命中统计
+        cache = get_llm_cache() if hasattr(dialogue_format, "model_validate_json") else None
+        cache_key = None
+        if cache:
+            cache_key = _make_cache_key(cache, client, platform, system_prompt, text, dialogue_format)
+            cached = cache.get(cache_key, dialogue_format, stage)
+            if cached is not None:
+                logger.info(f"大模型缓存命中 (阶段: {stage})")
+                return cached
         
         # 记录大模型交互信息
         logger.info("=== 大模型交互开始 ===")
@@ -103,7 +371,11 @@ def call_llm(system_prompt: str, text: str, dialogue_format: Any, platform: Opti
         logger.info(f"用户输入 (长度: {len(text)}):\n{text}")
         
         # 调用大模型生成对话
-        result = client.generate(system_prompt, text, dialogue_format)
+        metric_labels = {"platform": platform or DEFAULT_LLM_PLATFORM, "stage": stage}
+        LLM_PROMPT_CHARACTERS.inc(len(system_prompt) + len(text), **metric_labels)
+        with LLM_CALL_SECONDS.time(**metric_labels):
+            result = client.generate(system_prompt, text, dialogue_format)
+        LLM_RESPONSE_CHARACTERS.inc(len(_response_text(result)), **metric_labels)
         
         # 记录生成结果
         if hasattr(result, 'model_dump_json'):
@@ -115,6 +387,9 @@ def call_llm(system_prompt: str, text: str, dialogue_format: Any, platform: Opti
             logger.info(f"生成对话结果 (文本格式):\n{result}")
         
         logger.info("=== 大模型交互结束 ===")
+
+        if cache:
+            cache.put(cache_key, result)
         
         return result
     except Exception as e:
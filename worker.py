@@ -0,0 +1,166 @@
+"""
+worker.py
+
+播客生成工作进程：从持久化任务队列（job_queue.SQLiteJobQueue）领取任务并执行，
+执行期间定期心跳续约。可在一台或多台主机上启动多个工作进程，共享同一个队列文件。
+
+用法：
+    JOB_QUEUE_BACKEND=sqlite python app.py      # Web前端只负责入队
+    python worker.py --processes 4             # 启动4个工作进程
+"""
+
+# Standard library imports
+import argparse
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import List, Optional
+
+# Third-party imports
+from dotenv import load_dotenv
+from loguru import logger
+
+# 加载环境变量
+load_dotenv()
+
+# Local imports
+from constants import (
+    JOB_MAX_RETAINED,
+    JOB_QUEUE_DB,
+    JOB_QUEUE_HEARTBEAT_INTERVAL,
+    JOB_QUEUE_MAX_ATTEMPTS,
+    JOB_QUEUE_RETRY_DELAY,
+    JOB_QUEUE_UPLOAD_DIR,
+    JOB_QUEUE_VISIBILITY_TIMEOUT,
+    METRICS_HOST,
+    WORKER_POLL_INTERVAL,
+    WORKER_PROCESSES,
+)
+from jobs import JOB_FAILED, JOB_QUEUED, JOB_SUCCEEDED, NonRetryableError
+from job_queue import SQLiteJobQueue, remove_uploads
+from metrics import JOBS, QUEUE_WAIT_SECONDS, StageTimer, start_metrics_server
+from tool import warm_up_extraction_pool
+
+
+def get_job_queue() -> SQLiteJobQueue:
+    """按配置创建任务队列"""
+    return SQLiteJobQueue(
+        JOB_QUEUE_DB,
+        visibility_timeout=JOB_QUEUE_VISIBILITY_TIMEOUT,
+        max_attempts=JOB_QUEUE_MAX_ATTEMPTS,
+        retry_delay=JOB_QUEUE_RETRY_DELAY,
+        max_retained=JOB_MAX_RETAINED,
+    )
+
+
+def process_job(queue: SQLiteJobQueue, worker_id: str, job: dict) -> None:
+    """执行一个已领取的任务，执行期间后台线程定期续约"""
+    # 延迟导入：生成流程依赖Gradio等较重的模块，只在工作进程中加载
+    from app import generate_podcast
+
+    job_id = job["id"]
+    stop = threading.Event()
+    stage_timer = StageTimer()
+    if job["attempts"] == 1:
+        QUEUE_WAIT_SECONDS.observe(time.time() - job["created_at"], backend="sqlite")
+
+    def progress(stage: str) -> None:
+        stage_timer.start(stage)
+        queue.report_stage(job_id, worker_id, stage)
+
+    def partial(update: dict) -> None:
+        queue.report_partial(job_id, worker_id, update)
+
+    def keep_alive() -> None:
+        while not stop.wait(JOB_QUEUE_HEARTBEAT_INTERVAL):
+            if not queue.heartbeat(job_id, worker_id):
+                logger.warning(f"任务租约已丢失: {job_id}")
+                return
+
+    heartbeat_thread = threading.Thread(target=keep_alive, name=f"heartbeat-{job_id[:8]}", daemon=True)
+    heartbeat_thread.start()
+    logger.info(f"[{worker_id}] 开始执行任务: {job_id}（第{job['attempts']}次尝试）")
+    try:
+        result = generate_podcast(*job["args"], progress=progress, partial=partial, **job["kwargs"])
+    except Exception as e:
+        stop.set()
+        error = getattr(e, "message", None) or str(e)  # gr.Error的str()带引号
+        # 输入校验失败等确定性错误重试也不会成功，直接标记为失败
+        queue.fail(job_id, worker_id, error, retryable=not isinstance(e, NonRetryableError))
+        JOBS.inc(status=JOB_FAILED)
+        logger.error(f"[{worker_id}] 任务失败: {job_id} ({error})")
+    else:
+        stop.set()
+        if queue.complete(job_id, worker_id, result):
+            JOBS.inc(status=JOB_SUCCEEDED)
+            logger.info(f"[{worker_id}] 任务完成: {job_id}")
+        else:
+            logger.warning(f"[{worker_id}] 任务已被其他工作进程接管，丢弃结果: {job_id}")
+    finally:
+        stage_timer.finish()
+        heartbeat_thread.join()
+
+    # 任务结束（成功或放弃重试）后删除共享目录中的上传文件
+    if queue.status(job_id)["status"] != JOB_QUEUED:
+        remove_uploads(job["args"][0] if job["args"] else None, JOB_QUEUE_UPLOAD_DIR)
+
+
+def run_worker(worker_id: Optional[str] = None, stop: Optional[threading.Event] = None, metrics_port: int = 0) -> None:
+    """工作进程主循环：领取任务并执行，队列为空时按间隔轮询"""
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    stop = stop or threading.Event()
+    start_metrics_server(metrics_port, METRICS_HOST)
+    queue = get_job_queue()
+    warm_up_extraction_pool()
+    logger.info(f"工作进程已启动: {worker_id}")
+    while not stop.is_set():
+        try:
+            job = queue.lease(worker_id)
+        except Exception as e:
+            logger.warning(f"[{worker_id}] 领取任务失败: {e}")
+            job = None
+        if job is None:
+            stop.wait(WORKER_POLL_INTERVAL)
+            continue
+        process_job(queue, worker_id, job)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """命令行入口：启动指定数量的工作进程"""
+    parser = argparse.ArgumentParser(description="播客生成工作进程")
+    parser.add_argument("--processes", type=int, default=WORKER_PROCESSES, help="启动的工作进程数")
+    parser.add_argument(
+        "--metrics-port", type=int, default=0,
+        help="指标服务起始端口，第i个工作进程使用 起始端口+i；0表示不启动（Web进程默认占用METRICS_PORT）",
+    )
+    args = parser.parse_args(argv)
+
+    def metrics_port(index: int) -> int:
+        return args.metrics_port + index if args.metrics_port else 0
+
+    if args.processes <= 1:
+        run_worker(metrics_port=metrics_port(0))
+        return
+
+    # 工作进程内部还会创建文档解析进程池，因此不能使用守护进程
+    processes = [
+        multiprocessing.Process(target=run_worker, kwargs={"metrics_port": metrics_port(i)}, name=f"podcast-worker-{i}")
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()